@@ -7,12 +7,18 @@ from PySide6.QtGui import (
 from PySide6.QtCore import QPropertyAnimation, QRect, QByteArray
 from pages.home_page.home_page import HomePage
 from pages.game_page.game_page import GamePage
+from pages.game_page.frame_source import open_source
+from pages.game_page.gesture_recognition import PREPROCESS_PROFILES
+from pages.game_page.strategies import STRATEGIES
+from pages.game_page.telemetry import TELEMETRY
+from pages.game_page.tracing import TRACER
+import argparse
 import sys
 
 class MainWindow(QMainWindow):
     """Main window that manages stacked pages and transitions."""
 
-    def __init__(self):
+    def __init__(self, frame_source=None, profile='quality', record=None, opponent='adaptive'):
         super().__init__()
         self.setWindowIcon(QIcon("assets/icons/icon.png"))
         self.setWindowTitle("Rock, Paper, Scissors, Lizard, Spock")
@@ -21,7 +27,9 @@ class MainWindow(QMainWindow):
 
         self.stack = QStackedWidget()
         self.home_page = HomePage(self.transition_to_game)
-        self.game_page = GamePage(self)
+        self.game_page = GamePage(self, frame_source, profile, opponent)
+        if record:
+            self.game_page.start_recording(record)
 
         self.stack.addWidget(self.home_page)
         self.stack.addWidget(self.game_page)
@@ -48,7 +56,37 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = MainWindow()
+    parser = argparse.ArgumentParser(description="Rock, Paper, Scissors, Lizard, Spock")
+    parser.add_argument("--source", default="0",
+                        help="camera index, video file, image directory or 'synthetic'")
+    parser.add_argument("--profile", default="quality", choices=list(PREPROCESS_PROFILES),
+                        help="preprocessing profile; 'fast' suits low-power machines")
+    parser.add_argument("--opponent", default="adaptive", choices=list(STRATEGIES),
+                        help="the computer's strategy; 'adaptive' learns from your moves")
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve metrics on http://127.0.0.1:PORT/metrics (and /metrics.json)")
+    parser.add_argument("--metrics-file",
+                        help="write metrics to this file every 10 seconds (.json, otherwise Prometheus text)")
+    parser.add_argument("--trace",
+                        help="record a per-stage trace and save it as Chrome trace JSON on exit")
+    parser.add_argument("--record",
+                        help="record camera frames and recognition results to this session file (.rpsrec)")
+    args, qt_args = parser.parse_known_args()
+
+    if args.metrics_port:
+        TELEMETRY.serve(args.metrics_port)
+    if args.metrics_file:
+        TELEMETRY.start_dump(args.metrics_file)
+    if args.trace:
+        TRACER.enable()
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = MainWindow(open_source(args.source, live=True), args.profile, args.record, args.opponent)
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    status = app.exec()
+    window.game_page.stop_recording()
+    if args.metrics_file:
+        TELEMETRY.dump(args.metrics_file)
+    if args.trace:
+        TRACER.export(args.trace)
+    sys.exit(status)
\ No newline at end of file
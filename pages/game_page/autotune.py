@@ -0,0 +1,191 @@
+"""Search recognizer settings for the best accuracy/latency tradeoffs.
+
+Usage:
+    python -m pages.game_page.autotune session.rpsrec dataset/ --trials 60
+    python main.py --profile tuned
+
+Each trial samples preprocessing and recognition settings from
+SEARCH_SPACE around a base profile. The trial replays every labelled input
+through a GestureRecognizer using those settings and measures accuracy and
+the median latency of full recognition passes. Frames the motion gate
+reused take microseconds whatever the settings, so they are left out of the
+latency and reported as the trial's reuse rate instead. Trials and inputs run in parallel worker
+processes. The trials on the accuracy/latency Pareto front are listed.
+Two of them are written as profiles to models/profiles.json, which
+GestureRecognizer loads at startup:
+- NAME: the most accurate trial;
+- NAME-fast: the fastest trial within --tolerance of that accuracy.
+
+Latency is measured while the workers share the CPU. Use fewer workers
+(-j) when the latency numbers matter more than the search time.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from pages.game_page.batch import iter_shard
+from pages.game_page.gesture_recognition import DEFAULT_PROFILES_PATH, PREPROCESS_PROFILES, resolve_profile
+
+# Candidate values per setting, see PREPROCESS_PROFILES and RECOGNITION_DEFAULTS
+SEARCH_SPACE = {
+    'max_size': [None, 320, 160],
+    'denoise': [None, 'bilateral'],
+    'contrast': [None, 'gray', 'lab'],
+    'blur': [3, 5, 9],
+    'kernel': [3, 5, 7],
+    'open': [1, 2],
+    'dilate': [1, 2, 3],
+    'close': [1, 2, 3],
+    'mog2_history': [100, 200, 400],
+    'mog2_var_threshold': [16, 25, 36, 50],
+    'mask_threshold': [127, 180, 220],
+    'min_contour_area': [250, 500, 1000],
+    'finger_angle': [90.0, 100.0, 110.0, 120.0],
+}
+# Each rule weight is scaled by one of these factors
+WEIGHT_SCALES = [0.75, 1.0, 1.25]
+
+
+def sample_configs(base, trials, seed=0, tune_weights=True):
+    """Return `trials` settings dicts; the first one is the base profile itself"""
+    rng = random.Random(seed)
+    configs = [base]
+    seen = {json.dumps(base, sort_keys=True)}
+    # Small spaces run out of new combinations, so give up after many repeats
+    attempts = 0
+    while len(configs) < trials and attempts < trials * 20:
+        attempts += 1
+        # Each setting keeps its base value half of the time, so trials stay near the base
+        config = dict(base)
+        for name, values in SEARCH_SPACE.items():
+            if rng.random() < 0.5:
+                config[name] = rng.choice(values)
+        if tune_weights:
+            config['weights'] = {name: round(weight * rng.choice(WEIGHT_SCALES), 3) if rng.random() < 0.5 else weight
+                                 for name, weight in base['weights'].items()}
+        key = json.dumps(config, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+
+def init_worker():
+    # Parallelism comes from the worker processes; OpenCV's own threads would compete with them
+    cv2.setNumThreads(1)
+
+
+def run_trial(task):
+    """Replay one input with one config; return (trial, correct, labelled, latencies, frames)
+
+    Latencies are only those of full recognition passes.
+    """
+    trial, config, spec = task
+    correct = labelled = frames = 0
+    latencies = []
+    for _, label, result, latency in iter_shard((spec, 0, None, 0, config)):
+        frames += 1
+        if 'preprocess' in result.timings:
+            latencies.append(latency)
+        if label:
+            labelled += 1
+            correct += result.gesture == label
+    return trial, correct, labelled, latencies, frames
+
+
+def pareto_front(trials):
+    """Trials that no other trial beats on both accuracy and latency, fastest first"""
+    front = []
+    best_accuracy = -1.0
+    for trial in sorted(trials, key=lambda t: (t['latency_ms'], -t['accuracy'])):
+        if trial['accuracy'] > best_accuracy:
+            front.append(trial)
+            best_accuracy = trial['accuracy']
+    return front
+
+
+def write_profiles(path, profiles):
+    """Merge profiles into a profiles file, keeping any others already in it"""
+    existing = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            existing = json.load(f)
+    existing.update(profiles)
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(existing, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune recognizer settings on labelled recordings")
+    parser.add_argument('inputs', nargs='+', help="session files, video files, image directories or 'synthetic'")
+    parser.add_argument('--profile', default='quality', choices=list(PREPROCESS_PROFILES),
+                        help="profile the search starts from")
+    parser.add_argument('--trials', type=int, default=40, help="number of settings to try")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-weights', action='store_true', help="keep the rule confidence weights fixed")
+    parser.add_argument('--tolerance', type=float, default=0.02,
+                        help="accuracy the fast profile may give up (default: 0.02)")
+    parser.add_argument('--name', default='tuned', help="name of the written profile")
+    parser.add_argument('-o', '--output', default=DEFAULT_PROFILES_PATH, help="profiles file to update")
+    parser.add_argument('--report', help="write every trial's settings and scores to this JSON file")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="number of worker processes")
+    args = parser.parse_args(argv)
+
+    base = resolve_profile(args.profile)
+    configs = sample_configs(base, args.trials, args.seed, not args.no_weights)
+    tasks = [(trial, config, spec) for trial, config in enumerate(configs) for spec in args.inputs]
+
+    started = time.perf_counter()
+    totals = [{'trial': trial, 'config': config, 'correct': 0, 'labelled': 0, 'latencies': [], 'frames': 0}
+              for trial, config in enumerate(configs)]
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as executor:
+        for trial, correct, labelled, latencies, frames in executor.map(run_trial, tasks, chunksize=1):
+            totals[trial]['correct'] += correct
+            totals[trial]['labelled'] += labelled
+            totals[trial]['latencies'].extend(latencies)
+            totals[trial]['frames'] += frames
+    if not totals[0]['labelled']:
+        print("No labelled frames in the inputs", file=sys.stderr)
+        return 1
+
+    # The first frame of every input is a full pass, so no trial is without latencies
+    trials = [{'trial': t['trial'], 'accuracy': round(t['correct'] / t['labelled'], 4),
+               'latency_ms': round(float(np.median(t['latencies'])), 4),
+               'reuse_rate': round(1 - len(t['latencies']) / t['frames'], 4), 'config': t['config']}
+              for t in totals]
+    print(f"Ran {len(trials)} trials on {len(args.inputs)} inputs in {time.perf_counter() - started:.1f}s",
+          file=sys.stderr)
+
+    front = pareto_front(trials)
+    print(f"{'trial':>5} {'accuracy':>8} {'p50 ms':>8} {'reused':>7}  (Pareto front, trial 0 is '{args.profile}', "
+          f"latency of full recognition passes)", file=sys.stderr)
+    for trial in front:
+        print(f"{trial['trial']:>5} {trial['accuracy'] * 100:>7.1f}% {trial['latency_ms']:>8.2f} "
+              f"{trial['reuse_rate'] * 100:>6.0f}%", file=sys.stderr)
+
+    best = front[-1]
+    fast = next(trial for trial in front if trial['accuracy'] >= best['accuracy'] - args.tolerance)
+    profiles = {args.name: best['config']}
+    if fast is not best:
+        profiles[f"{args.name}-fast"] = fast['config']
+    write_profiles(args.output, profiles)
+    print(f"Wrote {', '.join(profiles)} to {args.output}", file=sys.stderr)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'base': args.profile, 'inputs': args.inputs, 'trials': trials,
+                       'pareto': [trial['trial'] for trial in front]}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""Headless batch gesture recognition over recorded frames and clips.
+
+Usage:
+    python -m pages.game_page.batch INPUT [INPUT ...] -o results.csv
+
+Each INPUT is a video file, a directory of images (optionally in gesture
+named sub-directories) or "synthetic". Inputs are split into shards that run
+in parallel worker processes. Every shard gets its own GestureRecognizer
+because the background subtractor learns a model of one stream.
+
+By default every input is one shard, so results are the same whatever the
+number of workers. --chunk-size also splits long inputs, but a chunk only
+primes its background model with the --warmup frames before it. Those
+frames often hold the hand, so chunked results can differ from a whole-input
+run; use it for quick estimates, not for scoring.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pages.game_page.frame_source import GESTURE_NAMES, open_source
+from pages.game_page.gesture_recognition import PREPROCESS_PROFILES, GestureRecognizer
+
+FIELDS = ['source', 'frame', 'label', 'gesture', 'detected', 'latency_ms'] + \
+         [f'confidence_{name}' for name in GESTURE_NAMES]
+
+
+def plan_shards(inputs, chunk_size, warmup, profile='quality'):
+    """Split every input into (spec, start, stop, warmup, profile) shards"""
+    shards = []
+    for spec in inputs:
+        source = open_source(spec)
+        if not source.open():
+            print(f"Skipping {spec}: could not open source", file=sys.stderr)
+            continue
+        total = source.frame_count()
+        source.release()
+
+        if total is None or chunk_size <= 0:
+            shards.append((spec, 0, total, 0, profile))
+            continue
+        for start in range(0, total, chunk_size):
+            shards.append((spec, start, min(start + chunk_size, total), min(warmup, start), profile))
+    return shards
+
+
+def iter_shard(shard):
+    """Recognize every frame of one shard, yielding (index, label, result, latency_ms)"""
+    spec, start, stop, warmup, profile = shard
+    recognizer = GestureRecognizer(profile)
+    recognizer.debug_mode = False
+    source = open_source(spec)
+    if not source.open():
+        return
+
+    # Prime the background model with the frames just before the shard
+    source.skip(start - warmup)
+    for _ in range(warmup):
+        ret, frame = source.read()
+        if not ret:
+            break
+        recognizer.recognize(frame)
+
+    index = start
+    try:
+        while stop is None or index < stop:
+            ret, frame = source.read()
+            if not ret:
+                break
+
+            started = time.perf_counter()
+            result = recognizer.recognize(frame)
+            latency = (time.perf_counter() - started) * 1000
+            yield index, source.label, result, latency
+            index += 1
+    finally:
+        source.release()
+
+
+def run_shard(shard):
+    """Recognize every frame of one shard and return its result rows"""
+    rows = []
+    for index, label, result, latency in iter_shard(shard):
+        row = {
+            'source': shard[0],
+            'frame': index,
+            'label': label,
+            'gesture': result.gesture,
+            'detected': result.raw_gesture,
+            'latency_ms': round(latency, 3),
+        }
+        for name in GESTURE_NAMES:
+            row[f'confidence_{name}'] = round(result.confidences.get(name, 0.0), 3)
+        rows.append(row)
+    return rows
+
+
+class ResultWriter:
+    """Write result rows as CSV or JSON lines"""
+
+    def __init__(self, path, output_format):
+        self.file = open(path, 'w', newline='') if path != '-' else sys.stdout
+        self.output_format = output_format
+        if output_format == 'csv':
+            self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+            self.writer.writeheader()
+
+    def write(self, rows):
+        for row in rows:
+            if self.output_format == 'csv':
+                self.writer.writerow(row)
+            else:
+                self.file.write(json.dumps(row) + '\n')
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run gesture recognition over recorded frames")
+    parser.add_argument('inputs', nargs='+', help="video files, image directories or 'synthetic'")
+    parser.add_argument('-o', '--output', default='-', help="output file (default: stdout)")
+    parser.add_argument('-f', '--format', choices=['csv', 'jsonl'],
+                        help="output format (default: from the output file extension, else csv)")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help="number of worker processes")
+    parser.add_argument('--chunk-size', type=int, default=0,
+                        help="frames per shard; the default 0 keeps each input in one shard, "
+                             "inputs split into chunks may be scored differently")
+    parser.add_argument('--profile', default='quality', choices=list(PREPROCESS_PROFILES),
+                        help="preprocessing profile")
+    parser.add_argument('--warmup', type=int, default=30,
+                        help="frames replayed before each shard to prime the background model")
+    args = parser.parse_args(argv)
+
+    output_format = args.format or ('jsonl' if args.output.endswith('.jsonl') else 'csv')
+    shards = plan_shards(args.inputs, args.chunk_size, args.warmup, args.profile)
+    if not shards:
+        print("No readable inputs", file=sys.stderr)
+        return 1
+
+    writer = ResultWriter(args.output, output_format)
+    frames = correct = labelled = 0
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            # map() keeps shard order so the output stays in frame order
+            for rows in executor.map(run_shard, shards):
+                writer.write(rows)
+                frames += len(rows)
+                for row in rows:
+                    if row['label']:
+                        labelled += 1
+                        correct += row['gesture'] == row['label']
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    summary = f"Processed {frames} frames in {len(shards)} shards in {elapsed:.1f}s ({frames / max(elapsed, 1e-9):.1f} fps)"
+    if labelled:
+        summary += f", accuracy {correct}/{labelled} ({100.0 * correct / labelled:.1f}%)"
+    print(summary, file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
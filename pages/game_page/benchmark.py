@@ -0,0 +1,230 @@
+"""Per-stage timing benchmark for GestureRecognizer.
+
+Usage:
+    python -m pages.game_page.benchmark -o bench.json
+    python -m pages.game_page.benchmark --baseline bench.json
+
+Every frame is pushed through the same stages as process_frame and each
+stage is timed separately: the motion gate, preprocess_frame, find_contours,
+contour classification and the overlay drawing. The motion gate is timed on
+every frame, the other stages only on full recognition passes, so frames the
+gate reused do not hide their cost. How often the gate reused a result is
+reported separately as reuse_rate. Each preprocessing profile selected with
+--profiles is measured at every resolution, together with its accuracy on
+labelled frames, to show the speed/accuracy tradeoff. Runs use the
+deterministic synthetic hand source by default, so results are comparable
+between commits on the same machine. Results are written as JSON; with
+--baseline the run is compared against an earlier result and exits non-zero
+when a stage got slower than --threshold allows.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from pages.game_page.frame_source import SyntheticHandSource, open_source
+from pages.game_page.gesture_recognition import PREPROCESS_PROFILES, GestureRecognizer
+
+RESOLUTIONS = [(320, 240), (640, 480), (1280, 720), (1920, 1080)]
+STAGES = ['motion', 'preprocess', 'find_contours', 'classify', 'overlay', 'total']
+
+
+def frame_stream(spec, width, height):
+    """Yield (frame, label) pairs of the requested size, looping the source forever"""
+    if spec == 'synthetic':
+        source = SyntheticHandSource(width=width, height=height, loop=True)
+    else:
+        source = open_source(spec)
+        source.loop = True
+    if not source.open():
+        raise RuntimeError(f"Could not open frame source {spec}")
+    try:
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                return
+            if frame.shape[1] != width or frame.shape[0] != height:
+                frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            yield frame, source.label
+    finally:
+        source.release()
+
+
+def time_stages(recognizer, frame):
+    """Run one frame through the recognizer and return per-stage times in ms"""
+    started = time.perf_counter()
+    result = recognizer.recognize(frame)
+    recognized = time.perf_counter()
+    recognizer.overlay.render(frame, result, recognizer, copy=False)
+    rendered = time.perf_counter()
+
+    timings = dict(result.timings)
+    timings['overlay'] = (rendered - recognized) * 1000
+    timings['total'] = (rendered - started) * 1000
+    return timings, result.gesture
+
+
+def summarize(samples):
+    """Summary statistics in milliseconds for a list of samples"""
+    values = np.asarray(samples, dtype=np.float64)
+    return {
+        'mean_ms': round(float(values.mean()), 4),
+        'p50_ms': round(float(np.percentile(values, 50)), 4),
+        'p95_ms': round(float(np.percentile(values, 95)), 4),
+        'p99_ms': round(float(np.percentile(values, 99)), 4),
+        'max_ms': round(float(values.max()), 4),
+    }
+
+
+def run_benchmark(spec, width, height, frames, warmup, profile='quality'):
+    """Benchmark one profile at one resolution and return its result entry"""
+    recognizer = GestureRecognizer(profile)
+    recognizer.debug_mode = True
+    samples = {stage: [] for stage in STAGES}
+    labelled = correct = reused = 0
+    stream = frame_stream(spec, width, height)
+
+    for index in range(warmup + frames):
+        frame, label = next(stream)
+        timings, gesture = time_stages(recognizer, frame)
+        if index < warmup:
+            continue
+        if 'motion' in timings:
+            samples['motion'].append(timings['motion'])
+        # Frames reused by the motion gate skipped the later stages; timing them would report zeros
+        if 'preprocess' in timings:
+            for stage in STAGES:
+                if stage != 'motion':
+                    samples[stage].append(timings[stage])
+        else:
+            reused += 1
+        if label:
+            labelled += 1
+            correct += gesture == label
+    stream.close()
+
+    stages = {stage: summarize(values) for stage, values in samples.items() if values}
+    return {
+        'profile': profile,
+        'resolution': f"{width}x{height}",
+        'frames': frames,
+        'accuracy': round(correct / labelled, 4) if labelled else None,
+        # Rate of full recognition passes
+        'fps': round(1000.0 / max(stages['total']['mean_ms'], 1e-9), 2) if 'total' in stages else None,
+        'reuse_rate': round(reused / frames, 4) if frames else None,
+        'stages': stages,
+    }
+
+
+def environment():
+    """Describe the machine and code version the benchmark ran on"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'opencv_threads': cv2.getNumThreads(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def find_regressions(results, baseline, threshold):
+    """Return messages for stages whose median got slower than the threshold"""
+    previous = {(entry.get('profile', 'quality'), entry['resolution']): entry
+                for entry in baseline.get('results', [])}
+    regressions = []
+    for entry in results:
+        old = previous.get((entry['profile'], entry['resolution']))
+        if old is None:
+            continue
+        for stage, stats in entry['stages'].items():
+            old_stats = old['stages'].get(stage)
+            if not old_stats or old_stats['p50_ms'] <= 0:
+                continue
+            change = stats['p50_ms'] / old_stats['p50_ms'] - 1
+            if change > threshold:
+                regressions.append(f"{entry['profile']} {entry['resolution']} {stage}: {old_stats['p50_ms']:.2f} -> "
+                                   f"{stats['p50_ms']:.2f} ms (+{change * 100:.0f}%)")
+    return regressions
+
+
+def print_table(results, file=sys.stderr):
+    print(f"{'profile':<9} {'resolution':<11} {'fps':>7} {'accuracy':>8} {'reused':>7} " +
+          " ".join(f"{stage:>20}" for stage in STAGES), file=file)
+    for entry in results:
+        stages = entry['stages']
+        cells = " ".join(f"{stages[stage]['p50_ms']:>8.2f}/{stages[stage]['p95_ms']:>8.2f} ms" if stage in stages
+                         else f"{'-':>20}" for stage in STAGES)
+        accuracy = f"{entry['accuracy'] * 100:.1f}%" if entry['accuracy'] is not None else "-"
+        fps = f"{entry['fps']:.1f}" if entry['fps'] is not None else "-"
+        reused = f"{entry['reuse_rate'] * 100:.0f}%" if entry.get('reuse_rate') is not None else "-"
+        print(f"{entry['profile']:<9} {entry['resolution']:<11} {fps:>7} {accuracy:>8} {reused:>7} {cells}",
+              file=file)
+    print("(p50/p95 per stage; stages after motion are timed on full recognition passes only)", file=file)
+
+
+def parse_resolution(text):
+    width, _, height = text.lower().partition('x')
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the gesture recognition stages")
+    parser.add_argument('--source', default='synthetic',
+                        help="'synthetic', a video file or an image directory")
+    parser.add_argument('--resolutions', default=','.join(f"{w}x{h}" for w, h in RESOLUTIONS),
+                        help="comma separated WIDTHxHEIGHT list")
+    parser.add_argument('--profiles', default='quality',
+                        help=f"comma separated preprocessing profiles ({', '.join(PREPROCESS_PROFILES)})")
+    parser.add_argument('--frames', type=int, default=100, help="timed frames per resolution")
+    parser.add_argument('--warmup', type=int, default=20, help="untimed frames per resolution")
+    parser.add_argument('--threads', type=int, help="OpenCV worker threads (default: OpenCV's choice)")
+    parser.add_argument('-o', '--output', help="write JSON results to this file (default: stdout)")
+    parser.add_argument('--baseline', help="earlier JSON result to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="allowed median slowdown per stage before failing (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
+
+    results = []
+    for profile in args.profiles.split(','):
+        for text in args.resolutions.split(','):
+            width, height = parse_resolution(text)
+            results.append(run_benchmark(args.source, width, height, args.frames, args.warmup, profile))
+
+    report = {'environment': environment(), 'source': args.source, 'results': results}
+    print_table(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
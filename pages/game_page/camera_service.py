@@ -0,0 +1,246 @@
+import threading
+import time
+
+import cv2
+
+from pages.game_page.frame_source import CameraSource
+from pages.game_page.telemetry import TELEMETRY
+from pages.game_page.tracing import TRACER
+
+
+class FrameRing:
+    """Fixed-size ring of the most recently captured frames.
+
+    Every published frame gets an increasing sequence number. Slots are
+    overwritten in place, so a frame stays available until `capacity` newer
+    frames have been published.
+    """
+
+    def __init__(self, capacity=8):
+        self.capacity = capacity
+        self.slots = [None] * capacity
+        self.seq = 0
+
+    def put(self, frame, timestamp):
+        self.seq += 1
+        self.slots[self.seq % self.capacity] = (self.seq, timestamp, frame)
+        return self.seq
+
+    def get(self, seq):
+        """Return (seq, timestamp, frame) if that frame is still in the ring"""
+        slot = self.slots[seq % self.capacity]
+        if slot is not None and slot[0] == seq:
+            return slot
+        return None
+
+    def oldest_seq(self):
+        return max(1, self.seq - self.capacity + 1)
+
+
+class Subscription:
+    """One consumer's view of the camera service.
+
+    A subscriber either follows the latest frame, skipping any it was too
+    slow for, or reads frames sequentially as long as they are still in the
+    ring. Frames are shared, read-only arrays; only subscribers that ask for
+    a `size` receive a resized copy. `max_fps` limits how often read()
+    returns a frame and how often `callback` is notified. Skipped frames are
+    counted in telemetry under the subscription's `name`.
+    """
+
+    def __init__(self, service, max_fps=None, size=None, sequential=False, callback=None, name='subscriber'):
+        self.service = service
+        self.name = name
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.size = size
+        self.sequential = sequential
+        self.callback = callback
+        self.last_seq = 0
+        self.last_delivery = 0.0
+        self.last_notify = 0.0
+        self.delivered = 0
+        self.dropped = 0
+        # Capture time of the last frame returned by read()
+        self.timestamp = None
+
+    def notify(self, now):
+        """Called by the capture thread after a frame is published"""
+        if self.callback is not None and now - self.last_notify >= self.min_interval:
+            self.last_notify = now
+            self.callback()
+
+    def take(self, now):
+        """Pick the next frame to deliver; the caller holds the service lock"""
+        ring = self.service.ring
+        if ring.seq <= self.last_seq or now - self.last_delivery < self.min_interval:
+            return None
+
+        if self.sequential:
+            seq = max(self.last_seq + 1, ring.oldest_seq())
+        else:
+            seq = ring.seq
+        if self.last_seq and seq > self.last_seq + 1:
+            self.dropped += seq - self.last_seq - 1
+            if self.service.telemetry is not None:
+                self.service.telemetry.inc('camera_frames_dropped_total', seq - self.last_seq - 1, consumer=self.name)
+        self.last_seq = seq
+        self.last_delivery = now
+        self.delivered += 1
+        return ring.get(seq)
+
+    def read(self):
+        """Return the next frame for this subscriber without blocking, or None"""
+        with self.service.condition:
+            slot = self.take(time.monotonic())
+        return self.deliver(slot)
+
+    def wait(self, timeout=None):
+        """Block until a frame is available for this subscriber, or until timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.service.condition:
+            while True:
+                now = time.monotonic()
+                slot = self.take(now)
+                if slot is not None or not self.service.is_running():
+                    break
+                remaining = None if deadline is None else deadline - now
+                if remaining is not None and remaining <= 0:
+                    break
+                # Sleep until the next publish, or until our rate limit allows a frame
+                if self.min_interval and self.service.ring.seq > self.last_seq:
+                    pause = self.last_delivery + self.min_interval - now
+                    remaining = pause if remaining is None else min(pause, remaining)
+                self.service.condition.wait(remaining)
+        return self.deliver(slot)
+
+    def deliver(self, slot):
+        if slot is None:
+            return None
+        _, self.timestamp, frame = slot
+        if self.size is not None and (frame.shape[1], frame.shape[0]) != tuple(self.size):
+            frame = cv2.resize(frame, tuple(self.size), interpolation=cv2.INTER_AREA)
+        return frame
+
+    def close(self):
+        self.service.unsubscribe(self)
+
+
+class CameraService:
+    """Single owner of the camera device that fans frames out to subscribers.
+
+    One capture thread reads (and mirrors) frames from the frame source and
+    publishes them into a FrameRing. Published frames are made read-only so
+    subscribers such as the game page, the camera window, a recorder or a
+    test harness can all share them without copying.
+    """
+
+    def __init__(self, source=None, mirror=True, ring_size=8):
+        self.source = source if source is not None else CameraSource(0)
+        self.mirror = mirror
+        self.ring = FrameRing(ring_size)
+        self.condition = threading.Condition()
+        self.subscriptions = []
+        self.error_listeners = []
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.telemetry = TELEMETRY
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        """Open the source if needed and start capturing; return success"""
+        if self.is_running():
+            return True
+        if not self.source.is_opened() and not self.source.open():
+            return False
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.capture_loop, name="camera-service", daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """Stop capturing and release the device"""
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        self.thread = None
+        self.source.release()
+        with self.condition:
+            self.condition.notify_all()
+
+    def restart(self):
+        self.stop()
+        return self.start()
+
+    def subscribe(self, max_fps=None, size=None, sequential=False, callback=None, name='subscriber'):
+        subscription = Subscription(self, max_fps, size, sequential, callback, name)
+        # New subscribers start from the current frame
+        subscription.last_seq = self.ring.seq
+        with self.condition:
+            self.subscriptions = self.subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.condition:
+            self.subscriptions = [s for s in self.subscriptions if s is not subscription]
+
+    def add_error_listener(self, callback):
+        """Register a callable(message) invoked when the source stops delivering frames"""
+        self.error_listeners.append(callback)
+
+    def remove_error_listener(self, callback):
+        if callback in self.error_listeners:
+            self.error_listeners.remove(callback)
+
+    def capture_loop(self):
+        source = self.source
+        frame_interval = 1.0 / source.fps if source.realtime else 0.0
+        next_frame_time = time.perf_counter()
+        telemetry = self.telemetry
+        rate_start = time.monotonic()
+        rate_frames = 0
+        while not self.stop_event.is_set():
+            # Replayed sources are paced at their recorded frame rate
+            if frame_interval:
+                next_frame_time += frame_interval
+                delay = next_frame_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            with TRACER.span('capture.read'):
+                ret, frame = source.read()
+            if not ret or frame is None or frame.size == 0:
+                if not self.stop_event.is_set():
+                    if telemetry is not None:
+                        telemetry.inc('camera_read_failures_total')
+                    for listener in list(self.error_listeners):
+                        listener("Failed to read frame from camera")
+                break
+
+            # Flip the frame horizontally for a more natural view
+            if self.mirror and not source.mirrored:
+                with TRACER.span('capture.flip'):
+                    frame = cv2.flip(frame, 1)
+            # Subscribers share this array, so nobody may draw into it
+            frame.flags.writeable = False
+
+            now = time.monotonic()
+            with self.condition:
+                self.ring.put(frame, now)
+                self.condition.notify_all()
+            # The subscription list is replaced, never mutated, so iterating is safe
+            for subscription in self.subscriptions:
+                subscription.notify(now)
+
+            if telemetry is not None:
+                telemetry.inc('camera_frames_captured_total')
+                rate_frames += 1
+                if now - rate_start >= 1.0:
+                    telemetry.set('camera_capture_fps', round(rate_frames / (now - rate_start), 2))
+                    rate_start = now
+                    rate_frames = 0
+
+        with self.condition:
+            self.condition.notify_all()
@@ -0,0 +1,107 @@
+import threading
+import time
+
+from PySide6.QtCore import QObject, Signal
+
+from pages.game_page.camera_service import CameraService
+from pages.game_page.recognition_scheduler import RecognitionScheduler
+from pages.game_page.tracing import TRACER
+
+
+class CameraPipeline(QObject):
+    """Runs gesture recognition on camera frames off the GUI thread.
+
+    The pipeline does not own the camera. It subscribes twice to a shared
+    CameraService: a display subscription that signals the GUI when a new
+    frame can be fetched, and a recognition subscription that always picks
+    up the newest frame, so a slow recognizer skips frames instead of
+    falling behind. A RecognitionScheduler sets how often frames are
+    recognized. Results are delivered to the GUI thread through signals.
+    """
+
+    # Emitted when a new frame can be fetched with latest_frame()
+    frame_ready = Signal()
+    # Emitted with (confirmed gesture or None, RecognitionResult, frame) per recognized frame
+    result_ready = Signal(object, object, object)
+    # Emitted with an error message when the camera stops delivering frames
+    camera_failed = Signal(str)
+
+    def __init__(self, recognizer, service=None, parent=None, display_fps=None):
+        super().__init__(parent)
+        self.recognizer = recognizer
+        self.service = service if service is not None else CameraService()
+        self.display_fps = display_fps
+        self.scheduler = RecognitionScheduler()
+        self.display_subscription = None
+        self.recognition_subscription = None
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.service.add_error_listener(self.camera_failed.emit)
+
+    def open(self):
+        """Make sure the shared camera is capturing and return whether it is usable"""
+        return self.service.start()
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive() and self.service.is_running()
+
+    def start(self):
+        """Subscribe to the camera service and start the recognition thread"""
+        if self.thread is not None and self.thread.is_alive():
+            return False
+        if not self.service.is_running():
+            return False
+
+        self.display_subscription = self.service.subscribe(
+            max_fps=self.display_fps, callback=self.frame_ready.emit, name='display')
+        self.recognition_subscription = self.service.subscribe(name='recognition')
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.recognition_loop, name="gesture-recognition", daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """Stop recognizing and drop the subscriptions; the camera keeps running"""
+        self.stop_event.set()
+        for subscription in (self.display_subscription, self.recognition_subscription):
+            if subscription is not None:
+                subscription.close()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        self.thread = None
+        self.scheduler = RecognitionScheduler()
+        self.display_subscription = None
+        self.recognition_subscription = None
+
+    def set_mode(self, mode):
+        """Switch the recognition rate, see recognition_scheduler.SCHEDULE_MODES"""
+        self.scheduler.set_mode(mode)
+
+    def latest_frame(self):
+        """Return the newest captured frame not yet displayed, if any"""
+        subscription = self.display_subscription
+        return subscription.read() if subscription is not None else None
+
+    def recognition_loop(self):
+        subscription = self.recognition_subscription
+        while not self.stop_event.is_set():
+            # Sleep in short steps so a switch to a faster mode takes effect quickly
+            delay = self.scheduler.delay()
+            if delay > 0:
+                self.stop_event.wait(min(delay, 0.05))
+                continue
+            
+            frame = subscription.wait(timeout=0.1)
+            if frame is None:
+                continue
+            started = time.monotonic()
+            try:
+                with TRACER.span('recognize'):
+                    result = self.recognizer.recognize(frame, frame_time=subscription.timestamp)
+                gesture = self.recognizer.confirm_gesture(result.gesture, result.frame_time)
+            except Exception as e:
+                print(f"Error recognizing gesture: {str(e)}")
+                continue
+            finally:
+                self.scheduler.record(started, time.monotonic() - started)
+            self.result_ready.emit(gesture, result, frame)
@@ -0,0 +1,240 @@
+"""Offline accuracy and latency evaluation on labelled recordings.
+
+Usage:
+    python -m pages.game_page.evaluate session.rpsrec dataset/ -o eval.json
+    python -m pages.game_page.evaluate session.rpsrec --baseline eval.json
+
+The headless counterpart of the in-game accuracy test. Every input is
+replayed frame by frame through a fresh GestureRecognizer, and the reported
+gesture is compared with the frame's label. The report contains:
+- a confusion matrix, and precision and recall per gesture;
+- time to stable detection: how long after a labelled gesture starts the
+  recognizer's stable gesture first matches it;
+- p50/p95/p99 latency of full recognition passes, and the share of frames
+  for which the motion gate reused the previous result instead. Reused
+  frames take microseconds, so mixing them in would hide slower recognition.
+
+Inputs are evaluated in parallel, one worker process per input, because
+the background model and the vote history need each stream in order. With
+--baseline the run is compared with an earlier report, and the command
+exits non-zero when accuracy, latency or time to stable got worse than the
+thresholds allow.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pages.game_page.batch import iter_shard, plan_shards
+from pages.game_page.benchmark import environment, summarize
+from pages.game_page.frame_source import GESTURE_NAMES, open_source
+from pages.game_page.gesture_recognition import PREPROCESS_PROFILES
+
+# Column for labelled frames where no gesture was reported
+NO_GESTURE = 'none'
+
+
+def source_fps(spec):
+    source = open_source(spec)
+    fps = source.fps if source.open() else 30.0
+    source.release()
+    return fps
+
+
+def evaluate_input(shard):
+    """Replay one input and return its labels, predictions, latencies and stabilization delays"""
+    labels = []
+    predictions = []
+    # Latencies of full recognition passes only
+    latencies = []
+    frames = 0
+    # Frames from the start of each labelled segment until the stable gesture matched, None if it never did
+    delays = []
+    segment_label = None
+    segment_start = 0
+    stabilized = False
+    for index, label, result, latency in iter_shard(shard):
+        frames += 1
+        if 'preprocess' in result.timings:
+            latencies.append(latency)
+        if label != segment_label:
+            if segment_label and not stabilized:
+                delays.append(None)
+            segment_label, segment_start, stabilized = label, index, False
+        if not label:
+            continue
+        labels.append(label)
+        predictions.append(result.gesture or NO_GESTURE)
+        if not stabilized and result.stable_gesture == label:
+            delays.append(index - segment_start)
+            stabilized = True
+    if segment_label and not stabilized:
+        delays.append(None)
+    return {'labels': labels, 'predictions': predictions, 'latencies': latencies, 'frames': frames,
+            'delays': delays, 'fps': source_fps(shard[0])}
+
+
+def confusion_matrix(labels, predictions):
+    """Counts with one row per true gesture and one column per reported gesture (or none)"""
+    columns = GESTURE_NAMES + [NO_GESTURE]
+    matrix = np.zeros((len(GESTURE_NAMES), len(columns)), dtype=np.int64)
+    rows = np.array([GESTURE_NAMES.index(label) for label in labels], dtype=np.int64)
+    cols = np.array([columns.index(prediction) for prediction in predictions], dtype=np.int64)
+    np.add.at(matrix, (rows, cols), 1)
+    return matrix
+
+
+def class_metrics(matrix):
+    """Precision, recall and support per gesture from a confusion matrix"""
+    metrics = {}
+    for i, name in enumerate(GESTURE_NAMES):
+        reported = matrix[:, i].sum()
+        support = matrix[i].sum()
+        metrics[name] = {
+            'precision': round(float(matrix[i, i] / reported), 4) if reported else None,
+            'recall': round(float(matrix[i, i] / support), 4) if support else None,
+            'support': int(support),
+        }
+    return metrics
+
+
+def build_report(inputs, outcomes, profile):
+    labels = [label for outcome in outcomes for label in outcome['labels']]
+    predictions = [prediction for outcome in outcomes for prediction in outcome['predictions']]
+    latencies = [latency for outcome in outcomes for latency in outcome['latencies']]
+    frames = sum(outcome['frames'] for outcome in outcomes)
+    matrix = confusion_matrix(labels, predictions)
+
+    # Delays are measured in frames of each input, so convert them with that input's frame rate
+    delays_ms = [delay * 1000.0 / outcome['fps'] for outcome in outcomes
+                 for delay in outcome['delays'] if delay is not None]
+    segments = sum(len(outcome['delays']) for outcome in outcomes)
+    time_to_stable = {'segments': segments, 'stabilized': len(delays_ms)}
+    if delays_ms:
+        time_to_stable.update(summarize(delays_ms))
+
+    return {
+        'environment': environment(),
+        'inputs': inputs,
+        'profile': profile,
+        'frames': frames,
+        'full_passes': len(latencies),
+        'labelled': len(labels),
+        'accuracy': round(float(np.trace(matrix) / len(labels)), 4) if labels else None,
+        'classes': class_metrics(matrix),
+        'confusion': {'rows': GESTURE_NAMES, 'columns': GESTURE_NAMES + [NO_GESTURE], 'matrix': matrix.tolist()},
+        'time_to_stable': time_to_stable,
+        'latency': summarize(latencies) if latencies else None,
+        'reuse_rate': round(1 - len(latencies) / frames, 4) if frames else None,
+    }
+
+
+def find_regressions(report, baseline, accuracy_threshold, latency_threshold):
+    """Return messages for metrics that got worse than the thresholds allow"""
+    regressions = []
+
+    def worse(name, old, new, threshold, relative):
+        if old is None or new is None:
+            return
+        change = (new / old - 1) if relative else (old - new)
+        if relative and old <= 0:
+            return
+        if change > threshold:
+            amount = f"+{change * 100:.0f}%" if relative else f"-{change * 100:.1f} points"
+            regressions.append(f"{name}: {old} -> {new} ({amount})")
+
+    worse('accuracy', baseline.get('accuracy'), report['accuracy'], accuracy_threshold, False)
+    for name, metrics in report['classes'].items():
+        old = baseline.get('classes', {}).get(name, {})
+        worse(f"{name} recall", old.get('recall'), metrics['recall'], accuracy_threshold, False)
+        worse(f"{name} precision", old.get('precision'), metrics['precision'], accuracy_threshold, False)
+    for percentile in ('p50_ms', 'p95_ms', 'p99_ms'):
+        worse(f"latency {percentile}", (baseline.get('latency') or {}).get(percentile),
+              (report['latency'] or {}).get(percentile), latency_threshold, True)
+    worse('time to stable p50_ms', baseline.get('time_to_stable', {}).get('p50_ms'),
+          report['time_to_stable'].get('p50_ms'), latency_threshold, True)
+    return regressions
+
+
+def print_report(report, file=sys.stderr):
+    columns = report['confusion']['columns']
+    print(f"{'':<10} " + " ".join(f"{name:>9}" for name in columns), file=file)
+    for name, row in zip(report['confusion']['rows'], report['confusion']['matrix']):
+        print(f"{name:<10} " + " ".join(f"{count:>9}" for count in row), file=file)
+    print(file=file)
+
+    def percent(value):
+        return f"{value * 100:.1f}%" if value is not None else "-"
+
+    print(f"{'gesture':<10} {'precision':>9} {'recall':>9} {'support':>9}", file=file)
+    for name, metrics in report['classes'].items():
+        print(f"{name:<10} {percent(metrics['precision']):>9} {percent(metrics['recall']):>9} "
+              f"{metrics['support']:>9}", file=file)
+    print(f"Accuracy {percent(report['accuracy'])} on {report['labelled']} labelled frames", file=file)
+
+    stable = report['time_to_stable']
+    if stable['stabilized']:
+        print(f"Time to stable: p50 {stable['p50_ms']:.0f} ms, p95 {stable['p95_ms']:.0f} ms "
+              f"({stable['stabilized']}/{stable['segments']} gestures stabilized)", file=file)
+    else:
+        print(f"Time to stable: no gesture stabilized ({stable['segments']} gestures)", file=file)
+    if report['latency']:
+        latency = report['latency']
+        print(f"Latency: p50 {latency['p50_ms']:.2f} ms, p95 {latency['p95_ms']:.2f} ms, "
+              f"p99 {latency['p99_ms']:.2f} ms over {report['full_passes']} full recognition passes", file=file)
+    if report['reuse_rate'] is not None:
+        print(f"Motion gate reused {percent(report['reuse_rate'])} of {report['frames']} frames", file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate gesture recognition on labelled recordings")
+    parser.add_argument('inputs', nargs='+', help="session files, video files, image directories or 'synthetic'")
+    parser.add_argument('-o', '--output', help="write the JSON report to this file (default: stdout)")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument('--profile', default='quality', choices=list(PREPROCESS_PROFILES),
+                        help="preprocessing profile")
+    parser.add_argument('--baseline', help="earlier JSON report to compare against")
+    parser.add_argument('--accuracy-threshold', type=float, default=0.02,
+                        help="allowed drop in accuracy, precision or recall (default: 0.02)")
+    parser.add_argument('--latency-threshold', type=float, default=0.10,
+                        help="allowed relative increase in latency and time to stable (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    # Each input stays in one shard so segments and the vote history are never split
+    shards = plan_shards(args.inputs, 0, 0, args.profile)
+    if not shards:
+        print("No readable inputs", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        outcomes = list(executor.map(evaluate_input, shards))
+    report = build_report(args.inputs, outcomes, args.profile)
+    print(f"Evaluated {len(shards)} inputs in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    if not report['labelled']:
+        print("No labelled frames; only latency is reported", file=sys.stderr)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(report, json.load(f), args.accuracy_threshold, args.latency_threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+from PySide6.QtGui import QImage, QPixmap
+
+from pages.game_page.tracing import TRACER
+
+
+class FrameDisplay:
+    """Converts BGR camera frames to QPixmaps sized for a display label.
+
+    Frames are downsized with OpenCV straight into a preallocated buffer that
+    a QImage in BGR888 format wraps, so there is no colour conversion and no
+    full-resolution intermediate. The buffer and its QImage are reallocated
+    only when the display size changes. QPixmap.fromImage copies the pixels,
+    so the buffer can be reused for the next frame right away.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.buffer = None
+        self.image = None
+
+    def resize(self, width, height):
+        """Change the display area that frames are fitted into"""
+        self.width = width
+        self.height = height
+
+    def fit(self, frame):
+        """Return the output size that fits the frame into the display area"""
+        h, w = frame.shape[:2]
+        scale = min(self.width / w, self.height / h)
+        return max(1, int(w * scale)), max(1, int(h * scale))
+
+    def to_pixmap(self, frame):
+        """Downsize a BGR frame into the display buffer and return it as a QPixmap"""
+        width, height = self.fit(frame)
+        if self.buffer is None or self.buffer.shape[:2] != (height, width):
+            # The QImage points into this array, which lives as long as self.buffer
+            self.buffer = np.empty((height, width, 3), dtype=np.uint8)
+            self.image = QImage(self.buffer.data, width, height, self.buffer.strides[0],
+                                QImage.Format.Format_BGR888)
+
+        # INTER_AREA looks slightly smoother but is over 10x slower for large downscales
+        with TRACER.span('display.resize'):
+            cv2.resize(frame, (width, height), dst=self.buffer, interpolation=cv2.INTER_LINEAR)
+        with TRACER.span('display.to_pixmap'):
+            return QPixmap.fromImage(self.image)
@@ -0,0 +1,382 @@
+import os
+
+import cv2
+import numpy as np
+
+from pages.game_page.session import SessionReader
+
+GESTURE_NAMES = ['rock', 'paper', 'scissors', 'lizard', 'spock']
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+SESSION_EXTENSION = '.rpsrec'
+
+
+class FrameSource:
+    """Common interface for anything that produces BGR frames.
+
+    Sources mirror the cv2.VideoCapture calls used by the game: read()
+    returns (ret, frame) and release() closes the source. Replay sources may
+    also know the expected gesture for the last frame they returned, exposed
+    as `label` (None when unknown).
+    """
+
+    # Replay sources set this so consumers can pace them at `fps`
+    realtime = False
+    fps = 30.0
+    # Set by sources whose frames were already mirrored when recorded
+    mirrored = False
+
+    def __init__(self):
+        self.label = None
+
+    def open(self):
+        """Open the source and return whether it can deliver frames"""
+        raise NotImplementedError
+
+    def is_opened(self):
+        raise NotImplementedError
+
+    def read(self):
+        """Return (ret, frame) like cv2.VideoCapture.read"""
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def frame_count(self):
+        """Return the number of frames in the source, or None if unbounded"""
+        return None
+
+    def skip(self, count):
+        """Advance past `count` frames without returning them"""
+        for _ in range(count):
+            ret, _ = self.read()
+            if not ret:
+                return
+
+    def __iter__(self):
+        while True:
+            ret, frame = self.read()
+            if not ret:
+                return
+            yield frame
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class CameraSource(FrameSource):
+    """Live frames from a camera device"""
+
+    def __init__(self, index=0):
+        super().__init__()
+        self.index = index
+        self.capture = None
+
+    def open(self):
+        self.release()
+        self.capture = cv2.VideoCapture(self.index)
+        return self.capture.isOpened()
+
+    def is_opened(self):
+        return self.capture is not None and self.capture.isOpened()
+
+    def read(self):
+        if self.capture is None:
+            return False, None
+        return self.capture.read()
+
+    def release(self):
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+
+class VideoFileSource(FrameSource):
+    """Frames decoded from a recorded video file"""
+
+    def __init__(self, path, loop=False, realtime=False, label=None):
+        super().__init__()
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self.clip_label = label
+        self.capture = None
+
+    def open(self):
+        self.release()
+        self.capture = cv2.VideoCapture(self.path)
+        if not self.capture.isOpened():
+            return False
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        self.label = self.clip_label
+        return True
+
+    def is_opened(self):
+        return self.capture is not None and self.capture.isOpened()
+
+    def read(self):
+        if self.capture is None:
+            return False, None
+        ret, frame = self.capture.read()
+        if not ret and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read()
+        return ret, frame
+
+    def frame_count(self):
+        if self.capture is None:
+            return None
+        return int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+
+    def skip(self, count):
+        if self.capture is None:
+            return
+        position = self.capture.get(cv2.CAP_PROP_POS_FRAMES)
+        self.capture.set(cv2.CAP_PROP_POS_FRAMES, position + count)
+
+    def release(self):
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+
+class ImageDirectorySource(FrameSource):
+    """Frames loaded from a directory of images in sorted order.
+
+    Images inside a sub-directory named after a gesture (e.g. `paper/`) are
+    labelled with that gesture.
+    """
+
+    def __init__(self, path, loop=False, realtime=False, fps=30.0):
+        super().__init__()
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self.fps = fps
+        self.files = []
+        self.position = 0
+
+    def open(self):
+        self.files = []
+        for root, dirs, files in os.walk(self.path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    self.files.append(os.path.join(root, name))
+        self.position = 0
+        return bool(self.files)
+
+    def is_opened(self):
+        return bool(self.files)
+
+    def read(self):
+        if self.position >= len(self.files):
+            if not self.loop or not self.files:
+                return False, None
+            self.position = 0
+
+        path = self.files[self.position]
+        self.position += 1
+        frame = cv2.imread(path)
+        if frame is None:
+            return False, None
+
+        parent = os.path.basename(os.path.dirname(path)).lower()
+        self.label = parent if parent in GESTURE_NAMES else None
+        return True, frame
+
+    def frame_count(self):
+        return len(self.files)
+
+    def skip(self, count):
+        self.position = min(self.position + count, len(self.files))
+
+
+class SessionSource(FrameSource):
+    """Frames replayed from a recorded session file (see session.py).
+
+    Frames come back in recording order with the label stored for each. In
+    realtime mode consumers pace them at the recording's average frame rate.
+    """
+
+    def __init__(self, path, loop=False, realtime=False):
+        super().__init__()
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self.reader = None
+        self.position = 0
+        self.timestamp = None
+
+    def open(self):
+        self.release()
+        try:
+            self.reader = SessionReader(self.path)
+        except (OSError, ValueError) as e:
+            print(f"Error opening session: {str(e)}")
+            return False
+        self.fps = self.reader.fps()
+        self.mirrored = self.reader.header.get('mirrored', False)
+        self.position = 0
+        return len(self.reader) > 0
+
+    def is_opened(self):
+        return self.reader is not None
+
+    def read(self):
+        if self.reader is None:
+            return False, None
+        if self.position >= len(self.reader):
+            if not self.loop or not len(self.reader):
+                return False, None
+            self.position = 0
+
+        frame, self.timestamp, self.label = self.reader.frame(self.position)
+        self.position += 1
+        if frame is None:
+            return False, None
+        return True, frame
+
+    def frame_count(self):
+        return len(self.reader) if self.reader is not None else None
+
+    def skip(self, count):
+        if self.reader is None:
+            return
+        self.position = min(self.position + count, len(self.reader))
+
+    def release(self):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+
+class SyntheticHandSource(FrameSource):
+    """Deterministic generator of simple hand silhouettes for each gesture.
+
+    Each gesture in `gestures` is held for `frames_per_gesture` frames after
+    `empty_frames` frames of plain background, so the background subtractor
+    sees the hand appear. The hand sways slowly with a little per-frame
+    jitter, like a real hand does, so it is not absorbed into the background
+    model. The same seed always produces the same frames.
+    """
+
+    # Finger angles in degrees (0 = straight up) and lengths relative to palm radius
+    FINGERS = {
+        'rock': [],
+        'paper': [(-85, 1.5), (-42, 2.0), (-12, 2.2), (18, 2.1), (48, 1.8)],
+        'scissors': [(-22, 2.1), (22, 2.1)],
+        'lizard': [(-85, 1.5), (-35, 1.5)],
+        'spock': [(-85, 1.5), (-34, 2.1), (-22, 2.2), (22, 2.1), (34, 1.8)],
+    }
+
+    def __init__(self, gestures=None, frames_per_gesture=30, empty_frames=10,
+                 width=640, height=480, seed=0, loop=False, realtime=False, fps=30.0):
+        super().__init__()
+        self.gestures = list(gestures or GESTURE_NAMES)
+        self.frames_per_gesture = frames_per_gesture
+        self.empty_frames = empty_frames
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.loop = loop
+        self.realtime = realtime
+        self.fps = fps
+        self.opened = False
+
+    def __len__(self):
+        return len(self.gestures) * (self.empty_frames + self.frames_per_gesture)
+
+    def open(self):
+        self.rng = np.random.default_rng(self.seed)
+        self.background = self.make_background()
+        self.position = 0
+        self.opened = True
+        return True
+
+    def is_opened(self):
+        return self.opened
+
+    def release(self):
+        self.opened = False
+
+    def frame_count(self):
+        return len(self)
+
+    def make_background(self):
+        background = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        gradient = np.linspace(30, 70, self.width, dtype=np.float32)
+        background[:] = gradient[np.newaxis, :, np.newaxis].astype(np.uint8)
+        return background
+
+    def read(self):
+        if not self.opened:
+            return False, None
+        if self.position >= len(self):
+            if not self.loop:
+                return False, None
+            self.position = 0
+
+        block = self.empty_frames + self.frames_per_gesture
+        gesture_index, offset = divmod(self.position, block)
+        self.position += 1
+
+        frame = self.background.copy()
+        noise = self.rng.integers(-4, 5, size=frame.shape, dtype=np.int16)
+        frame = np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+        if offset < self.empty_frames:
+            self.label = None
+            return True, frame
+
+        gesture = self.gestures[gesture_index]
+        self.label = gesture
+        phase = 2 * np.pi * offset / 20.0
+        sway = np.array([np.sin(phase), 0.5 * np.cos(phase)]) * 20 * min(self.width, self.height) / 480.0
+        jitter = sway + self.rng.integers(-3, 4, size=2)
+        self.draw_hand(frame, gesture, jitter)
+        return True, frame
+
+    def draw_hand(self, frame, gesture, jitter):
+        """Draw a palm with extended fingers for the given gesture"""
+        scale = min(self.width, self.height) / 480.0
+        radius = int(70 * scale)
+        finger_width = max(2, int(26 * scale))
+        cx = self.width // 2 + int(jitter[0])
+        cy = self.height // 2 + int(60 * scale) + int(jitter[1])
+        skin = (140, 170, 210)
+
+        cv2.ellipse(frame, (cx, cy), (radius, int(radius * 1.1)), 0, 0, 360, skin, -1)
+        for angle, length in self.FINGERS[gesture]:
+            theta = np.deg2rad(angle)
+            base = (int(cx + np.sin(theta) * radius * 0.7), int(cy - np.cos(theta) * radius * 0.7))
+            tip = (int(cx + np.sin(theta) * radius * length), int(cy - np.cos(theta) * radius * length))
+            cv2.line(frame, base, tip, skin, finger_width)
+            cv2.circle(frame, tip, finger_width // 2, skin, -1)
+
+
+def open_source(spec, live=False):
+    """Create a frame source from a command-line style specification.
+
+    Accepted forms are a camera index ("0"), "synthetic" or
+    "synthetic:rock,paper", a directory of images, a recorded session
+    (.rpsrec), or a video file path. With `live`, sources other than
+    cameras are paced at their frame rate and looped, so they stand in
+    for a camera instead of ending after one pass at decode speed.
+    """
+    spec = str(spec)
+    if spec.isdigit():
+        return CameraSource(int(spec))
+    if spec.startswith('synthetic'):
+        _, _, names = spec.partition(':')
+        gestures = [name for name in names.split(',') if name] or None
+        return SyntheticHandSource(gestures, loop=live, realtime=live)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, loop=live, realtime=live)
+    if spec.endswith(SESSION_EXTENSION):
+        return SessionSource(spec, loop=live, realtime=live)
+    return VideoFileSource(spec, loop=live, realtime=live)
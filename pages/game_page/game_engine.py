@@ -0,0 +1,98 @@
+"""Scoring and round history of a match, independent of any UI.
+
+GamePage drives a GameEngine from its widgets and the game server drives
+one per remote match; neither needs the other's code.
+"""
+import random
+
+import numpy as np
+
+from pages.game_page.game_rules import DEFAULT_RULES, LOSS, TIE, WIN
+from pages.game_page.strategies import STRATEGIES
+
+CHOICES = list(DEFAULT_RULES.gestures)
+# Who won a round, by outcome for the player
+WINNERS = {WIN: "You", TIE: "Tie", LOSS: "Pi"}
+
+
+def determine_winner(comp, player, rules=DEFAULT_RULES):
+    """Return ('Pi', 'You' or 'Tie', result message) for one pair of moves"""
+    outcome = rules.outcome(player, comp)
+    if outcome == TIE:
+        return "Tie", "It's a Tie!"
+    prefix = "You Win!" if outcome == WIN else "Pi Wins!"
+    return WINNERS[outcome], f"{prefix} {rules.message(player, comp)}"
+
+
+class GameEngine:
+    """One match between a player and the computer ("Pi") under a RuleSet.
+
+    `opponent` names the computer's strategy in STRATEGIES; 'random' plays
+    from `choices` with `rng`. A learning opponent is updated with each
+    round as it is played, so it never rescans the game history.
+    """
+
+    def __init__(self, choices=None, rng=None, rules=None, opponent='random'):
+        self.rules = rules or DEFAULT_RULES
+        self.choices = list(choices or self.rules.gestures)
+        self.rng = rng or random.Random()
+        if opponent not in STRATEGIES:
+            raise ValueError(f"Unknown opponent: {opponent!r}")
+        self.opponent = opponent
+        self.reset()
+
+    def reset(self):
+        self.player_score = 0
+        self.computer_score = 0
+        self.game_history = []
+        # The opponent model starts over with each match
+        self.strategy = None
+        if self.opponent != 'random':
+            generator = np.random.default_rng(self.rng.getrandbits(64))
+            self.strategy = STRATEGIES[self.opponent](self.rules, 1, generator)
+
+    def computer_move(self):
+        if self.strategy is None:
+            return self.rng.choice(self.choices)
+        return self.rules.gestures[int(self.strategy.move()[0])]
+
+    def play_round(self, player_move, computer_move=None, learn=True):
+        """Score one round and return its history entry.
+
+        With learn=False the opponent does not learn from the player's
+        move, for moves the player did not choose, such as a random
+        fallback when no gesture was detected.
+        """
+        if player_move not in self.choices:
+            raise ValueError(f"Unknown move: {player_move!r}")
+        if computer_move is None:
+            computer_move = self.computer_move()
+
+        winner, message = determine_winner(computer_move, player_move, self.rules)
+        if self.strategy is not None and learn:
+            self.strategy.update(np.array([self.rules.index[computer_move]]),
+                                 np.array([self.rules.index[player_move]]))
+        if winner == "Pi":
+            self.computer_score += 1
+        elif winner == "You":
+            self.player_score += 1
+
+        entry = {
+            "round": len(self.game_history) + 1,
+            "player_move": player_move,
+            "computer_move": computer_move,
+            "winner": winner,
+            "message": message,
+            "player_score": self.player_score,
+            "computer_score": self.computer_score,
+        }
+        self.game_history.append(entry)
+        return entry
+
+    def overall_winner(self):
+        """'You', 'Pi' or 'Tie' for the match so far"""
+        if self.player_score > self.computer_score:
+            return "You"
+        if self.computer_score > self.player_score:
+            return "Pi"
+        return "Tie"
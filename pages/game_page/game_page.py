@@ -4,16 +4,24 @@ from PySide6.QtWidgets import (
     QMessageBox, QHBoxLayout
 )
 from PySide6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QTimer, QPoint, QByteArray, QSize
-from PySide6.QtGui import QFont, QPixmap, QImage, QColor
+from PySide6.QtGui import QFont, QPixmap, QColor
 import random
-import cv2
-import numpy as np
+import time
 from pages.widgets.vs_widget import VSWidget
 from pages.game_page.gesture_recognition import GestureRecognizer
+from pages.game_page.camera_worker import CameraPipeline
+from pages.game_page.camera_service import CameraService
+from pages.game_page.frame_display import FrameDisplay
+from pages.game_page.overlay import OverlayRenderer
+from pages.game_page.session import SessionRecorder
+from pages.game_page.gesture_dataset import DEFAULT_DATASET_PATH, GestureDataset
+from pages.game_page.game_engine import CHOICES, GameEngine
+from pages.game_page.telemetry import TELEMETRY
+from pages.game_page.tracing import TRACER
 from collections import Counter
 
 class CameraWindow(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, service=None):
         super().__init__(parent)
         self.setWindowTitle("Camera Feed")
         self.setFixedSize(640, 480)
@@ -23,16 +31,20 @@ class CameraWindow(QDialog):
         layout.addWidget(self.label)
         self.setLayout(layout)
         
-        self.capture = None
+        # The window shares the camera with the game instead of opening it again
+        self.service = service if service is not None else CameraService()
+        self.subscription = None
+        self.display = FrameDisplay(self.label.width(), self.label.height())
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_frame)
         
     def start_camera(self):
         """Attempt to start the camera and return success status"""
         try:
-            self.capture = cv2.VideoCapture(0)
-            if not self.capture.isOpened():
+            if not self.service.start():
                 raise RuntimeError("Could not open camera")
+            if self.subscription is None:
+                self.subscription = self.service.subscribe(max_fps=30, name='camera_window')
             self.timer.start(30)
             return True
         except Exception as e:
@@ -40,28 +52,25 @@ class CameraWindow(QDialog):
             return False
 
     def update_frame(self):
-        if self.capture and self.capture.isOpened():
-            ret, frame = self.capture.read()
-            if ret:
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = frame.shape
-                bytes_per_line = ch * w
-                image = QImage(frame.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-                pixmap = QPixmap.fromImage(image)
-                self.label.setPixmap(pixmap.scaled(self.label.size(), Qt.AspectRatioMode.KeepAspectRatio))
+        if self.subscription is not None:
+            frame = self.subscription.read()
+            if frame is not None:
+                self.display.resize(self.label.width(), self.label.height())
+                self.label.setPixmap(self.display.to_pixmap(frame))
 
     def closeEvent(self, event):
         self.stop_camera()
         event.accept()
 
     def stop_camera(self):
-        if self.capture and self.capture.isOpened():
-            self.capture.release()
+        if self.subscription is not None:
+            self.subscription.close()
+            self.subscription = None
         self.timer.stop()
 
     def show_camera(self):
         """Show the camera window and display status message"""
-        if self.capture and self.capture.isOpened():
+        if self.start_camera():
             self.show()
             QMessageBox.information(self, "Camera Status", 
                                    "Camera is now active and showing live feed!")
@@ -70,13 +79,32 @@ class CameraWindow(QDialog):
                                "Camera is not available. Please check your camera connection.")
 
 class GamePage(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, frame_source=None, profile='quality', opponent='adaptive'):
         super().__init__(parent)
-        self.gesture_recognizer = GestureRecognizer()
+        self.gesture_recognizer = GestureRecognizer(profile)
+        # Ignore votes older than a second, whatever rate recognition runs at
+        self.gesture_recognizer.gesture_history.max_age = 1.0
+        # One service owns the camera; the pipeline and camera window subscribe to it
+        self.camera_service = CameraService(frame_source)
+        self.camera_pipeline = None
+        self.live_display = FrameDisplay(250, 250)
+        # The live feed shows the newest recognition result, picked up at most 15 times a second
+        self.live_overlay = OverlayRenderer(max_fps=15)
+        self.latest_result = None
+        self.overlay_result = None
+        self.live_pixmap = None
         self.camera_window = None
+        self.session_recorder = None
         self.camera_active = False
         self.player_gesture_pixmap = None
+        self.test_active = False
+        # Gesture the accuracy test is currently sampling, and where its hands are stored
+        self.test_label = None
+        self.dataset = None
+        self.dataset_session = None
+        self.last_sample_contour = None
         self.parent_window = parent
+        self.opponent = opponent
         self.init_ui()
         self.initialize_camera()
 
@@ -84,8 +112,13 @@ class GamePage(QWidget):
         """Initialize camera and show appropriate message"""
         self.camera_active = True
         try:
-            self.capture = cv2.VideoCapture(0)
-            if not self.capture.isOpened():
+            if self.camera_pipeline is None:
+                self.camera_pipeline = CameraPipeline(self.gesture_recognizer, self.camera_service, self)
+                self.camera_pipeline.frame_ready.connect(self.process_camera_frame)
+                self.camera_pipeline.result_ready.connect(self.handle_recognition_result)
+                self.camera_pipeline.camera_failed.connect(self.reinitialize_camera)
+
+            if not self.camera_pipeline.open():
                 QMessageBox.warning(self, "Camera Warning", 
                                   "Could not initialize camera. The game will use random gestures instead.\n"
                                   "You can try reconnecting your camera and restarting the game.")
@@ -93,10 +126,8 @@ class GamePage(QWidget):
                 self.live_feed_label.setText("No Camera\nRandom Mode")
                 self.live_feed_label.setStyleSheet("border: 2px solid yellow; color: yellow; font-size: 16px;")
             else:
-                # Start the camera feed timer
-                self.camera_timer = QTimer(self)
-                self.camera_timer.timeout.connect(self.process_camera_frame)
-                self.camera_timer.start(30)  # 30ms = ~33 fps
+                # Capture and recognition run on worker threads
+                self.camera_pipeline.start()
         except Exception as e:
             QMessageBox.warning(self, "Camera Warning", 
                               f"Camera initialization error: {str(e)}\nThe game will use random gestures instead.")
@@ -105,64 +136,95 @@ class GamePage(QWidget):
             self.live_feed_label.setStyleSheet("border: 2px solid yellow; color: yellow; font-size: 16px;")
 
     def process_camera_frame(self):
-        """Process camera frame and detect gestures"""
-        if not self.camera_active or not hasattr(self, 'capture'):
+        """Display the newest camera frame in the live feed, with the recognition overlay"""
+        if not self.camera_active or self.camera_pipeline is None:
             return
 
-        try:
-            if not self.capture.isOpened():
-                self.reinitialize_camera()
-                return
-
-            ret, frame = self.capture.read()
-            if not ret or frame is None or frame.size == 0:
-                self.reinitialize_camera()
+        with TRACER.span('ui.process_camera_frame'):
+            # Frames that arrived while the GUI was busy have already been dropped
+            frame = self.camera_pipeline.latest_frame()
+            if frame is None:
                 return
 
-            # Flip the frame horizontally for a more natural view
-            frame = cv2.flip(frame, 1)
-            
-            # Process frame with gesture recognizer
-            gesture, processed_frame = self.gesture_recognizer.process_frame(frame)
-            
-            # Convert frame to QPixmap for display
             try:
-                processed_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = processed_frame.shape
-                bytes_per_line = ch * w
-                image = QImage(processed_frame.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-                pixmap = QPixmap.fromImage(image)
-                
-                # Display in the player's gesture area
-                self.live_feed_label.setPixmap(pixmap.scaled(250, 250, Qt.AspectRatioMode.KeepAspectRatio))
-                
-                # If a gesture is detected during countdown, store it
-                if self.timer.isActive() and gesture:
-                    self.player_gesture_pixmap = pixmap.copy()
-                    self.player_gesture = gesture
+                # Every frame gets the ROI box and instructions; the result drawn changes at the overlay's rate
+                if self.overlay_result is None or self.live_overlay.due():
+                    self.overlay_result = self.latest_result
+                if self.overlay_result is not None:
+                    frame = self.live_overlay.render(frame, self.overlay_result, self.gesture_recognizer)
+                pixmap = self.live_display.to_pixmap(frame)
+                self.live_pixmap = pixmap
+                with TRACER.span('ui.set_pixmap'):
+                    self.live_feed_label.setPixmap(pixmap)
             except Exception as e:
                 print(f"Error processing camera frame: {str(e)}")
-        except Exception as e:
-            print(f"Camera error: {str(e)}")
-            # Try to recover
-            self.reinitialize_camera()
 
-    def reinitialize_camera(self):
+    def handle_recognition_result(self, gesture, result, frame):
+        """Store a gesture recognized by the worker thread during countdown or a test"""
+        self.latest_result = result
+        if self.session_recorder is not None:
+            self.session_recorder.record_result(result, gesture)
+        if self.test_label and self.dataset is not None:
+            self.add_test_sample(result)
+        if (self.timer.isActive() or self.test_active) and gesture:
+            # The live feed already shows the overlay, so its last pixmap is the snapshot
+            if self.live_pixmap is not None:
+                self.player_gesture_pixmap = self.live_pixmap.copy()
+            self.player_gesture = gesture
+
+    def add_test_sample(self, result):
+        """Store the hand recognized while the accuracy test expects a known gesture"""
+        # Results reused by the motion gate share the previous contour
+        if result.features is None or result.contour is self.last_sample_contour:
+            return
+        self.last_sample_contour = result.contour
+        try:
+            self.dataset.add(self.test_label, result.contour, result.features,
+                             self.dataset_session, timestamp=result.frame_time or 0.0)
+        except (OSError, ValueError) as e:
+            print(f"Error storing test sample: {str(e)}")
+
+    def set_test_label(self, label):
+        """Label the samples and recorded frames that follow with the expected gesture"""
+        self.test_label = label
+        if self.session_recorder is not None:
+            self.session_recorder.label = label
+
+    def close_dataset(self):
+        """Write the test samples to disk and return how many this test added"""
+        if self.dataset is None:
+            return 0
+        added = len(self.dataset.select(session=self.dataset.sessions[self.dataset_session]))
+        try:
+            self.dataset.close()
+        except (OSError, ValueError) as e:
+            print(f"Error saving test samples: {str(e)}")
+        self.dataset = None
+        return added
+
+    def set_recognition_mode(self, mode):
+        """Recognize at full rate only while a gesture is expected"""
+        if self.camera_pipeline is not None:
+            self.camera_pipeline.set_mode(mode)
+
+    def reinitialize_camera(self, message=None):
         """Try to recover the camera connection"""
+        if message:
+            print(f"Camera error: {message}")
+        TELEMETRY.inc('camera_reinit_total')
         try:
             # Clean up existing resources
-            if hasattr(self, 'capture') and self.capture:
-                self.capture.release()
-                self.capture = None
+            self.camera_pipeline.stop()
+            self.camera_service.stop()
                 
             # Try to reopen
-            self.capture = cv2.VideoCapture(0)
-            if not self.capture.isOpened():
+            if not self.camera_pipeline.open():
                 self.camera_active = False
                 self.live_feed_label.setText("Camera Error\nRestart Game")
                 self.live_feed_label.setStyleSheet("border: 2px solid red; color: red; font-size: 16px;")
             else:
                 self.camera_active = True
+                self.camera_pipeline.start()
         except Exception as e:
             print(f"Failed to reinitialize camera: {str(e)}")
             self.camera_active = False
@@ -191,7 +253,7 @@ class GamePage(QWidget):
         """)
         
         # Expanded choices for Rock, Paper, Scissors, Lizard, Spock
-        self.choices = ["rock", "paper", "scissors", "lizard", "spock"]
+        self.choices = list(CHOICES)
         self.image_paths = {
             "rock": "assets/images/rock.png",
             "paper": "assets/images/paper.png",
@@ -382,11 +444,9 @@ class GamePage(QWidget):
         self.winner_label.setStyleSheet("color: #32CD32;")  # Light green
         main_layout.addWidget(self.winner_label)
         
-        # Game state
-        self.player_score = 0
-        self.computer_score = 0
+        # Game state: rules, scores, history and the computer's strategy live in the UI-free engine
+        self.engine = GameEngine(self.choices, opponent=self.opponent)
         self.player_gesture = None
-        self.game_history = []
         
         # Timer setup
         self.timer = QTimer()
@@ -417,6 +477,19 @@ class GamePage(QWidget):
         ai_info_action = actions_menu.addAction("Show AI Info")
         ai_info_action.triggered.connect(self.show_ai_info)
         
+        # Show the shared camera feed in its own window
+        camera_action = actions_menu.addAction("Show Camera Feed")
+        camera_action.triggered.connect(self.show_camera_window)
+        
+        # Record a per-stage trace of the camera and recognition pipeline
+        trace_action = actions_menu.addAction("Stop Profiling Trace" if TRACER.enabled else "Start Profiling Trace")
+        trace_action.triggered.connect(self.toggle_trace)
+        
+        # Record camera frames and recognition results for replay
+        recording = self.session_recorder is not None
+        record_action = actions_menu.addAction("Stop Session Recording" if recording else "Start Session Recording")
+        record_action.triggered.connect(self.toggle_recording)
+        
         # Add performance test action
         test_action = actions_menu.addAction("Test Recognition Accuracy")
         test_action.triggered.connect(self.start_performance_test)
@@ -428,6 +501,58 @@ class GamePage(QWidget):
         if sender:
             actions_menu.exec(sender.mapToGlobal(QPoint(0, sender.height())))
 
+    def show_camera_window(self):
+        """Open a larger view of the camera feed without a second camera owner"""
+        if self.camera_window is None:
+            self.camera_window = CameraWindow(self, self.camera_service)
+        self.camera_window.show_camera()
+
+    def toggle_trace(self):
+        """Start recording a trace, or stop and save it as Chrome trace JSON"""
+        if not TRACER.enabled:
+            TRACER.enable()
+            return
+        
+        TRACER.disable()
+        path = time.strftime("trace-%Y%m%d-%H%M%S.json")
+        try:
+            count = TRACER.export(path)
+            QMessageBox.information(self, "Profiling Trace",
+                                    f"Saved {count} events to {path}.\nOpen it in chrome://tracing or Perfetto.")
+        except OSError as e:
+            QMessageBox.warning(self, "Profiling Trace", f"Could not save the trace: {str(e)}")
+
+    def toggle_recording(self):
+        """Start recording the camera session, or stop and save it"""
+        if self.session_recorder is None:
+            path = time.strftime("session-%Y%m%d-%H%M%S.rpsrec")
+            try:
+                self.start_recording(path)
+            except OSError as e:
+                QMessageBox.warning(self, "Session Recording", f"Could not start recording: {str(e)}")
+            return
+        
+        path = self.session_recorder.writer.path
+        count = self.stop_recording()
+        QMessageBox.information(self, "Session Recording",
+                                f"Saved {count} frames to {path}.\n"
+                                f"Replay it with: python -m pages.game_page.replay {path}")
+
+    def start_recording(self, path, codec='jpg'):
+        """Record every camera frame and recognition result to a session file"""
+        metadata = {'profile': self.gesture_recognizer.profile_name, 'mirrored': self.camera_service.mirror,
+                    'vote_max_age': self.gesture_recognizer.gesture_history.max_age}
+        self.session_recorder = SessionRecorder(path, codec, metadata)
+        self.session_recorder.start(self.camera_service)
+
+    def stop_recording(self):
+        """Finish the session file and return the number of frames recorded"""
+        if self.session_recorder is None:
+            return 0
+        count = self.session_recorder.stop()
+        self.session_recorder = None
+        return count
+
     def show_ai_info(self):
         """Show information about the AI"""
         QMessageBox.information(self, "Game Information", 
@@ -466,6 +591,15 @@ class GamePage(QWidget):
         self.current_test_index = 0
         self.test_results = []
         self.test_countdown = 5
+        self.set_recognition_mode('active')
+        
+        # Keep the labelled hands seen during the test for training and evaluation
+        try:
+            self.dataset = GestureDataset(DEFAULT_DATASET_PATH, 'a')
+            self.dataset_session = self.dataset.add_session(time.strftime("test-%Y%m%d-%H%M%S"))
+        except (OSError, ValueError) as e:
+            print(f"Error opening gesture dataset: {str(e)}")
+            self.dataset = None
         
         # Start the test sequence
         self.show_next_test_gesture()
@@ -498,6 +632,7 @@ class GamePage(QWidget):
             # Now record the result for 2 seconds
             self.timer_label.setText("HOLD GESTURE!")
             self.detected_test_gestures = []
+            self.set_test_label(self.test_gestures[self.current_test_index])
             
             # Start sampling the detected gestures
             self.sampling_timer = QTimer()
@@ -516,6 +651,7 @@ class GamePage(QWidget):
     def complete_current_test(self):
         """Complete the current test and move to the next"""
         self.sampling_timer.stop()
+        self.set_test_label(None)
         
         # Determine the most frequent gesture detected
         if self.detected_test_gestures:
@@ -560,6 +696,8 @@ class GamePage(QWidget):
         """Process and display the test results"""
         # Reset test variables
         self.test_active = False
+        self.set_recognition_mode('idle')
+        samples = self.close_dataset()
         self.result_label.setStyleSheet("color: lightgreen; font-size: 18pt;")
         
         # Calculate accuracy
@@ -580,6 +718,9 @@ class GamePage(QWidget):
             gesture_results[gesture] = {'correct': correct, 'total': total, 'accuracy': acc}
             result_text += f"  - {gesture.upper()}: {correct}/{total} ({acc:.1f}%)\n"
         
+        if samples:
+            result_text += f"\nSaved {samples} labelled hand samples to {DEFAULT_DATASET_PATH}\n"
+        
         # Show results
         msg_box = QMessageBox(self)
         msg_box.setWindowTitle("Performance Test Results")
@@ -617,6 +758,7 @@ class GamePage(QWidget):
         
         self.time_left = 3
         self.timer_label.setText(f"Time: {self.time_left}")
+        self.set_recognition_mode('active')
         self.timer.start()
 
     def update_timer(self):
@@ -627,10 +769,12 @@ class GamePage(QWidget):
             self.timer.stop()
             self.timer_label.setText("Time: Now!")
             self.play_round()
+            self.set_recognition_mode('idle')
 
     def play_round(self):
         # Check if player gesture was detected
-        if not self.player_gesture:
+        detected = bool(self.player_gesture)
+        if not detected:
             # If camera is active but no gesture detected, notify user
             if self.camera_active:
                 self.result_label.setText("No gesture detected! Using random choice.")
@@ -640,8 +784,8 @@ class GamePage(QWidget):
             pixmap = QPixmap(self.image_paths[self.player_gesture]).scaled(250, 250, Qt.AspectRatioMode.KeepAspectRatio)
             self.live_feed_label.setPixmap(pixmap)
         
-        # For computer, choose randomly
-        comp_choice = random.choice(self.choices)
+        # The computer's strategy picks its move before seeing the player's
+        comp_choice = self.engine.computer_move()
         
         # Update display
         self.player_score_label.setText(f"Your Move: {self.player_gesture.capitalize()}")
@@ -651,40 +795,20 @@ class GamePage(QWidget):
         comp_pixmap = QPixmap(self.image_paths[comp_choice]).scaled(250, 250, Qt.AspectRatioMode.KeepAspectRatio)
         self.animate_choice(comp_pixmap)
 
-        # Determine winner
-        result = self.determine_winner(comp_choice, self.player_gesture)
-
-        # Update scores and display result
-        winner = ""
-        if "Pi" in result:
-            self.computer_score += 1
-            winner = "Pi"
-        elif "You" in result:
-            self.player_score += 1
-            winner = "You"
-        else:
-            winner = "Tie"
+        # Determine the winner, update scores and add the round to the game history
+        # A random fallback says nothing about the player, so the opponent does not learn from it
+        outcome = self.engine.play_round(self.player_gesture, comp_choice, learn=detected)
             
         # Update result and winner display
-        self.result_label.setText(f"Result: {result}")
-        self.winner_label.setText(f"Winner: {winner}")
+        self.result_label.setText(f"Result: {outcome['message']}")
+        self.winner_label.setText(f"Winner: {outcome['winner']}")
         
         # Update scoreboard
-        self.scoreboard.setText(f"You: {self.player_score}  |  Pi: {self.computer_score}")
+        self.scoreboard.setText(f"You: {self.engine.player_score}  |  Pi: {self.engine.computer_score}")
         
         # Show moves
         self.player_score_label.setText(f"Your Move: {self.player_gesture.capitalize()}")
         self.computer_score_label.setText(f"Pi's Move: {comp_choice.capitalize()}")
-        
-        # Add to game history
-        self.game_history.append({
-            "round": len(self.game_history) + 1,
-            "player_move": self.player_gesture,
-            "computer_move": comp_choice,
-            "winner": winner,
-            "player_score": self.player_score,
-            "computer_score": self.computer_score
-        })
 
     def animate_choice(self, new_pixmap: QPixmap):
         start_pos = self.computer_img.pos() - QPoint(100, 0)
@@ -701,37 +825,9 @@ class GamePage(QWidget):
         anim.start()
         self.anim = anim
 
-    def determine_winner(self, comp: str, player: str) -> str:
-        """Determine the winner using Rock, Paper, Scissors, Lizard, Spock rules"""
-        if comp == player:
-            return "It's a Tie!"
-            
-        # Define winning combinations:
-        # (winner, loser): message
-        rules = {
-            ("scissors", "paper"): "Scissors cuts Paper",
-            ("paper", "rock"): "Paper covers Rock",
-            ("rock", "lizard"): "Rock crushes Lizard",
-            ("lizard", "spock"): "Lizard poisons Spock",
-            ("spock", "scissors"): "Spock smashes Scissors",
-            ("scissors", "lizard"): "Scissors decapitates Lizard",
-            ("lizard", "paper"): "Lizard eats Paper",
-            ("paper", "spock"): "Paper disproves Spock",
-            ("spock", "rock"): "Spock vaporizes Rock",
-            ("rock", "scissors"): "Rock crushes Scissors"
-        }
-        
-        # Check who wins
-        if (comp, player) in rules:
-            return f"Pi Wins! {rules[(comp, player)]}"
-        elif (player, comp) in rules:
-            return f"You Win! {rules[(player, comp)]}"
-        else:
-            return "Error in game logic"
-
     def show_results(self):
         """Show detailed game results in a message box"""
-        if not self.game_history:
+        if not self.engine.game_history:
             QMessageBox.information(self, "Game Results", "No games played yet!")
             return
             
@@ -739,11 +835,11 @@ class GamePage(QWidget):
         results_text += f"{'Round':<6} {'Your Move':<12} {'Pi Move':<12} {'Winner':<8}\n"
         results_text += "=" * 40 + "\n"
         
-        for game in self.game_history:
+        for game in self.engine.game_history:
             results_text += f"{game['round']:<6} {game['player_move'].capitalize():<12} {game['computer_move'].capitalize():<12} {game['winner']:<8}\n"
         
         results_text += "\n" + "=" * 40 + "\n"
-        results_text += f"Final Score - You: {self.player_score}, Pi: {self.computer_score}\n"
+        results_text += f"Final Score - You: {self.engine.player_score}, Pi: {self.engine.computer_score}\n"
         results_text += f"Overall Winner: {self.get_overall_winner()}"
         
         msg_box = QMessageBox(self)
@@ -770,12 +866,8 @@ class GamePage(QWidget):
         
     def get_overall_winner(self):
         """Determine the overall winner of all games played"""
-        if self.player_score > self.computer_score:
-            return "You!"
-        elif self.computer_score > self.player_score:
-            return "Pi!"
-        else:
-            return "It's a tie!"
+        winner = self.engine.overall_winner()
+        return "It's a tie!" if winner == "Tie" else f"{winner}!"
 
     def closeEvent(self, event):
         self.cleanup_resources()
@@ -792,12 +884,13 @@ class GamePage(QWidget):
     
     def cleanup_resources(self):
         """Clean up camera and timer resources"""
-        if hasattr(self, 'capture') and self.capture and self.capture.isOpened():
-            self.capture.release()
-            self.capture = None
-        
-        if hasattr(self, 'camera_timer') and self.camera_timer.isActive():
-            self.camera_timer.stop()
+        if self.camera_pipeline is not None:
+            self.camera_pipeline.stop()
+        if self.camera_window is not None:
+            self.camera_window.close()
+        self.stop_recording()
+        self.close_dataset()
+        self.camera_service.stop()
             
         if self.timer.isActive():
             self.timer.stop()
@@ -807,5 +900,5 @@ class GamePage(QWidget):
         super().showEvent(event)
         
         # If returning to this page, reinitialize the camera
-        if not hasattr(self, 'capture') or self.capture is None or not self.capture.isOpened():
+        if self.camera_pipeline is None or not self.camera_pipeline.is_running():
             self.initialize_camera()
\ No newline at end of file
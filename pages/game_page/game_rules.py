@@ -0,0 +1,176 @@
+"""Outcome tables for Rock, Paper, Scissors and its N-gesture variants.
+
+A RuleSet turns a list of gestures and the (winner, verb, loser) rules
+between them into:
+- `outcomes`, an NxN int8 matrix with +1 where the row gesture beats the
+  column gesture, -1 where it loses and 0 for a tie;
+- `messages`, an NxN table with the text of each decided pair, such as
+  "Scissors cuts Paper".
+Scoring a round is then a table lookup. score() scores whole arrays of
+(player, computer) index pairs at once for simulations and training.
+
+Variants are JSON files in assets/rules:
+
+    {"name": "rps-7", "gestures": ["rock", "fire", ...], "cyclic": true,
+     "rules": [["rock", "pounds out", "fire"], ...]}
+
+With "cyclic", each of an odd number of gestures beats the (N-1)/2
+gestures after it in the list, wrapping around. The verb for those pairs
+is "beats" unless "rules" names one. Without "cyclic", "rules" must decide
+every pair.
+"""
+import json
+import os
+import re
+
+import numpy as np
+
+RULES_DIR = os.path.join('assets', 'rules')
+# Largest generic 'rps-N' cycle load_rules generates
+MAX_GENERATED_GESTURES = 1001
+
+# Rock, Paper, Scissors, Lizard, Spock: (winner, verb, loser)
+RPSLS_RULES = [
+    ("scissors", "cuts", "paper"),
+    ("paper", "covers", "rock"),
+    ("rock", "crushes", "lizard"),
+    ("lizard", "poisons", "spock"),
+    ("spock", "smashes", "scissors"),
+    ("scissors", "decapitates", "lizard"),
+    ("lizard", "eats", "paper"),
+    ("paper", "disproves", "spock"),
+    ("spock", "vaporizes", "rock"),
+    ("rock", "crushes", "scissors"),
+]
+
+# Outcomes from the first (player's) point of view
+WIN = 1
+TIE = 0
+LOSS = -1
+
+
+class RuleSet:
+    """Precomputed outcomes and messages of one game variant"""
+
+    def __init__(self, name, gestures, rules):
+        self.name = name
+        self.gestures = list(gestures)
+        self.index = {gesture: i for i, gesture in enumerate(self.gestures)}
+        if len(self.index) != len(self.gestures):
+            raise ValueError(f"{name}: gestures must be unique")
+
+        size = len(self.gestures)
+        self.outcomes = np.zeros((size, size), dtype=np.int8)
+        self.messages = [[None] * size for _ in range(size)]
+        for winner, verb, loser in rules:
+            w, l = self.encode_one(winner), self.encode_one(loser)
+            if w == l or self.outcomes[w, l] == LOSS:
+                raise ValueError(f"{name}: contradictory rule {winner} {verb} {loser}")
+            self.outcomes[w, l] = WIN
+            self.outcomes[l, w] = LOSS
+            self.messages[w][l] = self.messages[l][w] = f"{winner.capitalize()} {verb} {loser.capitalize()}"
+
+        undecided = (self.outcomes == TIE) & ~np.eye(size, dtype=bool)
+        if undecided.any():
+            a, b = np.argwhere(undecided)[0]
+            raise ValueError(f"{name}: no rule decides {self.gestures[a]} against {self.gestures[b]}")
+
+    def __len__(self):
+        return len(self.gestures)
+
+    def __repr__(self):
+        return f"RuleSet({self.name!r}, {len(self.gestures)} gestures)"
+
+    @classmethod
+    def cyclic(cls, name, gestures, rules=()):
+        """Balanced variant where each gesture beats the (N-1)/2 gestures after it"""
+        size = len(gestures)
+        if size % 2 == 0:
+            raise ValueError(f"{name}: a cyclic variant needs an odd number of gestures")
+        verbs = {(winner, loser): verb for winner, verb, loser in rules}
+        generated = []
+        for i, winner in enumerate(gestures):
+            for step in range(1, size // 2 + 1):
+                loser = gestures[(i + step) % size]
+                generated.append((winner, verbs.pop((winner, loser), "beats"), loser))
+        if verbs:
+            (winner, loser), verb = next(iter(verbs.items()))
+            raise ValueError(f"{name}: rule {winner} {verb} {loser} contradicts the cycle")
+        return cls(name, gestures, generated)
+
+    def encode_one(self, gesture):
+        try:
+            return self.index[gesture]
+        except KeyError:
+            raise ValueError(f"Unknown move for {self.name}: {gesture!r}") from None
+
+    def encode(self, moves):
+        """Gesture indices of a sequence of gesture names, as an int array"""
+        return np.fromiter((self.encode_one(move) for move in moves), dtype=np.intp, count=len(moves))
+
+    def outcome(self, player, computer):
+        """WIN, TIE or LOSS for the player in one round of gesture names"""
+        return int(self.outcomes[self.encode_one(player), self.encode_one(computer)])
+
+    def message(self, a, b):
+        """Text of the rule deciding two gestures, None for a tie"""
+        return self.messages[self.encode_one(a)][self.encode_one(b)]
+
+    def score(self, players, computers):
+        """Outcomes for the player of many rounds at once.
+
+        `players` and `computers` are broadcastable integer arrays of
+        gesture indices; the result is an int8 array of WIN, TIE and LOSS.
+        """
+        return self.outcomes[players, computers]
+
+    def tally(self, players, computers):
+        """(wins, ties, losses) of the player over many rounds"""
+        counts = np.bincount((self.score(players, computers) + 1).ravel(), minlength=3)
+        return int(counts[2]), int(counts[1]), int(counts[0])
+
+
+def rule_set_from_config(config):
+    name = config.get('name', 'custom')
+    rules = [tuple(rule) for rule in config.get('rules', [])]
+    if config.get('cyclic'):
+        return RuleSet.cyclic(name, config['gestures'], rules)
+    return RuleSet(name, config['gestures'], rules)
+
+
+def load_variant(name, max_gestures=MAX_GENERATED_GESTURES):
+    """Load a variant by name only: 'rpsls', a file in RULES_DIR, or 'rps-N' for a generic cycle"""
+    if name == DEFAULT_RULES.name:
+        return DEFAULT_RULES
+    # Names never reach outside RULES_DIR
+    if not isinstance(name, str) or not re.fullmatch(r'[A-Za-z0-9_-]+', name):
+        raise ValueError(f"Unknown rules: {name}")
+    path = os.path.join(RULES_DIR, f"{name}.json")
+    if os.path.isfile(path):
+        return load_rules_file(path)
+
+    # Variants without a file, such as rps-101, get numbered gestures
+    match = re.fullmatch(r'rps-(\d+)', name)
+    if match:
+        size = int(match.group(1))
+        if size > max_gestures:
+            raise ValueError(f"{name}: at most {max_gestures} gestures")
+        return RuleSet.cyclic(name, [f"gesture{i + 1}" for i in range(size)])
+    raise ValueError(f"Unknown rules: {name}")
+
+
+def load_rules_file(path):
+    with open(path) as f:
+        return rule_set_from_config(json.load(f))
+
+
+def load_rules(name_or_path=None):
+    """Load a variant from a rules file, or by name as load_variant() does"""
+    if name_or_path is None:
+        return DEFAULT_RULES
+    if os.path.isfile(name_or_path):
+        return load_rules_file(name_or_path)
+    return load_variant(name_or_path)
+
+
+DEFAULT_RULES = RuleSet('rpsls', ["rock", "paper", "scissors", "lizard", "spock"], RPSLS_RULES)
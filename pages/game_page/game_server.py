@@ -0,0 +1,248 @@
+"""Headless game server hosting many concurrent matches over local TCP.
+
+Usage:
+    python -m pages.game_page.game_server --port 8765
+
+Clients send one JSON object per line and get one JSON reply per line. A
+request may carry an "id", which is echoed in its reply.
+
+    {"op": "new_match"}                                 -> {"match": "m1", "gestures": [...]}
+    {"op": "new_match", "rules": "rps-7"}               -> a match of another variant, see game_rules
+    {"op": "new_match", "opponent": "random"}           -> another computer strategy, see strategies
+    {"op": "play", "match": "m1", "gesture": "rock"}    -> the round's history entry
+    {"op": "frame", "match": "m1", "image": BASE64}     -> {"gesture": "rock" or null}
+    {"op": "play", "match": "m1"}                       -> round played with the last recognized gesture
+    {"op": "history", "match": "m1"}                    -> {"rounds": [history entries]}
+    {"op": "end", "match": "m1"}                        -> final scores and winner
+    {"op": "stats"}                                     -> server counters
+
+Frames are JPEG or PNG images encoded in base64. They are recognized
+server-side by a GestureRecognizer owned by the match, so a client can
+stream its camera the way the game does. Recognition runs on a thread pool
+(OpenCV releases the GIL) and never blocks the event loop. A failed
+request gets {"error": message}. Matches end when their connection closes.
+"""
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from pages.game_page.game_engine import GameEngine
+from pages.game_page.game_rules import load_rules, load_variant
+from pages.game_page.gesture_recognition import PREPROCESS_PROFILES, GestureRecognizer
+from pages.game_page.strategies import STRATEGIES
+from pages.game_page.telemetry import TELEMETRY
+
+DEFAULT_PORT = 8765
+# Longest accepted request line, large enough for a base64 encoded 1080p JPEG
+MAX_MESSAGE_SIZE = 8 * 1024 * 1024
+OPS = ('new_match', 'frame', 'play', 'history', 'end', 'stats')
+# Largest generated 'rps-N' variant clients may ask for
+MAX_CLIENT_GESTURES = 101
+# Variants kept loaded for later matches, besides the default one
+MAX_CACHED_VARIANTS = 16
+
+
+class Match:
+    """Server-side state of one match"""
+
+    def __init__(self, match_id, profile, rules, opponent):
+        self.id = match_id
+        self.profile = profile
+        self.engine = GameEngine(rng=random.Random(), rules=rules, opponent=opponent)
+        self.recognizer = None
+        self.gesture = None
+        # Keeps frames and rounds of one match in order
+        self.lock = asyncio.Lock()
+
+    def recognize(self, data):
+        """Decode and recognize one frame; runs on a worker thread"""
+        if not isinstance(data, str) or not data:
+            raise ValueError("Frame must be a non-empty base64 string")
+        image = np.frombuffer(base64.b64decode(data, validate=True), dtype=np.uint8)
+        if not image.size:
+            raise ValueError("Frame is empty")
+        frame = cv2.imdecode(image, cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError("Could not decode frame")
+        if self.recognizer is None:
+            self.recognizer = GestureRecognizer(self.profile)
+        self.gesture = self.recognizer.recognize(frame).gesture
+        return self.gesture
+
+
+class GameServer:
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, profile='fast', workers=None, rules=None,
+                 opponent='adaptive'):
+        self.host = host
+        self.port = port
+        self.profile = profile
+        self.opponent = opponent
+        self.rules = load_rules(rules)
+        # Variants requested by clients, most recently loaded last
+        self.variants = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count(), thread_name_prefix="recognize")
+        self.matches = {}
+        self.match_ids = itertools.count(1)
+        self.counts = {'matches': 0, 'rounds': 0, 'frames': 0, 'connections': 0}
+        self.server = None
+        self.telemetry = TELEMETRY
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port,
+                                                 limit=MAX_MESSAGE_SIZE)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        owned = set()
+        self.counts['connections'] += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(b'{"error": "Message too long"}\n')
+                    break
+                if not line:
+                    break
+                started = time.perf_counter()
+                request = {}
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("Request must be a JSON object")
+                    reply = await self.handle(request, owned)
+                except KeyError as e:
+                    reply = {'error': f"Missing field {e}"}
+                except (ValueError, TypeError) as e:
+                    reply = {'error': str(e)}
+                except (cv2.error, OSError) as e:
+                    # A bad frame or file must not cost the client its other matches
+                    reply = {'error': f"{type(e).__name__}: {e}"}
+                if not isinstance(request, dict):
+                    request = {}
+                if 'id' in request:
+                    reply['id'] = request['id']
+                if self.telemetry is not None:
+                    self.telemetry.observe('server_request_latency_ms', (time.perf_counter() - started) * 1000,
+                                           op=str(request.get('op')))
+                writer.write(json.dumps(reply).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for match_id in owned:
+                self.matches.pop(match_id, None)
+            self.counts['connections'] -= 1
+            self.update_gauges()
+            writer.close()
+
+    async def handle(self, request, owned):
+        """Answer one request"""
+        op = request['op']
+        if op not in OPS:
+            raise ValueError(f"Unknown op: {op}")
+        if self.telemetry is not None:
+            self.telemetry.inc('server_requests_total', op=op)
+
+        if op == 'new_match':
+            rules = await self.variant(request.get('rules'))
+            match = Match(f"m{next(self.match_ids)}", self.profile, rules, request.get('opponent') or self.opponent)
+            self.matches[match.id] = match
+            owned.add(match.id)
+            self.counts['matches'] += 1
+            self.update_gauges()
+            return {'match': match.id, 'gestures': rules.gestures}
+        if op == 'stats':
+            return dict(self.counts, active_matches=len(self.matches))
+
+        match = self.matches.get(request.get('match'))
+        if match is None:
+            raise ValueError(f"Unknown match: {request.get('match')}")
+        async with match.lock:
+            if op == 'frame':
+                loop = asyncio.get_running_loop()
+                gesture = await loop.run_in_executor(self.executor, match.recognize, request['image'])
+                self.counts['frames'] += 1
+                return {'gesture': gesture}
+            if op == 'play':
+                gesture = request.get('gesture') or match.gesture
+                if gesture is None:
+                    raise ValueError("No gesture given or recognized")
+                self.counts['rounds'] += 1
+                return match.engine.play_round(gesture)
+            if op == 'history':
+                return {'rounds': match.engine.game_history}
+            if op == 'end':
+                self.matches.pop(match.id, None)
+                owned.discard(match.id)
+                self.update_gauges()
+                engine = match.engine
+                return {'winner': engine.overall_winner(), 'rounds': len(engine.game_history),
+                        'player_score': engine.player_score, 'computer_score': engine.computer_score}
+
+    async def variant(self, name):
+        """RuleSet of a client-requested variant name; files are only looked up in RULES_DIR"""
+        if not name or name == self.rules.name:
+            return self.rules
+        if name not in self.variants:
+            # Building a large variant takes a while, so keep it off the event loop
+            loop = asyncio.get_running_loop()
+            rules = await loop.run_in_executor(self.executor, load_variant, name, MAX_CLIENT_GESTURES)
+            if len(self.variants) >= MAX_CACHED_VARIANTS:
+                self.variants.pop(next(iter(self.variants)))
+            self.variants[name] = rules
+        return self.variants[name]
+
+    def update_gauges(self):
+        if self.telemetry is not None:
+            self.telemetry.set('server_active_matches', len(self.matches))
+            self.telemetry.set('server_connections', self.counts['connections'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host Rock, Paper, Scissors, Lizard, Spock matches over TCP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--profile', default='fast', choices=list(PREPROCESS_PROFILES),
+                        help="preprocessing profile for frames recognized on the server")
+    parser.add_argument('--workers', type=int, help="recognition threads (default: one per CPU)")
+    parser.add_argument('--opponent', default='adaptive', choices=list(STRATEGIES), help="computer strategy")
+    parser.add_argument('--rules', help="default game variant: a rules file or name such as rps-7 (default: rpsls)")
+    parser.add_argument('--metrics-port', type=int, help="serve metrics on http://127.0.0.1:PORT/metrics")
+    args = parser.parse_args(argv)
+
+    if args.metrics_port:
+        TELEMETRY.serve(args.metrics_port)
+    server = GameServer(args.host, args.port, args.profile, args.workers, args.rules, args.opponent)
+
+    async def run():
+        await server.start()
+        print(f"Serving matches on {args.host}:{server.port}", file=sys.stderr)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
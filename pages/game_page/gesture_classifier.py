@@ -0,0 +1,89 @@
+"""Learned gesture classifier over gesture_features.feature_vector() outputs.
+
+A multinomial logistic regression in plain NumPy: features are standardized
+and scored with one matrix product, so classifying a frame takes a few
+microseconds and many frames can be classified in a single call. Models
+are trained with `python -m pages.game_page.train_classifier` and stored
+as .npz files.
+"""
+import os
+
+import numpy as np
+
+from pages.game_page.frame_source import GESTURE_NAMES
+from pages.game_page.gesture_features import FEATURE_NAMES
+
+# Loaded by GestureRecognizer at startup when present
+DEFAULT_MODEL_PATH = os.path.join('models', 'gesture_classifier.npz')
+
+
+class GestureClassifier:
+    """Softmax regression from feature vectors to gesture probabilities"""
+
+    def __init__(self, classes=None, mean=None, scale=None, weights=None, bias=None):
+        self.classes = list(classes or GESTURE_NAMES)
+        n_features = len(FEATURE_NAMES)
+        self.mean = np.zeros(n_features, np.float32) if mean is None else mean
+        self.scale = np.ones(n_features, np.float32) if scale is None else scale
+        self.weights = np.zeros((n_features, len(self.classes)), np.float32) if weights is None else weights
+        self.bias = np.zeros(len(self.classes), np.float32) if bias is None else bias
+
+    def fit(self, features, labels, epochs=500, learning_rate=0.5, l2=1e-3):
+        """Train on an (N, F) feature array and a sequence of N gesture names"""
+        features = np.asarray(features, dtype=np.float64)
+        targets = np.array([self.classes.index(label) for label in labels])
+        one_hot = np.eye(len(self.classes))[targets]
+
+        # Standardize so a single learning rate suits every feature
+        self.mean = features.mean(axis=0)
+        self.scale = np.where(features.std(axis=0) > 1e-6, features.std(axis=0), 1.0)
+        x = (features - self.mean) / self.scale
+
+        weights = np.zeros((x.shape[1], len(self.classes)))
+        bias = np.zeros(len(self.classes))
+        for _ in range(epochs):
+            gradient = (softmax(x @ weights + bias) - one_hot) / len(x)
+            weights -= learning_rate * (x.T @ gradient + l2 * weights)
+            bias -= learning_rate * gradient.sum(axis=0)
+
+        self.mean = self.mean.astype(np.float32)
+        self.scale = self.scale.astype(np.float32)
+        self.weights = weights.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        return self
+
+    def predict_proba(self, features):
+        """Return an (N, classes) probability array for an (N, F) feature array"""
+        x = (np.asarray(features, dtype=np.float32) - self.mean) / self.scale
+        return softmax(x @ self.weights + self.bias)
+
+    def predict(self, features):
+        """Return the most likely gesture name for every row of an (N, F) array"""
+        return [self.classes[i] for i in self.predict_proba(features).argmax(axis=1)]
+
+    def classify(self, features):
+        """Return a {gesture: probability} dict for one feature vector"""
+        probabilities = self.predict_proba(features[np.newaxis])[0]
+        return {name: float(p) for name, p in zip(self.classes, probabilities)}
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez(path, classes=np.array(self.classes), feature_names=np.array(FEATURE_NAMES),
+                 mean=self.mean, scale=self.scale, weights=self.weights, bias=self.bias)
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved model; raise ValueError if it was trained on other features"""
+        with np.load(path) as data:
+            if list(data['feature_names']) != FEATURE_NAMES:
+                raise ValueError(f"{path} was trained on a different feature set")
+            return cls([str(name) for name in data['classes']], data['mean'], data['scale'],
+                       data['weights'], data['bias'])
+
+
+def softmax(scores):
+    scores = scores - scores.max(axis=1, keepdims=True)
+    exp = np.exp(scores)
+    return exp / exp.sum(axis=1, keepdims=True)
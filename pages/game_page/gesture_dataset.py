@@ -0,0 +1,354 @@
+"""Memory-mapped store of labelled hand samples for training and evaluation.
+
+Usage:
+    python -m pages.game_page.gesture_dataset add session.rpsrec synthetic -o datasets/gestures.rpsdata
+    python -m pages.game_page.gesture_dataset eval datasets/gestures.rpsdata --label rock
+    python -m pages.game_page.gesture_dataset info datasets/gestures.rpsdata
+
+A dataset is one file: a JSON header followed by one fixed-size column per
+field, each memory-mapped as a NumPy array. Every sample holds the hand
+silhouette drawn into a square mask, the feature vector computed live, the
+gesture label, and the session, frame and timestamp it came from. Selecting
+by label or session reads only the small label and session columns, and
+the feature column can be classified in one call. Columns have spare
+capacity; when it runs out the file is rewritten with twice as much.
+
+Samples come from the accuracy test in the game, from labelled recordings
+and other frame sources (`add`), and are evaluated with `eval`.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from pages.game_page.batch import iter_shard, plan_shards
+from pages.game_page.frame_source import GESTURE_NAMES
+from pages.game_page.gesture_classifier import DEFAULT_MODEL_PATH
+from pages.game_page.gesture_features import FEATURE_NAMES
+from pages.game_page.gesture_recognition import PREPROCESS_PROFILES, GestureRecognizer, RecognitionResult
+
+DEFAULT_DATASET_PATH = os.path.join('datasets', 'gestures.rpsdata')
+MAGIC = b'RPSDATA1'
+# Room for the JSON header, which lists every session name
+HEADER_SIZE = 65536
+CROP_SIZE = 96
+INITIAL_CAPACITY = 1024
+
+
+def column_layout(crop_size, feature_count):
+    """(name, dtype, shape per sample) of every column, in file order"""
+    return [
+        ('label', np.int8, ()),  # Index into GESTURE_NAMES, -1 when unknown
+        ('session', np.int16, ()),  # Index into the header's session names
+        ('frame', np.int32, ()),
+        ('timestamp', np.float64, ()),
+        ('scale', np.float32, ()),  # Mask pixels per original pixel
+        ('features', np.float32, (feature_count,)),
+        ('mask', np.uint8, (crop_size, crop_size)),
+    ]
+
+
+def column_offsets(layout, capacity):
+    """File offset of each column for a given capacity, 64-byte aligned"""
+    offsets = {}
+    offset = HEADER_SIZE
+    for name, dtype, shape in layout:
+        offsets[name] = offset
+        size = capacity * np.dtype(dtype).itemsize * int(np.prod(shape, dtype=np.int64))
+        offset += (size + 63) // 64 * 64
+    return offsets, offset
+
+
+def render_mask(contour, crop_size=CROP_SIZE):
+    """Draw a contour as a filled silhouette centred in a square mask; return (mask, scale)"""
+    points = contour.reshape(-1, 2).astype(np.float32)
+    x, y, w, h = cv2.boundingRect(points.astype(np.int32))
+    scale = (crop_size - 4) / max(w, h, 1)
+    offset = np.array([(crop_size - w * scale) / 2, (crop_size - h * scale) / 2], dtype=np.float32)
+    scaled = np.round((points - (x, y)) * scale + offset).astype(np.int32)
+    mask = np.zeros((crop_size, crop_size), dtype=np.uint8)
+    cv2.fillPoly(mask, [scaled], 255)
+    return mask, scale
+
+
+def mask_contour(mask, scale):
+    """Recover a hand contour at its original size from a stored mask"""
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+    contour = max(contours, key=cv2.contourArea)
+    return np.round(contour / scale).astype(np.int32)
+
+
+class GestureDataset:
+    """Labelled hand samples in a single memory-mapped file.
+
+    Open with mode 'r' to read, or 'a' to add samples (the file is created
+    if it does not exist). Column arrays such as `labels` and `features`
+    are views of the file covering only the stored samples.
+    """
+
+    def __init__(self, path=DEFAULT_DATASET_PATH, mode='r', crop_size=CROP_SIZE):
+        self.path = path
+        self.mode = mode
+        if mode == 'a' and not os.path.exists(path):
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.header = {'count': 0, 'capacity': INITIAL_CAPACITY, 'crop_size': crop_size,
+                           'feature_names': FEATURE_NAMES, 'labels': GESTURE_NAMES, 'sessions': []}
+            self.write_file(path, {})
+        self.open()
+
+    def open(self):
+        with open(self.path, 'rb') as file:
+            data = file.read(HEADER_SIZE)
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a gesture dataset")
+        self.header = json.loads(data[len(MAGIC):].rstrip(b'\0'))
+        self.layout = column_layout(self.header['crop_size'], len(self.header['feature_names']))
+        capacity = self.header['capacity']
+        offsets, _ = column_offsets(self.layout, capacity)
+        map_mode = 'r+' if self.mode == 'a' else 'r'
+        self.columns = {name: np.memmap(self.path, dtype=dtype, mode=map_mode, offset=offsets[name],
+                                        shape=(capacity,) + shape)
+                        for name, dtype, shape in self.layout}
+
+    def write_file(self, path, columns):
+        """Write a header and (partially filled) columns to `path`"""
+        header = json.dumps(self.header).encode()
+        if len(MAGIC) + len(header) > HEADER_SIZE:
+            raise ValueError("Dataset header is full; too many sessions")
+        offsets, end = column_offsets(column_layout(self.header['crop_size'], len(self.header['feature_names'])),
+                                      self.header['capacity'])
+        with open(path, 'wb') as file:
+            file.write(MAGIC + header)
+            for name, values in columns.items():
+                file.seek(offsets[name])
+                file.write(np.ascontiguousarray(values).tobytes())
+            file.truncate(end)
+
+    def __len__(self):
+        return self.header['count']
+
+    def column(self, name):
+        return self.columns[name][:self.header['count']]
+
+    @property
+    def labels(self):
+        return self.column('label')
+
+    @property
+    def features(self):
+        return self.column('features')
+
+    @property
+    def masks(self):
+        return self.column('mask')
+
+    @property
+    def sessions(self):
+        return self.header['sessions']
+
+    def label_names(self, indices=None):
+        labels = self.labels if indices is None else self.labels[indices]
+        names = np.array(self.header['labels'] + [None], dtype=object)
+        return names[labels]
+
+    def select(self, label=None, session=None):
+        """Indices of the samples with a gesture label and/or from a named session"""
+        keep = np.ones(len(self), dtype=bool)
+        if label is not None:
+            keep &= self.labels == self.header['labels'].index(label)
+        if session is not None:
+            keep &= self.column('session') == self.sessions.index(session)
+        return np.flatnonzero(keep)
+
+    def add_session(self, name):
+        """Return the id of a named session, registering it if it is new"""
+        if name not in self.sessions:
+            self.sessions.append(name)
+        return self.sessions.index(name)
+
+    def add(self, label, contour, features, session=0, frame=-1, timestamp=0.0):
+        """Append one sample and return its index"""
+        count = self.header['count']
+        if count == self.header['capacity']:
+            self.grow(2 * count)
+        mask, scale = render_mask(contour, self.header['crop_size'])
+        values = {
+            'label': self.header['labels'].index(label) if label in self.header['labels'] else -1,
+            'session': session,
+            'frame': frame,
+            'timestamp': timestamp,
+            'scale': scale,
+            'features': features,
+            'mask': mask,
+        }
+        for name, value in values.items():
+            self.columns[name][count] = value
+        self.header['count'] = count + 1
+        return count
+
+    def grow(self, capacity):
+        """Rewrite the file with room for `capacity` samples"""
+        self.flush()
+        columns = {name: np.array(self.column(name)) for name, _, _ in self.layout}
+        self.columns = {}
+        self.header['capacity'] = capacity
+        temporary = self.path + '.tmp'
+        self.write_file(temporary, columns)
+        os.replace(temporary, self.path)
+        self.open()
+
+    def flush(self):
+        """Write buffered samples and the sample count to disk"""
+        if self.mode != 'a':
+            return
+        for values in self.columns.values():
+            values.flush()
+        header = json.dumps(self.header).encode()
+        if len(MAGIC) + len(header) > HEADER_SIZE:
+            raise ValueError("Dataset header is full; too many sessions")
+        with open(self.path, 'r+b') as file:
+            file.write(MAGIC + header + b'\0' * (HEADER_SIZE - len(MAGIC) - len(header)))
+
+    def close(self):
+        self.flush()
+        self.columns = {}
+
+
+def collect_shard(shard):
+    """Return (label, contour, features, frame) for every labelled hand in one shard"""
+    samples = []
+    previous = None
+    for index, label, result, _ in iter_shard(shard):
+        # Results reused by the motion gate share the previous contour
+        if label and result.features is not None and result.contour is not previous:
+            samples.append((label, result.contour, result.features, index))
+        previous = result.contour
+    return samples
+
+
+def evaluate(dataset, indices, model_path=DEFAULT_MODEL_PATH, recompute=False, profile='quality'):
+    """Classify the selected samples and return the predicted gesture names.
+
+    Stored features are classified in one batch with the trained model.
+    With `recompute`, or when there is no usable model or the stored
+    features were computed with a different feature set, each mask is
+    turned back into a contour and analyzed by a GestureRecognizer.
+    """
+    recognizer = GestureRecognizer(profile, model_path=model_path, tracking=False, motion_gate=False)
+    same_features = dataset.header['feature_names'] == FEATURE_NAMES
+    if not recompute and same_features and recognizer.classifier is not None:
+        return list(recognizer.classifier.predict(dataset.features[indices]))
+
+    predictions = []
+    scales = dataset.column('scale')
+    for i in indices:
+        contour = mask_contour(dataset.masks[i], float(scales[i]))
+        result = RecognitionResult()
+        # Every sample stands alone, so no votes carry over between them
+        recognizer.gesture_history.clear()
+        recognizer.analyze_contour(contour, result)
+        predictions.append(result.raw_gesture)
+    return predictions
+
+
+def add_command(args):
+    shards = plan_shards(args.inputs, args.chunk_size, args.warmup, args.profile)
+    if not shards:
+        print("No readable inputs", file=sys.stderr)
+        return 1
+    dataset = GestureDataset(args.output, 'a')
+    added = 0
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            for shard, samples in zip(shards, executor.map(collect_shard, shards)):
+                session = dataset.add_session(os.path.basename(shard[0]))
+                for label, contour, features, frame in samples:
+                    dataset.add(label, contour, features, session, frame)
+                added += len(samples)
+    finally:
+        dataset.close()
+    print(f"Added {added} samples to {args.output} in {time.perf_counter() - started:.1f}s "
+          f"({len(dataset)} in total)", file=sys.stderr)
+    return 0
+
+
+def eval_command(args):
+    dataset = GestureDataset(args.dataset)
+    indices = dataset.select(args.label, args.session)
+    indices = indices[dataset.labels[indices] >= 0]
+    if not len(indices):
+        print("No labelled samples selected", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    predictions = np.array(evaluate(dataset, indices, args.model, args.recompute, args.profile), dtype=object)
+    elapsed = time.perf_counter() - started
+    labels = dataset.label_names(indices)
+    correct = predictions == labels
+    print(f"Evaluated {len(indices)} samples in {elapsed:.2f}s ({elapsed / len(indices) * 1e6:.1f} us/sample)")
+    print(f"Accuracy {correct.sum()}/{len(indices)} ({100.0 * correct.mean():.1f}%)")
+    for name in GESTURE_NAMES:
+        selected = labels == name
+        if selected.any():
+            print(f"  {name:<10} {correct[selected].sum()}/{selected.sum()} ({100.0 * correct[selected].mean():.1f}%)")
+    return 0
+
+
+def info_command(args):
+    dataset = GestureDataset(args.dataset)
+    print(f"{len(dataset)} samples of {dataset.header['crop_size']}x{dataset.header['crop_size']} masks, "
+          f"capacity {dataset.header['capacity']}")
+    names, counts = np.unique(dataset.label_names().astype(str), return_counts=True)
+    print("Labels: " + ", ".join(f"{name} {count}" for name, count in zip(names, counts)))
+    sessions = np.bincount(dataset.column('session'), minlength=len(dataset.sessions))
+    for name, count in zip(dataset.sessions, sessions):
+        print(f"  {name}: {count}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and evaluate labelled gesture datasets")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="add labelled hands from recordings or other frame sources")
+    add.add_argument('inputs', nargs='+', help="session files, video files, image directories or 'synthetic'")
+    add.add_argument('-o', '--output', default=DEFAULT_DATASET_PATH, help="dataset file to add to")
+    add.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="number of worker processes")
+    add.add_argument('--chunk-size', type=int, default=0,
+                     help="frames per shard; the default 0 keeps each input in one shard, "
+                          "inputs split into chunks may yield different hands")
+    add.add_argument('--profile', default='quality', choices=list(PREPROCESS_PROFILES),
+                     help="preprocessing profile used to find the hands")
+    add.add_argument('--warmup', type=int, default=30,
+                     help="frames replayed before each shard to prime the background model")
+    add.set_defaults(run=add_command)
+
+    evaluation = commands.add_parser('eval', help="classify the samples and report accuracy")
+    evaluation.add_argument('dataset')
+    evaluation.add_argument('--label', choices=GESTURE_NAMES, help="only samples of this gesture")
+    evaluation.add_argument('--session', help="only samples from this session")
+    evaluation.add_argument('--model', default=DEFAULT_MODEL_PATH, help="trained classifier to use")
+    evaluation.add_argument('--recompute', action='store_true',
+                            help="recompute features from the stored masks instead of using the stored ones")
+    evaluation.add_argument('--profile', default='quality', choices=list(PREPROCESS_PROFILES))
+    evaluation.set_defaults(run=eval_command)
+
+    info = commands.add_parser('info', help="show sample counts per label and session")
+    info.add_argument('dataset')
+    info.set_defaults(run=info_command)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
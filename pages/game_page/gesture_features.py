@@ -0,0 +1,107 @@
+"""Vectorized hand-shape features shared by the recognizer and offline tools.
+
+analyze_defects() turns the whole convexity-defect array of a contour into
+NumPy arrays in one pass, and feature_vector() packs the shape and defect
+statistics, bounding-box descriptors and Hu moments into a fixed-length
+float32 vector described by FEATURE_NAMES.
+"""
+import cv2
+import numpy as np
+
+# A defect whose angle is at most this wide separates two extended fingers
+FINGER_ANGLE_DEGREES = 110.0
+
+FEATURE_NAMES = [
+    'finger_count',
+    'defect_count',
+    'area_ratio',
+    'complexity',
+    'angle_mean',
+    'angle_std',
+    'angle_min',
+    'angle_max',
+    'depth_mean',
+    'depth_max',
+    'depth_std',
+    'aspect_ratio',
+    'extent',
+] + [f'hu_{i}' for i in range(1, 8)]
+
+EMPTY_DEFECTS = {
+    'far_points': np.empty((0, 2), dtype=np.int32),
+    'sides': np.empty((0, 3), dtype=np.float64),
+    'angles': np.empty(0, dtype=np.float64),
+    'depths': np.empty(0, dtype=np.float64),
+    'is_finger': np.empty(0, dtype=bool),
+}
+
+
+def analyze_defects(contour, defects, finger_angle=FINGER_ANGLE_DEGREES):
+    """Compute side lengths, angles, depths and finger flags for all defects.
+
+    `contour` is the (N, 1, 2) point array the defects were computed on and
+    `defects` is the (M, 1, 4) result of cv2.convexityDefects, or None.
+    Defects no wider than `finger_angle` degrees count as finger gaps.
+    Returns a dict of arrays with one row per defect.
+    """
+    if defects is None or len(defects) == 0:
+        return dict(EMPTY_DEFECTS)
+
+    defects = defects.reshape(-1, 4)
+    points = contour.reshape(-1, 2).astype(np.float64)
+    start = points[defects[:, 0]]
+    end = points[defects[:, 1]]
+    far = points[defects[:, 2]]
+
+    # Triangle sides: a spans the two fingertips, b and c meet at the valley
+    a = np.hypot(*(end - start).T)
+    b = np.hypot(*(far - start).T)
+    c = np.hypot(*(end - far).T)
+
+    # Angle at the valley from the law of cosines, guarded against zero sides
+    cosine = (b ** 2 + c ** 2 - a ** 2) / np.maximum(2 * b * c, 0.001)
+    angles = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+    return {
+        'far_points': far.astype(np.int32),
+        'sides': np.stack((a, b, c), axis=1),
+        'angles': angles,
+        'depths': defects[:, 3] / 256.0,  # Depth is stored as fixed point
+        'is_finger': angles <= finger_angle,
+    }
+
+
+def count_fingers(analysis):
+    """Number of extended fingers, counting the thumb that rarely forms a defect"""
+    return min(int(np.count_nonzero(analysis['is_finger'])) + 1, 5)
+
+
+def hu_moments(moments):
+    """Log-scaled Hu moments, which are invariant to position, scale and rotation"""
+    hu = cv2.HuMoments(moments).ravel()
+    return -np.sign(hu) * np.log10(np.maximum(np.abs(hu), 1e-30))
+
+
+def feature_vector(analysis, area_ratio, complexity, contour):
+    """Pack shape and defect statistics into a vector ordered as FEATURE_NAMES"""
+    angles = analysis['angles']
+    depths = analysis['depths']
+    has_defects = len(angles) > 0
+    moments = cv2.moments(contour)
+    _, _, width, height = cv2.boundingRect(contour)
+    return np.array([
+        count_fingers(analysis),
+        len(angles),
+        area_ratio,
+        complexity,
+        angles.mean() if has_defects else 0.0,
+        angles.std() if has_defects else 0.0,
+        angles.min() if has_defects else 0.0,
+        angles.max() if has_defects else 0.0,
+        depths.mean() if has_defects else 0.0,
+        depths.max() if has_defects else 0.0,
+        depths.std() if has_defects else 0.0,
+        width / max(height, 1),
+        moments['m00'] / max(width * height, 1),
+        *hu_moments(moments),
+    ], dtype=np.float32)
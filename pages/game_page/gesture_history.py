@@ -0,0 +1,105 @@
+import time
+
+
+class GestureHistory:
+    """Fixed-size ring buffer of gesture votes with running per-gesture totals.
+
+    Adding a vote and asking for the stable gesture take constant time: a
+    vote's weight is added to its gesture's total when it arrives and
+    subtracted again when it is overwritten or expires. Votes can be
+    weighted (for example by classification confidence), expire after
+    `max_age` seconds, and lose half their weight every `half_life` seconds.
+    """
+
+    def __init__(self, size=5, min_votes=2, max_age=None, half_life=None):
+        self.size = size
+        self.min_votes = min_votes
+        self.max_age = max_age
+        self.half_life = half_life
+        self.clear()
+
+    def clear(self):
+        self.gestures = [None] * self.size
+        self.weights = [0.0] * self.size
+        self.times = [0.0] * self.size
+        self.start = 0
+        self.length = 0
+        # Totals per gesture; ties go to the gesture that has been in the window longest
+        self.counts = {}
+        self.votes = {}
+        # Decayed weights are stored relative to this time to avoid rescaling on every query
+        self.reference = None
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        """Iterate over the gestures from the oldest to the newest vote"""
+        for i in range(self.length):
+            yield self.gestures[(self.start + i) % self.size]
+
+    def add(self, gesture, weight=1.0, now=None):
+        """Record a vote for a gesture"""
+        now = time.monotonic() if now is None else now
+        self.expire(now)
+        if self.length == self.size:
+            self.remove_oldest()
+
+        if self.half_life:
+            if self.reference is None or now - self.reference > 20 * self.half_life:
+                self.rebase(now)
+            weight *= 2.0 ** ((now - self.reference) / self.half_life)
+
+        index = (self.start + self.length) % self.size
+        self.gestures[index] = gesture
+        self.weights[index] = weight
+        self.times[index] = now
+        self.length += 1
+        self.counts[gesture] = self.counts.get(gesture, 0) + 1
+        self.votes[gesture] = self.votes.get(gesture, 0.0) + weight
+
+    def remove_oldest(self):
+        gesture = self.gestures[self.start]
+        self.counts[gesture] -= 1
+        self.votes[gesture] -= self.weights[self.start]
+        if self.counts[gesture] == 0:
+            del self.counts[gesture]
+            del self.votes[gesture]
+        self.gestures[self.start] = None
+        self.start = (self.start + 1) % self.size
+        self.length -= 1
+
+    def expire(self, now):
+        """Drop votes older than max_age"""
+        if self.max_age is None:
+            return
+        while self.length and now - self.times[self.start] > self.max_age:
+            self.remove_oldest()
+
+    def rebase(self, now):
+        """Move the decay reference time to now so stored weights stay small"""
+        if self.reference is not None:
+            factor = 2.0 ** (-(now - self.reference) / self.half_life)
+            for i in range(self.size):
+                self.weights[i] *= factor
+            for gesture in self.votes:
+                self.votes[gesture] *= factor
+        self.reference = now
+
+    def leader(self, now=None, min_votes=1):
+        """Return (gesture, votes, weight) for the highest weighted gesture with at least min_votes votes, or None"""
+        now = time.monotonic() if now is None else now
+        self.expire(now)
+        candidates = [gesture for gesture in self.votes if self.counts[gesture] >= min_votes]
+        if not candidates:
+            return None
+        gesture = max(candidates, key=self.votes.get)
+        weight = self.votes[gesture]
+        if self.half_life:
+            weight *= 2.0 ** (-(now - self.reference) / self.half_life)
+        return gesture, self.counts[gesture], weight
+
+    def stable(self, now=None):
+        """Return the highest weighted gesture among those with at least min_votes votes"""
+        leader = self.leader(now, self.min_votes)
+        return leader[0] if leader is not None else None
@@ -1,10 +1,104 @@
 import cv2
+import json
 import numpy as np
+import os
 import time
-from collections import Counter
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Optional
+from pages.game_page.gesture_features import FINGER_ANGLE_DEGREES, analyze_defects, count_fingers, feature_vector
+from pages.game_page.gesture_classifier import DEFAULT_MODEL_PATH, GestureClassifier
+from pages.game_page.gesture_history import GestureHistory
+from pages.game_page.hand_tracker import HandTracker
+from pages.game_page.overlay import OverlayRenderer
+from pages.game_page.telemetry import TELEMETRY
+from pages.game_page.tracing import TRACER
+
+# Preprocessing profiles, from the most robust to the cheapest.
+# max_size: longest ROI side used for processing (None keeps full resolution)
+# denoise: 'bilateral' edge-preserving filter or None
+# contrast: CLAHE on the LAB lightness channel ('lab'), on grayscale ('gray') or None
+# blur: Gaussian blur kernel size; kernel: morphology kernel size
+# open/dilate/close: morphology iterations
+PREPROCESS_PROFILES = {
+    'quality': {'max_size': None, 'denoise': 'bilateral', 'contrast': 'lab', 'blur': 9,
+                'kernel': 7, 'open': 1, 'dilate': 2, 'close': 2},
+    'balanced': {'max_size': 320, 'denoise': None, 'contrast': 'gray', 'blur': 5,
+                 'kernel': 5, 'open': 1, 'dilate': 1, 'close': 1},
+    'fast': {'max_size': 160, 'denoise': None, 'contrast': None, 'blur': 3,
+             'kernel': 3, 'open': 1, 'dilate': 1, 'close': 1},
+}
+
+# Recognition constants a profile may override (see autotune.py).
+# mog2_history/mog2_var_threshold: background subtractor settings
+# mask_threshold: foreground mask level kept before morphology
+# min_contour_area: smallest hand contour in full-resolution pixels
+# finger_angle: widest defect angle in degrees that separates two fingers
+# weights: confidence scores used by the hand-tuned rules
+RECOGNITION_DEFAULTS = {
+    'mog2_history': 200,
+    'mog2_var_threshold': 25,
+    'mask_threshold': 180,
+    'min_contour_area': 500,
+    'finger_angle': FINGER_ANGLE_DEGREES,
+    'weights': {
+        'rock': 0.7, 'rock_compact': 0.2, 'rock_simple': 0.1,
+        'paper': 0.6, 'paper_spread': 0.2, 'paper_even': 0.2,
+        'scissors': 0.6, 'scissors_ratio': 0.2, 'scissors_defects': 0.2,
+        'lizard': 0.5, 'lizard_mouth': 0.3, 'lizard_compact': 0.2,
+        'spock': 0.5, 'spock_ratio': 0.2, 'spock_pattern': 0.3,
+        'min_confidence': 0.4,
+    },
+}
+
+# Extra profiles, such as the ones written by the autotuner, are loaded from here at startup
+DEFAULT_PROFILES_PATH = os.path.join('models', 'profiles.json')
+
+
+def load_profiles(path=DEFAULT_PROFILES_PATH):
+    """Add the profiles stored in a JSON file to PREPROCESS_PROFILES; return their names"""
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path) as f:
+            profiles = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading recognition profiles: {str(e)}")
+        return []
+    PREPROCESS_PROFILES.update(profiles)
+    return list(profiles)
+
+
+def resolve_profile(profile):
+    """Return the full settings of a profile name or dict, filling in RECOGNITION_DEFAULTS"""
+    if isinstance(profile, str):
+        if profile not in PREPROCESS_PROFILES:
+            raise ValueError(f"Unknown preprocessing profile: {profile}")
+        profile = PREPROCESS_PROFILES[profile]
+    settings = dict(RECOGNITION_DEFAULTS, **profile)
+    settings['weights'] = dict(RECOGNITION_DEFAULTS['weights'], **profile.get('weights', {}))
+    return settings
+
+
+load_profiles()
+
+@dataclass
+class RecognitionResult:
+    """Outcome of recognizing one frame. Coordinates are relative to the ROI."""
+    gesture: Optional[str] = None  # Stable gesture, or this frame's while history builds up
+    raw_gesture: Optional[str] = None  # Classification of this frame alone
+    stable_gesture: Optional[str] = None
+    confidences: dict = field(default_factory=dict)
+    finger_count: int = 0
+    roi_bounds: tuple = (0, 0, 0, 0)  # Region processed: the tracked window or the whole search ROI
+    contour: Optional[np.ndarray] = None  # Simplified hand contour
+    finger_points: Optional[np.ndarray] = None  # Defect valleys between extended fingers
+    features: Optional[np.ndarray] = None  # See gesture_features.FEATURE_NAMES
+    timings: dict = field(default_factory=dict)  # Stage name -> milliseconds
+    frame_time: Optional[float] = None  # Capture time of the frame, set by the camera pipeline
 
 class GestureRecognizer:
-    def __init__(self):
+    def __init__(self, profile='quality', model_path=DEFAULT_MODEL_PATH, tracking=True, motion_gate=True):
         # Constants for gesture recognition
         self.gestures = {
             'rock': 0,  # Fist - no fingers extended
@@ -13,56 +107,203 @@ class GestureRecognizer:
             'lizard': 3, # Thumb and index finger forming mouth shape
             'spock': 4  # Vulcan salute - index, middle separated from ring, pinky
         }
-        # Initialize background subtractor with relaxed parameters
-        self.bg_subtractor = cv2.createBackgroundSubtractorMOG2(history=200, varThreshold=25, detectShadows=False)
-        self.kernel = np.ones((7, 7), np.uint8)  # Larger kernel for more aggressive morphology
+        self.clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        # Follows the hand so most frames only process a window around it
+        self.tracker = HandTracker() if tracking else None
+        # Background for window-only frames and the difference that counts as foreground in them.
+        # It is kept without contrast enhancement: CLAHE adapts to the whole image, so a window
+        # enhanced on its own would not match a background enhanced as part of the full ROI
+        self.background = None
+        self.background_frames = 0
+        self.window_threshold = 25
+        # Motion gate: once the ROI's tiny grayscale thumbnail has stayed the same for
+        # settle_frames frames, later still frames reuse the last result, apart from
+        # one full pass every refresh_interval frames
+        self.motion_gate = motion_gate
+        self.motion_reference = None
+        self.motion_threshold = 12
+        self.motion_min_pixels = 3
+        self.settle_frames = 10
+        self.refresh_interval = 30
+        self.static_frames = 0
+        self.last_result = None
+        # Stage latencies, frame outcomes and rates are published here; None disables it
+        self.telemetry = TELEMETRY
+        self.set_profile(profile)
         self.last_gesture = None
         self.countdown_active = False
         self.countdown_start = 0
         # Gesture stability tracking
-        self.gesture_history = []
-        self.history_size = 5
+        self.gesture_history = GestureHistory(size=5, min_votes=2)
         
         # Performance metrics
         self.debug_mode = True  # Set to True to see accuracy metrics
         self.detection_start_time = None
         self.frame_count = 0
-        self.fps_history = []
+        self.fps_history = deque(maxlen=10)
         self.confidence_scores = {'rock': 0, 'paper': 0, 'scissors': 0, 'lizard': 0, 'spock': 0}
         self.last_known_gesture = None
         self.gesture_stability_score = 0
+        # Feature vector of the last analyzed hand (see gesture_features.FEATURE_NAMES)
+        self.last_features = None
+        # Draws results for process_frame; recognize() never draws
+        self.overlay = OverlayRenderer()
+        # Learned classifier; the hand-tuned rules are used when no model is available
+        self.classifier = None
+        if model_path and os.path.exists(model_path):
+            self.load_classifier(model_path)
+        
+    def load_classifier(self, path):
+        """Use a trained GestureClassifier model and return whether it loaded"""
+        try:
+            self.classifier = GestureClassifier.load(path)
+            return True
+        except Exception as e:
+            print(f"Error loading gesture classifier: {str(e)}")
+            self.classifier = None
+            return False
+        
+    def set_profile(self, name):
+        """Select one of the PREPROCESS_PROFILES, or a dict of settings"""
+        self.profile = resolve_profile(name)
+        self.profile_name = name if isinstance(name, str) else 'custom'
+        # Initialize background subtractor with relaxed parameters
+        self.bg_subtractor = cv2.createBackgroundSubtractorMOG2(
+            history=self.profile['mog2_history'], varThreshold=self.profile['mog2_var_threshold'],
+            detectShadows=False)
+        size = self.profile['kernel']
+        self.kernel = np.ones((size, size), np.uint8)  # Larger kernel for more aggressive morphology
+        # Scale of the last processed mask relative to the ROI
+        self.processing_scale = 1.0
+        # The background model no longer matches the processing size
+        self.background = None
+        self.background_frames = 0
+        if self.tracker is not None:
+            self.tracker.reset()
+        self.motion_reference = None
         
     def preprocess_frame(self, frame):
         """Enhanced preprocessing for poor quality cameras"""
-        # Apply bilateral filter to reduce noise while preserving edges
-        filtered = cv2.bilateralFilter(frame, 9, 75, 75)
+        denoised = self.denoise(frame)
+        blurred = self.to_gray(denoised)
         
-        # Increase contrast
-        lab = cv2.cvtColor(filtered, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        l = clahe.apply(l)
-        enhanced = cv2.merge((l, a, b))
-        enhanced = cv2.cvtColor(enhanced, cv2.COLOR_LAB2BGR)
+        # Apply background subtraction
+        with TRACER.span('preprocess.background'):
+            fg_mask = self.bg_subtractor.apply(blurred)
         
-        # Convert to grayscale
-        gray = cv2.cvtColor(enhanced, cv2.COLOR_BGR2GRAY)
+        mask = self.clean_mask(fg_mask)
         
-        # Apply Gaussian blur
-        blurred = cv2.GaussianBlur(gray, (9, 9), 0)
+        # Keep a background for window-only frames
+        if self.tracker is not None:
+            plain = self.to_gray(denoised, contrast=False) if self.profile['contrast'] else blurred
+            with TRACER.span('preprocess.background', update=True):
+                self.update_background(plain, mask)
+        return mask
+    
+    def update_background(self, plain, mask):
+        """Average an un-enhanced frame into the window background, except where the mask found the hand.
+        
+        Like the MOG2 model, it follows the mean of the frames seen so far until
+        mog2_history frames have passed, then adapts at 1/mog2_history per frame.
+        """
+        if self.background is None or self.background.shape != plain.shape:
+            self.background = plain.astype(np.float32)
+            self.background_frames = 1
+            return
+        self.background_frames = min(self.background_frames + 1, self.profile['mog2_history'])
+        cv2.accumulateWeighted(plain, self.background, 1.0 / self.background_frames, mask=cv2.bitwise_not(mask))
+    
+    def preprocess_window(self, frame, window, roi_bounds):
+        """Segment only the tracked window, against the background kept by the full passes"""
+        if self.background is None:
+            return None
         
-        # Apply background subtraction
-        fg_mask = self.bg_subtractor.apply(blurred)
+        # Locate the window in the background image, which covers the ROI at processing scale
+        scale = self.background.shape[1] / (roi_bounds[2] - roi_bounds[0])
+        left, top, right, bottom = window
+        x0, y0 = int(round((left - roi_bounds[0]) * scale)), int(round((top - roi_bounds[1]) * scale))
+        x1, y1 = int(round((right - roi_bounds[0]) * scale)), int(round((bottom - roi_bounds[1]) * scale))
+        background = self.background[y0:y1, x0:x1]
+        if background.size == 0:
+            return None
         
-        # Remove shadows (gray pixels)
-        _, thresh = cv2.threshold(fg_mask, 180, 255, cv2.THRESH_BINARY)
+        # Both sides of the difference skip contrast enhancement
+        blurred = self.enhance(frame[top:bottom, left:right], (x1 - x0, y1 - y0), contrast=False)
+        background = cv2.convertScaleAbs(background)
+        with TRACER.span('preprocess.background', window=True):
+            difference = cv2.absdiff(blurred, background)
+            _, fg_mask = cv2.threshold(difference, self.window_threshold, 255, cv2.THRESH_BINARY)
+        return self.clean_mask(fg_mask)
+    
+    def enhance(self, frame, size=None, contrast=True):
+        """Downscale, denoise, contrast-enhance and blur a BGR image into grayscale.
+        
+        The image is resized to `size` when given, otherwise downscaled as the
+        profile asks; processing_scale is set to match. Without `contrast` the
+        CLAHE step is skipped.
+        """
+        return self.to_gray(self.denoise(frame, size), contrast)
+    
+    def denoise(self, frame, size=None):
+        """Resize and denoise a BGR image as the profile asks; the first half of enhance()"""
+        profile = self.profile
+        
+        # Work on a downscaled copy of the ROI when the profile asks for it
+        self.processing_scale = 1.0
+        with TRACER.span('preprocess.resize'):
+            if size is not None:
+                if size != (frame.shape[1], frame.shape[0]):
+                    self.processing_scale = size[0] / frame.shape[1]
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            elif profile['max_size'] and max(frame.shape[:2]) > profile['max_size']:
+                self.processing_scale = profile['max_size'] / max(frame.shape[:2])
+                frame = cv2.resize(frame, None, fx=self.processing_scale, fy=self.processing_scale,
+                                   interpolation=cv2.INTER_AREA)
         
-        # Perform morphological operations
-        opening = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, self.kernel, iterations=1)
-        dilated = cv2.dilate(opening, self.kernel, iterations=2)
+        # Apply bilateral filter to reduce noise while preserving edges
+        if profile['denoise'] == 'bilateral':
+            with TRACER.span('preprocess.denoise'):
+                frame = cv2.bilateralFilter(frame, 9, 75, 75)
+        return frame
+    
+    def to_gray(self, frame, contrast=True):
+        """Contrast-enhance and blur a denoised BGR image into grayscale; the second half of enhance()"""
+        profile = self.profile
+        
+        # Increase contrast
+        with TRACER.span('preprocess.contrast'):
+            if contrast and profile['contrast'] == 'lab':
+                lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
+                l, a, b = cv2.split(lab)
+                l = self.clahe.apply(l)
+                enhanced = cv2.merge((l, a, b))
+                enhanced = cv2.cvtColor(enhanced, cv2.COLOR_LAB2BGR)
+                gray = cv2.cvtColor(enhanced, cv2.COLOR_BGR2GRAY)
+            else:
+                # Convert to grayscale
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                if contrast and profile['contrast'] == 'gray':
+                    gray = self.clahe.apply(gray)
+        
+        # Apply Gaussian blur
+        blur = profile['blur']
+        with TRACER.span('preprocess.blur'):
+            return cv2.GaussianBlur(gray, (blur, blur), 0)
+    
+    def clean_mask(self, fg_mask):
+        """Threshold a foreground mask and close gaps with morphology"""
+        profile = self.profile
         
-        # Additional closing to connect nearby contours
-        closed = cv2.morphologyEx(dilated, cv2.MORPH_CLOSE, self.kernel, iterations=2)
+        with TRACER.span('preprocess.morphology'):
+            # Remove shadows (gray pixels)
+            _, thresh = cv2.threshold(fg_mask, profile['mask_threshold'], 255, cv2.THRESH_BINARY)
+            
+            # Perform morphological operations
+            opening = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, self.kernel, iterations=profile['open'])
+            dilated = cv2.dilate(opening, self.kernel, iterations=profile['dilate'])
+            
+            # Additional closing to connect nearby contours
+            closed = cv2.morphologyEx(dilated, cv2.MORPH_CLOSE, self.kernel, iterations=profile['close'])
         
         return closed
     
@@ -72,14 +313,26 @@ class GestureRecognizer:
         if contours:
             # Find the largest contour (assuming it's the hand)
             max_contour = max(contours, key=cv2.contourArea)
-            if cv2.contourArea(max_contour) > 500:  # Lower threshold for poor cameras
+            scale = self.processing_scale
+            if cv2.contourArea(max_contour) > self.profile['min_contour_area'] * scale * scale:
+                if scale != 1.0:
+                    # Map the contour back to full-resolution ROI coordinates
+                    max_contour = np.round(max_contour / scale).astype(np.int32)
                 return max_contour
         return None
     
     def recognize_gesture(self, contour, frame):
         """Recognize Rock, Paper, Scissors, Lizard, Spock gestures"""
+        result = RecognitionResult()
+        self.analyze_contour(contour, result)
+        if result.contour is None:
+            return result.gesture, frame
+        return result.gesture, self.overlay.draw_hand(frame.copy(), result)
+    
+    def analyze_contour(self, contour, result):
+        """Classify a hand contour and fill in the matching RecognitionResult fields"""
         if contour is None:
-            return None, frame
+            return result
         
         # Create a convex hull around the contour
         hull = cv2.convexHull(contour)
@@ -94,97 +347,65 @@ class GestureRecognizer:
         
         # Find convexity defects - handle with more error tolerance
         try:
-            # Simplify contour less aggressively
-            epsilon = 0.005 * cv2.arcLength(contour, True)
-            contour = cv2.approxPolyDP(contour, epsilon, True)
-            hull_indices = cv2.convexHull(contour, returnPoints=False)
-            
-            # If hull_indices is empty or doesn't have enough points, return None
-            if hull_indices is None or len(hull_indices) < 3:
-                return self.get_stable_gesture(), frame
-            
-            defects = cv2.convexityDefects(contour, hull_indices)
+            with TRACER.span('analyze.defects'):
+                # Simplify contour less aggressively
+                epsilon = 0.005 * cv2.arcLength(contour, True)
+                contour = cv2.approxPolyDP(contour, epsilon, True)
+                hull_indices = cv2.convexHull(contour, returnPoints=False)
+                
+                # If hull_indices is empty or doesn't have enough points, return None
+                if hull_indices is None or len(hull_indices) < 3:
+                    result.gesture = self.get_stable_gesture(result.frame_time)
+                    return result
+                
+                defects = cv2.convexityDefects(contour, hull_indices)
         except:
-            return self.get_stable_gesture(), frame
-        
-        # Count fingers (defects)
-        finger_count = 0
+            result.gesture = self.get_stable_gesture(result.frame_time)
+            return result
         
-        # Draw the contour and convexity defects
-        result_frame = frame.copy()
-        cv2.drawContours(result_frame, [contour], -1, (0, 255, 0), 2)
-        
-        # Analyze the defects for finger counting
-        defect_points = []
-        defect_angles = []
-        defect_distances = []
+        result.contour = contour
         
         if defects is not None:
-            for i in range(defects.shape[0]):
-                s, e, f, d = defects[i, 0]
-                start = tuple(contour[s][0])
-                end = tuple(contour[e][0])
-                far = tuple(contour[f][0])
+            with TRACER.span('analyze.features'):
+                # Analyze all defects at once for finger counting
+                analysis = analyze_defects(contour, defects, self.profile['finger_angle'])
+                result.finger_points = analysis['far_points'][analysis['is_finger']]
                 
-                # Calculate distance between points
-                a = np.sqrt((end[0] - start[0]) ** 2 + (end[1] - start[1]) ** 2)
-                b = np.sqrt((far[0] - start[0]) ** 2 + (far[1] - start[1]) ** 2)
-                c = np.sqrt((end[0] - far[0]) ** 2 + (end[1] - far[1]) ** 2)
+                # Thumb is usually not detected as a defect, so it is added here
+                finger_count = count_fingers(analysis)
+                result.finger_count = finger_count
                 
-                # Calculate angle with protection against division by zero
-                try:
-                    angle = np.arccos((b ** 2 + c ** 2 - a ** 2) / max(2 * b * c, 0.001))
-                    angle_degrees = angle * 180 / np.pi
-                    
-                    # Store defect info
-                    defect_points.append(far)
-                    defect_angles.append(angle_degrees)
-                    defect_distances.append(d / 256.0)  # Normalize the distance
-                    
-                    # More tolerance in angle detection (increased from 90 to 100 degrees)
-                    if angle <= np.pi * 110/180:  # 110 degrees for better detection
-                        finger_count += 1
-                        cv2.circle(result_frame, far, 5, [0, 0, 255], -1)
-                except:
-                    continue
-            
-            # Always add 1 to finger_count (thumb is usually not detected as a defect)
-            finger_count = min(finger_count + 1, 5)  # Cap at 5 fingers
+                # Calculate additional features
+                area_ratio = contour_area / max(hull_area, 1)  # Prevent division by zero
+                self.last_features = feature_vector(analysis, area_ratio, complexity, contour)
+                result.features = self.last_features
             
-            # Calculate additional features
-            area_ratio = contour_area / max(hull_area, 1)  # Prevent division by zero
-            
-            # Enhanced gesture detection with convexity defect layout analysis
-            gesture, confidence = self.advanced_gesture_detection(
-                finger_count, defect_angles, defect_distances, defect_points, area_ratio, complexity
-            )
-            
-            # Draw text on the frame
-            cv2.putText(result_frame, f"Detected: {gesture}", (10, 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            
-            # Show finger count for debugging
-            cv2.putText(result_frame, f"Fingers: {finger_count}", (10, 90), 
-                      cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            with TRACER.span('classify', model=self.classifier is not None):
+                if self.classifier is not None:
+                    gesture, confidence = self.select_gesture(self.classifier.classify(self.last_features))
+                else:
+                    # Enhanced gesture detection with convexity defect layout analysis
+                    gesture, confidence = self.advanced_gesture_detection(
+                        finger_count, analysis['angles'], analysis['depths'], analysis['far_points'], area_ratio, complexity
+                    )
+            result.raw_gesture = gesture
+            result.confidences = confidence
             
             # Track gesture stability
             if gesture:
-                self.gesture_history.append(gesture)
-                if len(self.gesture_history) > self.history_size:
-                    self.gesture_history.pop(0)
-                
-                stable_gesture = self.get_stable_gesture()
+                # Confident classifications carry more weight in the vote
+                self.gesture_history.add(gesture, confidence[gesture], now=result.frame_time)
                 
-                if stable_gesture:
-                    cv2.putText(result_frame, f"Stable: {stable_gesture}", (10, 60), 
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+                result.stable_gesture = self.get_stable_gesture(result.frame_time)
+                result.gesture = result.stable_gesture or gesture
+                return result
                 
-                return stable_gesture or gesture, result_frame
-                
-        return self.get_stable_gesture(), result_frame
+        result.gesture = self.get_stable_gesture(result.frame_time)
+        return result
     
     def advanced_gesture_detection(self, finger_count, defect_angles, defect_distances, defect_points, area_ratio, complexity):
         """Enhanced gesture classification with multiple features"""
+        weights = self.profile['weights']
         
         # Initialize confidence scores for each gesture
         confidence = {
@@ -198,79 +419,83 @@ class GestureRecognizer:
         # -------------------- ROCK DETECTION --------------------
         # Rock: closed fist, few defects, compact shape
         if finger_count <= 1:
-            confidence['rock'] = 0.7
+            confidence['rock'] = weights['rock']
             
             # Rock typically has a high area ratio (compact)
             if area_ratio > 0.85:
-                confidence['rock'] += 0.2
+                confidence['rock'] += weights['rock_compact']
                 
             # Rock should have low complexity (simple shape)
             if complexity < 1.8:
-                confidence['rock'] += 0.1
+                confidence['rock'] += weights['rock_simple']
         
         # -------------------- PAPER DETECTION --------------------
         # Paper: open hand, many defects, spread shape
         if finger_count >= 4:
-            confidence['paper'] = 0.6
+            confidence['paper'] = weights['paper']
             
             # Paper typically has a low-medium area ratio (spread fingers)
             if 0.6 < area_ratio < 0.85:
-                confidence['paper'] += 0.2
+                confidence['paper'] += weights['paper_spread']
                 
             # Check for even spacing of defects (spread fingers)
             if len(defect_angles) >= 3:
                 angles_std = np.std(defect_angles)
                 if angles_std < 30:  # Low standard deviation means evenly spaced
-                    confidence['paper'] += 0.2
+                    confidence['paper'] += weights['paper_even']
         
         # -------------------- SCISSORS DETECTION --------------------
         # Scissors: two fingers extended (V shape)
         if 1 < finger_count < 4:
             # Check for large angle between the two fingers
             if len(defect_angles) > 0 and max(defect_angles) > 60:
-                confidence['scissors'] = 0.6
+                confidence['scissors'] = weights['scissors']
                 
                 # Scissor typically has a medium area ratio
                 if 0.65 < area_ratio < 0.8:
-                    confidence['scissors'] += 0.2
+                    confidence['scissors'] += weights['scissors_ratio']
                     
                 # Two clear defect points
                 if len(defect_points) == 2:
-                    confidence['scissors'] += 0.2
+                    confidence['scissors'] += weights['scissors_defects']
         
         # -------------------- LIZARD DETECTION --------------------
         # Lizard: thumb and index finger extended like a mouth
         if 1 < finger_count < 3:
             # Lizard has specific area ratio (thumb + index makes a small area)
             if area_ratio > 0.8:
-                confidence['lizard'] = 0.5
+                confidence['lizard'] = weights['lizard']
                 
             # Lizard typically has a mouth-like shape (small opening)
             if len(defect_angles) == 1 and defect_angles[0] < 60:
-                confidence['lizard'] += 0.3
+                confidence['lizard'] += weights['lizard_mouth']
                 
             # Lizard has compact shape compared to scissors
             if complexity < 2.2:
-                confidence['lizard'] += 0.2
+                confidence['lizard'] += weights['lizard_compact']
         
         # -------------------- SPOCK DETECTION --------------------
         # Spock: Vulcan salute, 3-4 fingers in specific arrangement
         if 3 <= finger_count <= 4:
             # Specific arrangement of defects
             if len(defect_points) >= 3:
-                confidence['spock'] = 0.5
+                confidence['spock'] = weights['spock']
                 
                 # Medium area ratio
                 if 0.7 < area_ratio < 0.85:
-                    confidence['spock'] += 0.2
+                    confidence['spock'] += weights['spock_ratio']
                 
                 # Check for pattern of alternating defect angles (the V spacing of fingers)
                 if len(defect_angles) >= 3:
                     # Sort angles and check if there's alternating pattern
                     sorted_angles = sorted(defect_angles)
                     if abs(sorted_angles[0] - sorted_angles[-1]) > 50:
-                        confidence['spock'] += 0.3
+                        confidence['spock'] += weights['spock_pattern']
         
+        return self.select_gesture(confidence)
+    
+    def select_gesture(self, confidence):
+        """Pick the most confident gesture and update the stability score"""
         # Store confidence scores for display
         self.confidence_scores = confidence
         
@@ -278,7 +503,7 @@ class GestureRecognizer:
         max_gesture = max(confidence.items(), key=lambda x: x[1])
         
         # Return None if confidence is too low
-        if max_gesture[1] < 0.4:
+        if max_gesture[1] < self.profile['weights']['min_confidence']:
             return None, confidence
             
         # Calculate stability based on history
@@ -288,28 +513,35 @@ class GestureRecognizer:
             self.gesture_stability_score = max(0.0, self.gesture_stability_score - 0.2)
             
         self.last_known_gesture = max_gesture[0]
+        if self.telemetry is not None:
+            self.telemetry.set('gesture_stability', round(self.gesture_stability_score, 2))
         return max_gesture[0], confidence
     
-    def get_stable_gesture(self):
-        """Return the most common gesture in history if it appears more than once"""
-        if not self.gesture_history:
-            return None
-            
-        # Count occurrences
-        counts = {}
-        for g in self.gesture_history:
-            counts[g] = counts.get(g, 0) + 1
-            
-        # Find most common
-        most_common = max(counts.items(), key=lambda x: x[1])
-        
-        # Only return if it appears multiple times
-        if most_common[1] >= 2:
-            return most_common[0]
-        return None
+    def get_stable_gesture(self, now=None):
+        """Return the leading gesture in history if it has at least two votes"""
+        return self.gesture_history.stable(now)
         
-    def process_frame(self, frame):
-        """Process a frame and return recognized gesture and visualization"""
+    def get_roi_bounds(self, frame):
+        """Return the (left, top, right, bottom) region where the hand is expected"""
+        h, w = frame.shape[:2]
+
+        # Make ROI dynamic based on frame size
+        roi_size = min(w, h) - 20
+        roi_left = (w - roi_size) // 2
+        roi_top = (h - roi_size) // 2
+        roi_right = roi_left + roi_size
+        roi_bottom = roi_top + roi_size
+
+        # Ensure ROI is within frame boundaries
+        roi_left = max(0, roi_left)
+        roi_top = max(0, roi_top)
+        roi_right = min(w, roi_right)
+        roi_bottom = min(h, roi_bottom)
+
+        return roi_left, roi_top, roi_right, roi_bottom
+    
+    def update_fps(self):
+        """Count a recognized frame and refresh the FPS average every second"""
         if self.detection_start_time is None:
             self.detection_start_time = time.time()
         
@@ -321,100 +553,126 @@ class GestureRecognizer:
         if elapsed >= 1.0:
             fps = self.frame_count / elapsed
             self.fps_history.append(fps)
-            if len(self.fps_history) > 10:
-                self.fps_history.pop(0)
+            if self.telemetry is not None:
+                self.telemetry.set('gesture_recognition_fps', round(fps, 2))
             self.frame_count = 0
             self.detection_start_time = current_time
-        
+    
+    def recognize(self, frame, roi_bounds=None, frame_time=None):
+        """Recognize the gesture in a frame without drawing on or copying it.
+        
+        Returns a RecognitionResult; nothing is rendered, so callers that want
+        a visualization pass the result to an OverlayRenderer. `frame_time` is
+        the capture time on the time.monotonic() clock; when given, votes are
+        aged from it rather than from the current time, so a replay keeps the
+        same votes as the live run whatever its speed.
+        """
+        self.update_fps()
+        result = RecognitionResult(frame_time=frame_time)
+        self.confidence_scores = result.confidences
         if frame is None or frame.size == 0:
-            return None, np.zeros((350, 350, 3), dtype=np.uint8)
-            
-        # Create a region of interest rectangle
-        h, w = frame.shape[:2]
-        
-        # Make ROI dynamic based on frame size
-        roi_size = min(w, h) - 20
-        roi_left = (w - roi_size) // 2
-        roi_top = (h - roi_size) // 2
-        roi_right = roi_left + roi_size
-        roi_bottom = roi_top + roi_size
-        
-        # Ensure ROI is within frame boundaries
-        roi_left = max(0, roi_left)
-        roi_top = max(0, roi_top)
-        roi_right = min(w, roi_right)
-        roi_bottom = min(h, roi_bottom)
-        
-        # Extract ROI
+            return result
+        
+        search_bounds = roi_bounds or self.get_roi_bounds(frame)
+        
+        # Skip the whole pipeline when nothing in the ROI has changed
+        motion_ms = None
+        if self.motion_gate:
+            started = time.perf_counter()
+            needed = self.needs_recognition(frame, search_bounds)
+            motion_ms = (time.perf_counter() - started) * 1000
+            if TRACER.enabled:
+                TRACER.add('motion_gate', started, started + motion_ms / 1000, {'reused': not needed})
+            if not needed and self.last_result is not None:
+                result = replace(self.last_result, timings={'motion': motion_ms}, frame_time=frame_time)
+                self.confidence_scores = result.confidences
+                self.record_telemetry(result, 'reused')
+                return result
+        
+        # Process only the tracked window when the tracker predicts one
+        tracking = self.tracker is not None and roi_bounds is None
+        window = self.tracker.predict(search_bounds) if tracking else None
+        
+        # The ROI is a view into the frame, not a copy
+        result.roi_bounds = window or search_bounds
+        roi_left, roi_top, roi_right, roi_bottom = result.roi_bounds
         roi = frame[roi_top:roi_bottom, roi_left:roi_right]
-        
         if roi.size == 0:
-            return None, frame
-        
-        # Add green rectangle
-        cv2.rectangle(frame, (roi_left, roi_top), (roi_right, roi_bottom), (0, 255, 0), 2)
+            return result
         
-        # Process the ROI
-        processed_roi = self.preprocess_frame(roi)
-        contour = self.find_contours(processed_roi)
-        
-        gesture, visualization = self.recognize_gesture(contour, roi)
-        
-        # Add the visualization to the frame
-        try:
-            frame[roi_top:roi_bottom, roi_left:roi_right] = visualization
-        except:
-            # Fallback if sizes don't match
-            resized_viz = cv2.resize(visualization, (roi_right - roi_left, roi_bottom - roi_top))
-            frame[roi_top:roi_bottom, roi_left:roi_right] = resized_viz
-        
-        # Draw instructions for each gesture
-        instructions = {
-            'rock': "Make a fist for Rock",
-            'paper': "Show open hand for Paper",
-            'scissors': "Show index & middle fingers for Scissors",
-            'lizard': "Make a hand puppet shape for Lizard",
-            'spock': "Show Vulcan salute for Spock"
+        started = time.perf_counter()
+        if window is not None:
+            processed_roi = self.preprocess_window(frame, window, search_bounds)
+        else:
+            processed_roi = self.preprocess_frame(roi)
+        preprocessed = time.perf_counter()
+        contour = self.find_contours(processed_roi) if processed_roi is not None else None
+        found = time.perf_counter()
+        if TRACER.enabled:
+            TRACER.add('find_contours', preprocessed, found)
+        if tracking:
+            self.tracker.update(self.hand_box(contour, result.roi_bounds), window is None)
+        self.analyze_contour(contour, result)
+        classified = time.perf_counter()
+        
+        self.confidence_scores = result.confidences
+        result.timings = {
+            'preprocess': (preprocessed - started) * 1000,
+            'find_contours': (found - preprocessed) * 1000,
+            'classify': (classified - found) * 1000,
         }
+        if motion_ms is not None:
+            result.timings['motion'] = motion_ms
+        self.last_result = result
+        self.record_telemetry(result, 'recognized')
+        return result
+    
+    def record_telemetry(self, result, outcome):
+        """Publish a frame's stage latencies and outcome to the telemetry registry"""
+        telemetry = self.telemetry
+        if telemetry is None:
+            return
+        for stage, milliseconds in result.timings.items():
+            telemetry.observe('gesture_stage_latency_ms', milliseconds, stage=stage)
+        telemetry.observe('gesture_stage_latency_ms', sum(result.timings.values()), stage='total')
+        telemetry.inc('gesture_frames_total', outcome=outcome)
+    
+    def needs_recognition(self, frame, bounds):
+        """Return False when the ROI has been still long enough to reuse the last result"""
+        left, top, right, bottom = bounds
+        # Linear sampling to 128x128 keeps the cost tiny; area averaging to 32x32 suppresses noise
+        small = cv2.resize(frame[top:bottom, left:right], (128, 128), interpolation=cv2.INTER_LINEAR)
+        thumbnail = cv2.resize(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (32, 32), interpolation=cv2.INTER_AREA)
+        
+        moved = True
+        if self.motion_reference is not None:
+            changed = cv2.absdiff(thumbnail, self.motion_reference) > self.motion_threshold
+            moved = np.count_nonzero(changed) >= self.motion_min_pixels
+        
+        if moved:
+            self.motion_reference = thumbnail
+            self.static_frames = 0
+        else:
+            self.static_frames += 1
         
-        y_pos = roi_bottom + 30
-        cv2.putText(frame, instructions.get(gesture, "Waiting for gesture..."), 
-                   (roi_left, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
-        
-        # Display performance metrics if in debug mode
-        if self.debug_mode:
-            # FPS
-            avg_fps = sum(self.fps_history) / max(1, len(self.fps_history)) if self.fps_history else 0
-            cv2.putText(frame, f"FPS: {avg_fps:.1f}", 
-                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
-            
-            # Confidence scores
-            y_offset = 60
-            if gesture:
-                # Draw a bar chart of confidence scores
-                max_width = 150
-                bar_height = 15
-                for i, (gesture_name, score) in enumerate(sorted(self.confidence_scores.items(), key=lambda x: x[1], reverse=True)):
-                    bar_width = int(score * max_width)
-                    cv2.rectangle(frame, (10, y_offset + i*20), (10 + bar_width, y_offset + i*20 + bar_height), 
-                                 (0, 255, 255), -1)
-                    cv2.putText(frame, f"{gesture_name}: {score:.2f}", 
-                               (10 + max_width + 10, y_offset + i*20 + bar_height), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-            
-            # Stability score
-            cv2.putText(frame, f"Stability: {self.gesture_stability_score:.2f}", 
-                       (10, y_offset + 110), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
-            
-            # History stats
-            if self.gesture_history:
-                counter = Counter(self.gesture_history)
-                most_common = counter.most_common(1)[0]
-                cv2.putText(frame, f"Most frequent: {most_common[0]} ({most_common[1]}/{len(self.gesture_history)})", 
-                           (10, y_offset + 140), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+        # The background model needs a few still frames to settle after the scene changes
+        if self.static_frames <= self.settle_frames:
+            return True
+        return self.static_frames % self.refresh_interval == 0
+    
+    def hand_box(self, contour, roi_bounds):
+        """Return the contour's bounding box in frame coordinates, or None"""
+        if contour is None:
+            return None
+        x, y, w, h = cv2.boundingRect(contour)
+        return roi_bounds[0] + x, roi_bounds[1] + y, roi_bounds[0] + x + w, roi_bounds[1] + y + h
+    
+    def confirm_gesture(self, gesture, now=None):
+        """Report a gesture only once it has been held through a one second countdown.
         
-        # Handle gesture detection with countdown
-        current_time = time.time()
+        `now` is a time.monotonic() time, such as the frame's capture time; it defaults to the current time.
+        """
+        current_time = time.monotonic() if now is None else now
         
         if gesture and not self.countdown_active:
             self.countdown_active = True
@@ -424,6 +682,36 @@ class GestureRecognizer:
             self.countdown_active = False
             detected_gesture = self.last_gesture
             self.last_gesture = None
-            return detected_gesture, frame
+            return detected_gesture
             
-        return None, frame 
\ No newline at end of file
+        return None
+        
+    def process_frame(self, frame):
+        """Process a frame and return recognized gesture and visualization"""
+        if frame is None or frame.size == 0:
+            self.update_fps()
+            return None, np.zeros((350, 350, 3), dtype=np.uint8)
+        
+        result = self.recognize(frame)
+        
+        # Draw the overlay directly onto the frame, unless it is a shared read-only frame
+        visualization = self.overlay.render(frame, result, self, copy=not frame.flags.writeable)
+        
+        # Handle gesture detection with countdown
+        return self.confirm_gesture(result.gesture), visualization
+
+    def process_source(self, source, max_frames=None):
+        """Run recognition over every frame of a FrameSource.
+
+        Yields (gesture, visualization) per frame. The source is opened if
+        needed but not released, so callers keep control of its lifetime.
+        """
+        if not source.is_opened() and not source.open():
+            return
+        count = 0
+        while max_frames is None or count < max_frames:
+            ret, frame = source.read()
+            if not ret:
+                return
+            count += 1
+            yield self.process_frame(frame)
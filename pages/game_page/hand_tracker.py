@@ -0,0 +1,77 @@
+import cv2
+import numpy as np
+
+
+class HandTracker:
+    """Predicts the window the hand will occupy in the next frame.
+
+    A constant-velocity Kalman filter follows the centre of the hand's
+    bounding box and the box size is smoothed separately. predict() returns
+    the box grown by `margin` on every side, or None when the caller should
+    search the whole ROI instead: before the first detection, after the
+    hand was lost, and every `reacquire_interval` frames.
+    """
+
+    def __init__(self, margin=0.25, reacquire_interval=15, min_size=64, size_smoothing=0.5):
+        self.margin = margin
+        self.reacquire_interval = reacquire_interval
+        self.min_size = min_size
+        self.size_smoothing = size_smoothing
+
+        self.kalman = cv2.KalmanFilter(4, 2)
+        # State is (x, y, vx, vy); only the position is measured
+        self.kalman.transitionMatrix = np.array([[1, 0, 1, 0],
+                                                 [0, 1, 0, 1],
+                                                 [0, 0, 1, 0],
+                                                 [0, 0, 0, 1]], np.float32)
+        self.kalman.measurementMatrix = np.eye(2, 4, dtype=np.float32)
+        self.kalman.processNoiseCov = np.eye(4, dtype=np.float32) * 1e-1
+        self.kalman.measurementNoiseCov = np.eye(2, dtype=np.float32) * 1.0
+        self.reset()
+
+    def reset(self):
+        self.tracking = False
+        self.size = None
+        self.frames_since_search = 0
+
+    def predict(self, bounds):
+        """Return the (left, top, right, bottom) window to process inside bounds, or None"""
+        if not self.tracking:
+            return None
+        x, y = self.kalman.predict()[:2, 0]
+        if self.frames_since_search >= self.reacquire_interval:
+            return None
+
+        left, top, right, bottom = bounds
+        half_w = max(self.size[0] * (0.5 + self.margin), self.min_size / 2)
+        half_h = max(self.size[1] * (0.5 + self.margin), self.min_size / 2)
+        window = (max(left, int(x - half_w)), max(top, int(y - half_h)),
+                  min(right, int(x + half_w)), min(bottom, int(y + half_h)))
+        if window[2] - window[0] < self.min_size or window[3] - window[1] < self.min_size:
+            return None
+        self.frames_since_search += 1
+        return window
+
+    def update(self, box, full_search):
+        """Correct the track with the hand's bounding box, or None if no hand was found"""
+        if box is None:
+            if full_search:
+                self.reset()
+            else:
+                # Lost the hand inside the window, so search everywhere next frame
+                self.frames_since_search = self.reacquire_interval
+            return
+
+        left, top, right, bottom = box
+        centre = np.array([[(left + right) / 2], [(top + bottom) / 2]], np.float32)
+        size = np.array([right - left, bottom - top], np.float32)
+        if not self.tracking:
+            self.kalman.statePost = np.array([centre[0], centre[1], [0], [0]], np.float32)
+            self.kalman.errorCovPost = np.eye(4, dtype=np.float32)
+            self.size = size
+            self.tracking = True
+        else:
+            self.kalman.correct(centre)
+            self.size = self.size_smoothing * self.size + (1 - self.size_smoothing) * size
+        if full_search:
+            self.frames_since_search = 0
@@ -0,0 +1,141 @@
+"""Load generator for the headless game server.
+
+Usage:
+    python -m pages.game_page.game_server --port 8765 &
+    python -m pages.game_page.load_test --port 8765 --matches 2000 --connections 100
+    python -m pages.game_page.load_test --port 8765 --matches 50 --frames 10
+
+Opens --connections client connections, which together play --matches
+matches of --rounds rounds. Each request waits for its reply before the
+next one is sent, so every connection behaves like one remote player. With
+--frames N, each round first streams N synthetic camera frames for
+server-side recognition and then plays the recognized gesture. The frames
+are JPEG encoded once up front, so the client spends its time on the
+network and not on drawing. Reports matches and rounds per second and
+p50/p95/p99 latency per request type.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import random
+import sys
+import time
+
+import cv2
+
+from pages.game_page.benchmark import summarize
+from pages.game_page.frame_source import SyntheticHandSource
+from pages.game_page.game_server import DEFAULT_PORT, MAX_MESSAGE_SIZE
+
+
+def encode_frames(count, width=320, height=240):
+    """Base64 JPEGs of synthetic hands showing every gesture `count` frames long"""
+    source = SyntheticHandSource(frames_per_gesture=count, width=width, height=height)
+    source.open()
+    frames = []
+    while True:
+        ok, frame = source.read()
+        if not ok:
+            break
+        frames.append(base64.b64encode(cv2.imencode('.jpg', frame)[1].tobytes()).decode('ascii'))
+    source.release()
+    return frames
+
+
+class Client:
+    def __init__(self, reader, writer, latencies):
+        self.reader = reader
+        self.writer = writer
+        self.latencies = latencies
+        self.next_id = 0
+
+    async def request(self, op, **fields):
+        self.next_id += 1
+        started = time.perf_counter()
+        self.writer.write(json.dumps(dict(fields, op=op, id=self.next_id)).encode() + b'\n')
+        await self.writer.drain()
+        reply = json.loads(await self.reader.readline())
+        self.latencies.setdefault(op, []).append((time.perf_counter() - started) * 1000)
+        return reply
+
+
+async def run_connection(host, port, remaining, rounds, frames, per_round, rules, totals):
+    reader, writer = await asyncio.open_connection(host, port, limit=MAX_MESSAGE_SIZE)
+    client = Client(reader, writer, totals['latencies'])
+    rng = random.Random()
+    try:
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            reply = await client.request('new_match', **({'rules': rules} if rules else {}))
+            if 'error' in reply:
+                raise ConnectionError(f"Server refused a new match: {reply['error']}")
+            match, gestures = reply['match'], reply['gestures']
+            position = 0
+            for _ in range(rounds):
+                gesture = None
+                for _ in range(per_round):
+                    reply = await client.request('frame', match=match, image=frames[position % len(frames)])
+                    position += 1
+                    gesture = reply.get('gesture')
+                # Play explicitly while the recognizer has not settled on a gesture yet
+                fields = {} if gesture else {'gesture': rng.choice(gestures)}
+                reply = await client.request('play', match=match, **fields)
+                if 'error' in reply:
+                    totals['errors'] += 1
+                else:
+                    totals['rounds'] += 1
+            reply = await client.request('end', match=match)
+            if 'error' in reply:
+                totals['errors'] += 1
+            else:
+                totals['matches'] += 1
+    finally:
+        writer.close()
+
+
+async def run_load(args, frames):
+    remaining = [args.matches]
+    totals = {'matches': 0, 'rounds': 0, 'errors': 0, 'latencies': {}}
+    per_round = args.frames if frames else 0
+    started = time.perf_counter()
+    await asyncio.gather(*(run_connection(args.host, args.port, remaining, args.rounds, frames, per_round,
+                                          args.rules, totals)
+                           for _ in range(min(args.connections, args.matches))))
+    totals['elapsed'] = time.perf_counter() - started
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many concurrent matches against the game server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--matches', type=int, default=1000)
+    parser.add_argument('--connections', type=int, default=100, help="concurrent client connections")
+    parser.add_argument('--rounds', type=int, default=5, help="rounds per match")
+    parser.add_argument('--rules', help="game variant of the matches, such as rps-7 (default: the server's)")
+    parser.add_argument('--frames', type=int, default=0, help="camera frames streamed before each round")
+    args = parser.parse_args(argv)
+
+    frames = encode_frames(args.frames) if args.frames else []
+    try:
+        totals = asyncio.run(run_load(args, frames))
+    except ConnectionError as e:
+        print(f"Error talking to {args.host}:{args.port}: {e}", file=sys.stderr)
+        return 1
+
+    elapsed = totals['elapsed']
+    print(f"{totals['matches']} matches, {totals['rounds']} rounds in {elapsed:.2f}s over "
+          f"{min(args.connections, args.matches)} connections", file=sys.stderr)
+    print(f"{totals['matches'] / elapsed:.1f} matches/s, {totals['rounds'] / elapsed:.1f} rounds/s, "
+          f"{totals['errors']} errors", file=sys.stderr)
+    print(f"{'request':<10} {'count':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}", file=sys.stderr)
+    for op, latencies in totals['latencies'].items():
+        stats = summarize(latencies)
+        print(f"{op:<10} {len(latencies):>8} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} "
+              f"{stats['p99_ms']:>8.2f}", file=sys.stderr)
+    return 1 if totals['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
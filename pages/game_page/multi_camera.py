@@ -0,0 +1,295 @@
+"""Concurrent gesture recognition for several players, each with a camera.
+
+Usage:
+    python -m pages.game_page.multi_camera 0 1 --rounds 3
+    python -m pages.game_page.multi_camera synthetic:rock synthetic:paper synthetic:spock
+
+A MultiCameraEngine runs a pool of worker processes and assigns every
+stream to one of them. Recognizer state (background model, tracker, vote
+history) needs a stream's frames in order, so a stream never moves between
+workers. Each worker captures its own streams through a CameraService and
+recognizes them with a GestureRecognizer per stream. Frames therefore
+never cross a process boundary, and only small events come back to the
+engine: changes of the stable gesture, lock-ins and frame rates, each
+with the capture timestamp. A round is decided once every player has
+locked in a gesture, i.e. held it through the recognizer's one second
+confirmation countdown after the round started.
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+
+from pages.game_page.camera_service import CameraService
+from pages.game_page.frame_source import open_source
+from pages.game_page.gesture_recognition import PREPROCESS_PROFILES, GestureRecognizer
+
+
+class StreamState:
+    """What the engine knows about one player's stream"""
+
+    def __init__(self, stream, spec):
+        self.stream = stream
+        self.spec = spec
+        self.stable_gesture = None
+        self.stable_since = None
+        self.locked_gesture = None
+        self.locked_at = None
+        self.fps = 0.0
+        self.error = None
+
+    def __repr__(self):
+        return (f"StreamState({self.stream}, stable={self.stable_gesture}, locked={self.locked_gesture}, "
+                f"fps={self.fps:.1f})")
+
+
+def open_stream(spec, realtime):
+    # Recorded and synthetic sources stand in for cameras: paced like one and never ending
+    return open_source(spec, live=realtime)
+
+
+def stream_worker(streams, profile, realtime, mirror, events, stop_event, round_started):
+    """Capture and recognize a fixed set of (stream id, source spec) pairs until stopped"""
+    running = []
+    current_round = round_started.value
+    # Set by every subscription when its camera publishes a frame
+    frame_ready = threading.Event()
+    for stream, spec in streams:
+        service = CameraService(open_stream(spec, realtime), mirror)
+        service.telemetry = None
+        if not service.start():
+            events.put(('failed', stream, time.monotonic(), f"Could not open {spec}"))
+            continue
+        recognizer = GestureRecognizer(profile)
+        recognizer.telemetry = None
+        subscription = service.subscribe(callback=frame_ready.set, name=f'stream-{stream}')
+        running.append({'stream': stream, 'service': service, 'subscription': subscription,
+                        'recognizer': recognizer, 'stable': None, 'frames': 0, 'rate_start': time.monotonic()})
+
+    try:
+        while running and not stop_event.is_set():
+            # A new round: countdowns started before it must not lock in a gesture for it
+            if round_started.value != current_round:
+                current_round = round_started.value
+                for state in running:
+                    state['recognizer'].countdown_active = False
+                    state['recognizer'].last_gesture = None
+            # Cleared before polling, so a frame published meanwhile still ends the wait below
+            frame_ready.clear()
+            idle = True
+            for state in list(running):
+                service, subscription = state['service'], state['subscription']
+                if not service.is_running():
+                    events.put(('failed', state['stream'], time.monotonic(), "Stream stopped delivering frames"))
+                    running.remove(state)
+                    continue
+                frame = subscription.read()
+                if frame is None:
+                    continue
+                idle = False
+                recognize_stream(state, frame, subscription.timestamp, events)
+            if idle:
+                frame_ready.wait(timeout=0.1)
+    finally:
+        for state in running:
+            state['service'].stop()
+
+
+def recognize_stream(state, frame, timestamp, events):
+    """Recognize one frame of a stream and report what changed"""
+    recognizer = state['recognizer']
+    stream = state['stream']
+    result = recognizer.recognize(frame)
+    confirmed = recognizer.confirm_gesture(result.gesture)
+    if result.stable_gesture != state['stable']:
+        state['stable'] = result.stable_gesture
+        events.put(('stable', stream, timestamp, result.stable_gesture))
+    if confirmed:
+        events.put(('locked', stream, timestamp, confirmed))
+
+    state['frames'] += 1
+    elapsed = timestamp - state['rate_start']
+    if elapsed >= 1.0:
+        events.put(('fps', stream, timestamp, state['frames'] / elapsed))
+        state['frames'] = 0
+        state['rate_start'] = timestamp
+
+
+class MultiCameraEngine:
+    """Recognizes N camera streams in a pool of worker processes.
+
+    `sources` are source specifications as accepted by open_source (camera
+    indices, files, 'synthetic'). With `realtime`, non-camera sources are
+    paced at their frame rate and looped, so they behave like cameras.
+    Call start(), then start_round() and wait_for_round() per round. The
+    streams of a worker that dies are marked failed, and rounds go on
+    without them.
+    """
+
+    def __init__(self, sources, profile='quality', workers=None, realtime=True, mirror=True):
+        self.streams = [StreamState(stream, str(spec)) for stream, spec in enumerate(sources)]
+        self.profile = profile
+        self.workers = max(1, min(workers or os.cpu_count(), len(self.streams)))
+        self.realtime = realtime
+        self.mirror = mirror
+        # Spawned workers do not inherit the parent's threads or Qt state
+        self.context = multiprocessing.get_context('spawn')
+        self.events = None
+        self.stop_event = None
+        # Start of the current round, shared with the workers
+        self.shared_round_start = None
+        self.processes = []
+        self.assignments = []
+        self.collector = None
+        self.condition = threading.Condition()
+        self.round_started = None
+        self.listeners = []
+
+    def start(self):
+        """Start the worker processes"""
+        if self.processes:
+            return
+        self.events = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.shared_round_start = self.context.Value('d', 0.0, lock=False)
+        for worker in range(self.workers):
+            assigned = [(state.stream, state.spec) for state in self.streams[worker::self.workers]]
+            process = self.context.Process(
+                target=stream_worker, name=f"stream-worker-{worker}", daemon=True,
+                args=(assigned, self.profile, self.realtime, self.mirror, self.events, self.stop_event,
+                      self.shared_round_start))
+            process.start()
+            self.processes.append(process)
+            self.assignments.append([stream for stream, _ in assigned])
+        self.collector = threading.Thread(target=self.collect_events, name="multi-camera-events", daemon=True)
+        self.collector.start()
+
+    def stop(self):
+        if not self.processes:
+            return
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        self.assignments = []
+        self.collector.join(timeout=1.0)
+
+    def add_listener(self, callback):
+        """Register a callable(kind, StreamState) invoked from the event thread"""
+        self.listeners.append(callback)
+
+    def collect_events(self):
+        next_check = time.monotonic()
+        while self.processes or not self.events.empty():
+            if time.monotonic() >= next_check:
+                self.check_workers()
+                next_check = time.monotonic() + 0.5
+            try:
+                kind, stream, timestamp, value = self.events.get(timeout=0.1)
+            except queue.Empty:
+                if self.stop_event.is_set():
+                    return
+                continue
+            self.apply_event(kind, stream, timestamp, value)
+
+    def check_workers(self):
+        """Fail the streams of workers that died without reporting it themselves"""
+        if self.stop_event.is_set():
+            return
+        for process, streams in zip(list(self.processes), list(self.assignments)):
+            if process.is_alive() or process.exitcode == 0:
+                continue
+            for stream in streams:
+                if self.streams[stream].error is None:
+                    self.apply_event('failed', stream, time.monotonic(),
+                                     f"Worker {process.name} exited with code {process.exitcode}")
+
+    def apply_event(self, kind, stream, timestamp, value):
+        state = self.streams[stream]
+        with self.condition:
+            if kind == 'stable':
+                state.stable_gesture = value
+                state.stable_since = timestamp
+            elif kind == 'locked':
+                # Only gestures confirmed after the round started count
+                if self.round_started is not None and timestamp >= self.round_started:
+                    state.locked_gesture = value
+                    state.locked_at = timestamp
+            elif kind == 'fps':
+                state.fps = value
+            elif kind == 'failed':
+                state.error = value
+            self.condition.notify_all()
+        for listener in list(self.listeners):
+            listener(kind, state)
+
+    def start_round(self):
+        """Forget earlier lock-ins; gestures confirmed from now on count for the round"""
+        with self.condition:
+            self.round_started = time.monotonic()
+            # Workers restart their confirmation countdowns when they see this change
+            if self.shared_round_start is not None:
+                self.shared_round_start.value = self.round_started
+            for state in self.streams:
+                state.locked_gesture = None
+                state.locked_at = None
+
+    def round_result(self):
+        """Return {stream: (gesture, timestamp)} once every working stream has locked in, else None"""
+        with self.condition:
+            active = [state for state in self.streams if state.error is None]
+            if not active or any(state.locked_gesture is None for state in active):
+                return None
+            return {state.stream: (state.locked_gesture, state.locked_at) for state in active}
+
+    def wait_for_round(self, timeout=None):
+        """Block until every player has locked in or the timeout expires; see round_result"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            while True:
+                result = self.round_result()
+                if result is not None:
+                    return result
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recognize gestures from several cameras at once")
+    parser.add_argument('sources', nargs='+', help="camera indices, video files, sessions or 'synthetic:GESTURE'")
+    parser.add_argument('--profile', default='fast', choices=list(PREPROCESS_PROFILES), help="preprocessing profile")
+    parser.add_argument('-j', '--workers', type=int, help="worker processes (default: one per stream, up to the CPUs)")
+    parser.add_argument('--rounds', type=int, default=1)
+    parser.add_argument('--timeout', type=float, default=15.0, help="seconds to wait for every player per round")
+    args = parser.parse_args(argv)
+
+    engine = MultiCameraEngine(args.sources, args.profile, args.workers)
+    engine.start()
+    try:
+        for round_number in range(1, args.rounds + 1):
+            engine.start_round()
+            result = engine.wait_for_round(args.timeout)
+            if result is None:
+                waiting = [f"player {s.stream + 1}" + (f" ({s.error})" if s.error else "")
+                           for s in engine.streams if s.locked_gesture is None]
+                print(f"Round {round_number}: timed out waiting for {', '.join(waiting)}")
+                continue
+            print(f"Round {round_number}:")
+            for stream, (gesture, timestamp) in sorted(result.items()):
+                delay = timestamp - engine.round_started
+                print(f"  player {stream + 1}: {gesture} after {delay:.2f}s "
+                      f"({engine.streams[stream].fps:.0f} fps)")
+    finally:
+        engine.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import time
+
+import cv2
+
+from pages.game_page.tracing import TRACER
+
+# Instructions shown under the ROI for each gesture
+INSTRUCTIONS = {
+    'rock': "Make a fist for Rock",
+    'paper': "Show open hand for Paper",
+    'scissors': "Show index & middle fingers for Scissors",
+    'lizard': "Make a hand puppet shape for Lizard",
+    'spock': "Show Vulcan salute for Spock"
+}
+
+
+class OverlayRenderer:
+    """Draws recognition results for debug views.
+
+    Recognition itself never draws. Consumers that want a visualization ask
+    the renderer for one, and can use due() to render at a lower rate than
+    frames are recognized.
+    """
+
+    def __init__(self, max_fps=None):
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.last_render = 0.0
+
+    def due(self, now=None):
+        """Return True, and start a new interval, if it is time for another render"""
+        now = time.monotonic() if now is None else now
+        if now - self.last_render < self.min_interval:
+            return False
+        self.last_render = now
+        return True
+
+    def render(self, frame, result, recognizer=None, copy=True):
+        """Draw the ROI, hand shape, instructions and optional debug metrics.
+
+        The frame is copied first unless `copy` is False. Debug metrics are
+        drawn when a recognizer with debug_mode enabled is passed.
+        """
+        with TRACER.span('overlay.render'):
+            return self.draw(frame, result, recognizer, copy)
+
+    def draw(self, frame, result, recognizer, copy):
+        """Untraced body of render()"""
+        if copy:
+            frame = frame.copy()
+
+        roi_left, roi_top, roi_right, roi_bottom = result.roi_bounds
+        if roi_right <= roi_left or roi_bottom <= roi_top:
+            return frame
+
+        # Add green rectangle
+        cv2.rectangle(frame, (roi_left, roi_top), (roi_right, roi_bottom), (0, 255, 0), 2)
+
+        # Hand annotations use ROI coordinates, so draw them into a ROI view
+        self.draw_hand(frame[roi_top:roi_bottom, roi_left:roi_right], result)
+
+        y_pos = roi_bottom + 30
+        cv2.putText(frame, INSTRUCTIONS.get(result.gesture, "Waiting for gesture..."),
+                    (roi_left, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+
+        if recognizer is not None and recognizer.debug_mode:
+            self.draw_metrics(frame, result, recognizer)
+        return frame
+
+    def draw_hand(self, roi, result):
+        """Draw the contour, finger valleys and detection text into a ROI image"""
+        if result.contour is None:
+            return roi
+
+        cv2.drawContours(roi, [result.contour], -1, (0, 255, 0), 2)
+        if result.finger_points is None:
+            return roi
+
+        for far in result.finger_points:
+            cv2.circle(roi, (int(far[0]), int(far[1])), 5, [0, 0, 255], -1)
+
+        # Draw text on the frame
+        cv2.putText(roi, f"Detected: {result.raw_gesture}", (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+
+        # Show finger count for debugging
+        cv2.putText(roi, f"Fingers: {result.finger_count}", (10, 90),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+
+        if result.stable_gesture:
+            cv2.putText(roi, f"Stable: {result.stable_gesture}", (10, 60),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        return roi
+
+    def draw_metrics(self, frame, result, recognizer):
+        """Draw FPS, confidence bars, stability and history statistics"""
+        # Recognizer state is read through copies, since recognition may run on another thread
+        # FPS
+        fps_history = list(recognizer.fps_history)
+        avg_fps = sum(fps_history) / max(1, len(fps_history)) if fps_history else 0
+        cv2.putText(frame, f"FPS: {avg_fps:.1f}",
+                    (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+
+        # Confidence scores
+        y_offset = 60
+        if result.gesture:
+            # Draw a bar chart of confidence scores
+            max_width = 150
+            bar_height = 15
+            scores = sorted(result.confidences.items(), key=lambda x: x[1], reverse=True)
+            for i, (gesture_name, score) in enumerate(scores):
+                bar_width = int(score * max_width)
+                cv2.rectangle(frame, (10, y_offset + i*20), (10 + bar_width, y_offset + i*20 + bar_height),
+                              (0, 255, 255), -1)
+                cv2.putText(frame, f"{gesture_name}: {score:.2f}",
+                            (10 + max_width + 10, y_offset + i*20 + bar_height),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+        # Stability score
+        cv2.putText(frame, f"Stability: {recognizer.gesture_stability_score:.2f}",
+                    (10, y_offset + 110), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+
+        # History stats
+        history = recognizer.gesture_history
+        votes = dict(history.votes)
+        counts = dict(history.counts)
+        leader = max(votes, key=votes.get) if votes else None
+        if leader in counts:
+            cv2.putText(frame, f"Most frequent: {leader} ({counts[leader]}/{sum(counts.values())})",
+                        (10, y_offset + 140), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
@@ -0,0 +1,52 @@
+import time
+
+# Recognition rate per game state.
+# max_fps: upper bound on recognized frames per second (None follows the camera)
+# cpu_budget: fraction of one core recognition may use, based on measured latency
+SCHEDULE_MODES = {
+    'idle': {'max_fps': 5.0, 'cpu_budget': 0.1},
+    'active': {'max_fps': None, 'cpu_budget': 0.9},
+}
+
+
+class RecognitionScheduler:
+    """Decides when the recognition worker should process the next frame.
+
+    The game switches to 'active' for countdowns and accuracy tests and back
+    to 'idle' otherwise. In either mode the interval between recognitions is
+    stretched so that the average recognition latency stays within the
+    mode's CPU budget, which skips frames automatically under load.
+    """
+
+    def __init__(self, mode='idle', smoothing=0.2):
+        self.smoothing = smoothing
+        self.latency = 0.0
+        self.last_run = 0.0
+        self.processed = 0
+        self.set_mode(mode)
+
+    def set_mode(self, mode):
+        if mode not in SCHEDULE_MODES:
+            raise ValueError(f"Unknown schedule mode: {mode}")
+        self.mode = mode
+        self.settings = SCHEDULE_MODES[mode]
+
+    def interval(self):
+        """Minimum time between recognitions in the current mode"""
+        max_fps = self.settings['max_fps']
+        interval = 1.0 / max_fps if max_fps else 0.0
+        return max(interval, self.latency / self.settings['cpu_budget'])
+
+    def delay(self, now=None):
+        """Seconds to wait before the next frame should be recognized"""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.last_run + self.interval() - now)
+
+    def record(self, started, latency):
+        """Note a recognition that started at `started` and took `latency` seconds"""
+        self.last_run = started
+        self.processed += 1
+        if self.processed == 1:
+            self.latency = latency
+        else:
+            self.latency += self.smoothing * (latency - self.latency)
@@ -0,0 +1,116 @@
+"""Replay a recorded session through the gesture recognizer.
+
+Usage:
+    python -m pages.game_page.replay session.rpsrec
+    python -m pages.game_page.replay session.rpsrec --realtime --render annotated/
+
+Frames are fed to a fresh GestureRecognizer the same way the camera
+pipeline does: recognize, optionally draw the overlay, then run the
+confirmation countdown. By default only the frames the live pipeline
+recognized are replayed, in the same order, so the background model and
+tracker see the same sequence. The recognizer gets the vote settings stored
+in the session header, and vote ages and the countdown follow the recorded
+capture times. Each replayed result is compared with the one recorded live
+and the first frames that disagree are listed. Without --realtime frames
+are replayed as fast as possible, with the same results.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+
+from pages.game_page.gesture_classifier import DEFAULT_MODEL_PATH
+from pages.game_page.gesture_recognition import PREPROCESS_PROFILES, GestureRecognizer
+from pages.game_page.session import SessionReader, result_summary
+
+
+def replay(reader, recognizer, all_frames=False, realtime=False, render_dir=None):
+    """Yield (frame index, recorded summary or None, replayed summary) per replayed frame"""
+    recorded = {result['t']: result for result in reader.results}
+    indices = [i for i, entry in enumerate(reader.frames) if all_frames or entry[2] in recorded]
+    if not indices:
+        indices = list(range(len(reader)))
+
+    clock_start = time.perf_counter()
+    session_start = reader.frames[indices[0]][2] if indices else 0.0
+    for i in indices:
+        frame, timestamp, label = reader.frame(i)
+        if frame is None:
+            continue
+        if realtime:
+            delay = (timestamp - session_start) - (time.perf_counter() - clock_start)
+            if delay > 0:
+                time.sleep(delay)
+
+        result = recognizer.recognize(frame, frame_time=timestamp)
+        if render_dir:
+            visualization = recognizer.overlay.render(frame, result, recognizer, copy=not frame.flags.writeable)
+            cv2.imwrite(os.path.join(render_dir, f"frame-{i:06d}.jpg"), visualization)
+        confirmed = recognizer.confirm_gesture(result.gesture, timestamp)
+        yield i, recorded.get(timestamp), dict(result_summary(result, confirmed), t=timestamp, label=label)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded session through the gesture recognizer")
+    parser.add_argument('session', help="session file recorded with --record or the actions menu")
+    parser.add_argument('--profile', choices=list(PREPROCESS_PROFILES),
+                        help="preprocessing profile (default: the one used while recording)")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help="trained classifier to load")
+    parser.add_argument('--all-frames', action='store_true',
+                        help="replay every recorded frame, not just the ones recognized live")
+    parser.add_argument('--realtime', action='store_true', help="replay at the recorded pace")
+    parser.add_argument('--render', metavar='DIR', help="write annotated frames to this directory")
+    parser.add_argument('-o', '--output', help="write replayed results as JSON lines to this file")
+    parser.add_argument('--show-mismatches', type=int, default=10,
+                        help="number of disagreeing frames to list")
+    args = parser.parse_args(argv)
+
+    try:
+        reader = SessionReader(args.session)
+    except (OSError, ValueError) as e:
+        print(f"Could not open session: {str(e)}", file=sys.stderr)
+        return 1
+    if not reader.complete:
+        print("Session was not closed cleanly; index rebuilt from the records", file=sys.stderr)
+    if args.render:
+        os.makedirs(args.render, exist_ok=True)
+
+    profile = args.profile or reader.header.get('profile', 'quality')
+    recognizer = GestureRecognizer(profile, model_path=args.model)
+    # Sessions from before the header kept it were all recorded by the game, which uses one second
+    recognizer.gesture_history.max_age = reader.header.get('vote_max_age', 1.0)
+    output = open(args.output, 'w') if args.output else None
+    frames = compared = agreed = 0
+    mismatches = []
+    started = time.perf_counter()
+    try:
+        for index, recorded, replayed in replay(reader, recognizer, args.all_frames, args.realtime, args.render):
+            frames += 1
+            if output is not None:
+                output.write(json.dumps(dict(replayed, frame=index)) + "\n")
+            if recorded is None:
+                continue
+            compared += 1
+            if recorded['gesture'] == replayed['gesture']:
+                agreed += 1
+            elif len(mismatches) < args.show_mismatches:
+                mismatches.append((index, recorded['gesture'], replayed['gesture']))
+    finally:
+        if output is not None:
+            output.close()
+        reader.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Replayed {frames} frames in {elapsed:.1f}s ({frames / max(elapsed, 1e-9):.1f} fps)")
+    if compared:
+        print(f"Agreement with the recorded session: {agreed}/{compared} ({100.0 * agreed / compared:.1f}%)")
+        for index, recorded_gesture, replayed_gesture in mismatches:
+            print(f"  frame {index}: recorded {recorded_gesture}, replayed {replayed_gesture}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
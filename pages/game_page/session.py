@@ -0,0 +1,230 @@
+"""Recorded camera sessions: frames plus what the recognizer made of them.
+
+A session file (.rpsrec) is an append-only sequence of records after a
+small JSON header. Frame records hold one encoded image (JPEG, PNG, or raw
+pixels) and result records hold a RecognitionResult summary keyed by the
+capture time of the frame it came from. Closing the writer appends an
+index, so readers seek straight to any frame. If a recording was cut short,
+the reader rebuilds the index by scanning the records instead.
+
+Readers memory-map the file: images are decoded straight from the mapping,
+and raw frames are copied out of it with a single copy, so frames stay
+valid after the reader is closed.
+"""
+import json
+import mmap
+import struct
+import threading
+import time
+
+import cv2
+import numpy as np
+
+MAGIC = b'RPSSESS1'
+INDEX_MAGIC = b'RPSINDEX'
+# Record header: kind, metadata length, data length
+RECORD = struct.Struct('<2sII')
+FOOTER = struct.Struct('<Q8s')
+CODECS = {
+    'jpg': ('.jpg', [cv2.IMWRITE_JPEG_QUALITY, 95]),
+    'png': ('.png', [cv2.IMWRITE_PNG_COMPRESSION, 1]),
+    'raw': (None, None),
+}
+
+
+def result_summary(result, confirmed=None):
+    """JSON-friendly summary of a RecognitionResult"""
+    return {
+        'gesture': result.gesture,
+        'raw_gesture': result.raw_gesture,
+        'stable_gesture': result.stable_gesture,
+        'confirmed': confirmed,
+        'confidences': {name: round(float(value), 4) for name, value in result.confidences.items()},
+        'finger_count': int(result.finger_count),
+        'roi_bounds': [int(value) for value in result.roi_bounds],
+        'timings': {stage: round(value, 3) for stage, value in result.timings.items()},
+    }
+
+
+class SessionWriter:
+    """Appends frame and result records to a session file"""
+
+    def __init__(self, path, codec='jpg', metadata=None):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown session codec: {codec}")
+        self.path = path
+        self.codec = codec
+        self.lock = threading.Lock()
+        self.frames = []
+        self.results = []
+        self.file = open(path, 'wb')
+        header = dict(metadata or {}, codec=codec, created=time.time())
+        header_bytes = json.dumps(header).encode()
+        self.file.write(MAGIC + struct.pack('<I', len(header_bytes)) + header_bytes)
+
+    def write_frame(self, frame, timestamp, label=None):
+        """Encode and append one BGR frame; return its index"""
+        extension, params = CODECS[self.codec]
+        if extension is None:
+            data = np.ascontiguousarray(frame).tobytes()
+        else:
+            ok, encoded = cv2.imencode(extension, frame, params)
+            if not ok:
+                raise ValueError("Could not encode frame")
+            data = encoded.tobytes()
+
+        meta = {'t': timestamp, 'label': label, 'shape': list(frame.shape)}
+        with self.lock:
+            meta['i'] = len(self.frames)
+            offset = self.write_record(b'FR', meta, data)
+            self.frames.append([offset, len(data), timestamp, label, list(frame.shape)])
+            return meta['i']
+
+    def write_result(self, timestamp, result, confirmed=None):
+        """Append what the recognizer produced for the frame captured at `timestamp`"""
+        meta = dict(result_summary(result, confirmed), t=timestamp)
+        with self.lock:
+            self.write_record(b'RS', meta, b'')
+            self.results.append(meta)
+
+    def write_record(self, kind, meta, data):
+        """Write one record and return the file offset of its data"""
+        meta_bytes = json.dumps(meta).encode()
+        self.file.write(RECORD.pack(kind, len(meta_bytes), len(data)))
+        self.file.write(meta_bytes)
+        offset = self.file.tell()
+        self.file.write(data)
+        return offset
+
+    def close(self):
+        with self.lock:
+            if self.file.closed:
+                return
+            index_offset = self.file.tell()
+            self.file.write(json.dumps({'frames': self.frames, 'results': self.results}).encode())
+            self.file.write(FOOTER.pack(index_offset, INDEX_MAGIC))
+            self.file.close()
+
+
+class SessionReader:
+    """Random access to the frames and results of a session file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a session recording")
+        header_length = struct.unpack_from('<I', self.map, len(MAGIC))[0]
+        self.header_end = len(MAGIC) + 4 + header_length
+        self.header = json.loads(self.map[len(MAGIC) + 4:self.header_end])
+        self.codec = self.header.get('codec', 'jpg')
+        self.complete = self.load_index()
+        if not self.complete:
+            self.scan()
+
+    def load_index(self):
+        """Load the index written on close; return False if there is none"""
+        if len(self.map) < self.header_end + FOOTER.size:
+            return False
+        index_offset, magic = FOOTER.unpack_from(self.map, len(self.map) - FOOTER.size)
+        if magic != INDEX_MAGIC:
+            return False
+        index = json.loads(self.map[index_offset:len(self.map) - FOOTER.size])
+        self.frames = index['frames']
+        self.results = index['results']
+        return True
+
+    def scan(self):
+        """Rebuild the index from the records of an unfinished recording"""
+        self.frames = []
+        self.results = []
+        position = self.header_end
+        while position + RECORD.size <= len(self.map):
+            kind, meta_length, data_length = RECORD.unpack_from(self.map, position)
+            data_offset = position + RECORD.size + meta_length
+            if kind not in (b'FR', b'RS') or data_offset + data_length > len(self.map):
+                break
+            meta = json.loads(self.map[position + RECORD.size:data_offset])
+            if kind == b'FR':
+                self.frames.append([data_offset, data_length, meta['t'], meta['label'], meta['shape']])
+            else:
+                self.results.append(meta)
+            position = data_offset + data_length
+
+    def __len__(self):
+        return len(self.frames)
+
+    def frame(self, index):
+        """Return (frame, timestamp, label) for one recorded frame"""
+        offset, length, timestamp, label, shape = self.frames[index]
+        data = np.frombuffer(self.map, dtype=np.uint8, count=length, offset=offset)
+        if self.codec == 'raw':
+            # A copy, so no frame keeps the mmap open after close()
+            frame = data.reshape(shape).copy()
+        else:
+            frame = cv2.imdecode(data, cv2.IMREAD_COLOR)
+        return frame, timestamp, label
+
+    def timestamps(self):
+        return np.array([entry[2] for entry in self.frames], dtype=np.float64)
+
+    def fps(self):
+        """Average frame rate of the recording"""
+        times = self.timestamps()
+        if len(times) < 2 or times[-1] <= times[0]:
+            return 30.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+class SessionRecorder:
+    """Records every frame of a CameraService plus recognition results to a session file.
+
+    Frames are read from a sequential subscription on the recorder's own
+    thread, so encoding never slows down capture or recognition. Results
+    are added with record_result() from whichever thread produces them.
+    `label` is stored with each frame and can be set while recording.
+    """
+
+    def __init__(self, path, codec='jpg', metadata=None):
+        self.writer = SessionWriter(path, codec, metadata)
+        self.label = None
+        self.subscription = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self, service):
+        self.subscription = service.subscribe(sequential=True, name='recorder')
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.record_loop, name="session-recorder", daemon=True)
+        self.thread.start()
+
+    def record_loop(self):
+        subscription = self.subscription
+        while not self.stop_event.is_set():
+            frame = subscription.wait(timeout=0.1)
+            if frame is None:
+                continue
+            try:
+                self.writer.write_frame(frame, subscription.timestamp, self.label)
+            except Exception as e:
+                print(f"Error recording frame: {str(e)}")
+
+    def record_result(self, result, confirmed=None):
+        if result.frame_time is not None:
+            self.writer.write_result(result.frame_time, result, confirmed)
+
+    def stop(self):
+        """Stop recording, write the index and return the number of frames recorded"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+        if self.subscription is not None:
+            self.subscription.close()
+        self.writer.close()
+        return len(self.writer.frames)
@@ -0,0 +1,242 @@
+"""Computer opponents, batched over many independent matches.
+
+A strategy plays `matches` matches at once: move() returns one gesture
+index per match and update() tells it what both sides played. State is
+kept in NumPy arrays with one row per match, so the tournament simulator
+advances thousands of matches per array operation.
+
+Learning strategies predict the opponent's next move as counts over the
+gestures and play the best response to that prediction under the RuleSet:
+the move with the highest expected score. This works for any variant,
+including ones where a gesture is beaten by several others.
+"""
+import numpy as np
+
+# Largest context space an n-gram strategy tracks as one rolling number; larger ones are hashed
+MAX_CONTEXTS = 2 ** 40
+# Counts one n-gram table may hold per match (256 KB), whatever the variant's size
+MAX_TABLE_CELLS = 65536
+# Fibonacci hashing spreads contexts over a table with fewer rows
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+class Strategy:
+    """Base class; see the module docstring"""
+
+    name = None
+
+    def __init__(self, rules, matches=1, rng=None):
+        self.rules = rules
+        self.size = len(rules)
+        self.matches = matches
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.rows = np.arange(matches)
+        # payoff[o, m]: score of move m against opponent move o
+        self.payoff = rules.outcomes.T.astype(np.float32)
+
+    def move(self):
+        raise NotImplementedError
+
+    def update(self, own, opponent):
+        pass
+
+    def best_response(self, counts):
+        """Moves with the highest expected score against predicted opponent counts"""
+        expected = counts @ self.payoff
+        # Counts are whole numbers, so the noise only breaks ties, at random
+        expected += self.rng.random(expected.shape, dtype=np.float32) * 1e-3
+        return expected.argmax(axis=1)
+
+
+class RandomStrategy(Strategy):
+    """Uniformly random moves, what the game has always played"""
+
+    name = 'random'
+
+    def move(self):
+        return self.rng.integers(0, self.size, self.matches)
+
+
+class BiasedStrategy(Strategy):
+    """Random moves from a fixed, uneven distribution per match, like a player's favourites"""
+
+    name = 'biased'
+
+    def __init__(self, rules, matches=1, rng=None):
+        super().__init__(rules, matches, rng)
+        self.cdf = self.rng.dirichlet(np.ones(self.size), matches).cumsum(axis=1)
+
+    def move(self):
+        return (self.rng.random((self.matches, 1)) < self.cdf).argmax(axis=1)
+
+
+class CycleStrategy(Strategy):
+    """Walks through the gestures in order from a random start"""
+
+    name = 'cycle'
+
+    def __init__(self, rules, matches=1, rng=None):
+        super().__init__(rules, matches, rng)
+        self.next = self.rng.integers(0, self.size, matches)
+
+    def move(self):
+        return self.next
+
+    def update(self, own, opponent):
+        self.next = (own + 1) % self.size
+
+
+class BeatLastStrategy(Strategy):
+    """Plays what would have beaten the opponent's previous move"""
+
+    name = 'beat-last'
+
+    def __init__(self, rules, matches=1, rng=None):
+        super().__init__(rules, matches, rng)
+        self.last = None
+
+    def move(self):
+        if self.last is None:
+            return self.rng.integers(0, self.size, self.matches)
+        return self.best_response(np.eye(self.size, dtype=np.float32)[self.last])
+
+    def update(self, own, opponent):
+        self.last = opponent
+
+
+class FrequencyStrategy(Strategy):
+    """Best response to how often the opponent played each gesture"""
+
+    name = 'frequency'
+
+    def __init__(self, rules, matches=1, rng=None):
+        super().__init__(rules, matches, rng)
+        self.counts = np.zeros((matches, self.size), dtype=np.float32)
+
+    def move(self):
+        return self.best_response(self.counts)
+
+    def update(self, own, opponent):
+        self.counts[self.rows, opponent] += 1
+
+
+class NGramStrategy(Strategy):
+    """Best response to what the opponent played after the same recent moves.
+
+    The context is the last `order` moves of the opponent, or with `joint`
+    the last `order` rounds of both sides, so players who react to the
+    computer's moves are caught too. Counts of the opponent's next move are
+    kept per context in a table of at most `buckets` rows per match. Longer
+    contexts share rows, so memory stays fixed however long a match runs.
+    """
+
+    def __init__(self, rules, matches=1, rng=None, order=1, joint=False, buckets=4096):
+        super().__init__(rules, matches, rng)
+        self.order = order
+        self.joint = joint
+        self.base = self.size ** 2 if joint else self.size
+        self.contexts = self.base ** order
+        self.buckets = min(buckets, self.contexts, MAX_TABLE_CELLS // self.size)
+        self.table = np.zeros((matches, self.buckets, self.size), dtype=np.float32)
+        self.context = np.zeros(matches, dtype=np.int64)
+        self.bucket = self.context
+        # Contexts too large for one int64 are kept as the last `order` symbols and hashed
+        self.window = None
+        if self.contexts > MAX_CONTEXTS:
+            self.window = np.zeros((matches, order), dtype=np.uint64)
+
+    def move(self):
+        return self.best_response(self.table[self.rows, self.bucket])
+
+    def update(self, own, opponent):
+        self.table[self.rows, self.bucket, opponent] += 1
+        symbol = own * self.size + opponent if self.joint else opponent
+        if self.window is not None:
+            self.window[:, :-1] = self.window[:, 1:]
+            self.window[:, -1] = symbol
+            # Polynomial hash of the window; uint64 arithmetic wraps around
+            mixed = self.window[:, 0].copy()
+            for column in range(1, self.order):
+                mixed = mixed * HASH_MULTIPLIER + self.window[:, column]
+            self.bucket = self.hash_bucket(mixed)
+            return
+        # Rolling context: drop the oldest move, append the newest
+        self.context = (self.context * self.base + symbol) % self.contexts
+        if self.buckets == self.contexts:
+            self.bucket = self.context
+        else:
+            self.bucket = self.hash_bucket(self.context.astype(np.uint64))
+
+    def hash_bucket(self, keys):
+        mixed = (keys * HASH_MULTIPLIER) >> np.uint64(32)
+        return (mixed % np.uint64(self.buckets)).astype(np.intp)
+
+
+class MarkovStrategy(NGramStrategy):
+    """First-order Markov model of the opponent's own moves"""
+
+    name = 'markov'
+
+    def __init__(self, rules, matches=1, rng=None):
+        super().__init__(rules, matches, rng, order=1)
+
+
+class PatternStrategy(NGramStrategy):
+    """Matches the last two rounds of both sides against earlier ones"""
+
+    name = 'pattern'
+
+    def __init__(self, rules, matches=1, rng=None):
+        super().__init__(rules, matches, rng, order=2, joint=True)
+
+
+class AdaptiveStrategy(Strategy):
+    """Ensemble of the learning strategies, weighted by how well each did recently.
+
+    Every member proposes a move each round. Once the opponent's move is
+    known, each member is scored on what its proposal would have won or
+    lost, and older rounds fade by `decay` per round. The ensemble plays
+    the proposal with the most weight, counting members by their positive
+    scores. While no member is ahead, for instance against a random
+    player, it plays randomly and so cannot be exploited either. Updates
+    only look at the latest round, so each round costs the same however
+    long the match has run.
+    """
+
+    name = 'adaptive'
+
+    def __init__(self, rules, matches=1, rng=None, decay=0.9):
+        super().__init__(rules, matches, rng)
+        self.decay = decay
+        self.members = [
+            BeatLastStrategy(rules, matches, self.rng),
+            FrequencyStrategy(rules, matches, self.rng),
+            MarkovStrategy(rules, matches, self.rng),
+            NGramStrategy(rules, matches, self.rng, order=2),
+            PatternStrategy(rules, matches, self.rng),
+            NGramStrategy(rules, matches, self.rng, order=3, joint=True),
+        ]
+        self.scores = np.zeros((matches, len(self.members)), dtype=np.float32)
+        self.proposals = None
+        self.one_hot = np.eye(self.size, dtype=np.float32)
+
+    def move(self):
+        self.proposals = np.stack([member.move() for member in self.members], axis=1)
+        weights = np.maximum(self.scores, 0)
+        votes = (weights[:, :, None] * self.one_hot[self.proposals]).sum(axis=1)
+        chosen = votes.argmax(axis=1)
+        return np.where(weights.any(axis=1), chosen, self.rng.integers(0, self.size, self.matches))
+
+    def update(self, own, opponent):
+        if self.proposals is not None:
+            self.scores *= self.decay
+            self.scores += self.rules.outcomes[self.proposals, opponent[:, None]]
+            self.proposals = None
+        for member in self.members:
+            member.update(own, opponent)
+
+
+STRATEGIES = {strategy.name: strategy for strategy in (
+    RandomStrategy, BiasedStrategy, CycleStrategy, BeatLastStrategy,
+    FrequencyStrategy, MarkovStrategy, PatternStrategy, AdaptiveStrategy,
+)}
@@ -0,0 +1,221 @@
+"""In-process metrics for the camera and recognition pipeline.
+
+Counters, gauges and latency histograms are recorded into a Telemetry
+registry (TELEMETRY by default) and can be read in-process, written to a
+file as JSON or Prometheus text, or served over HTTP for scraping:
+
+    TELEMETRY.observe('gesture_stage_latency_ms', 4.2, stage='preprocess')
+    TELEMETRY.serve(9100)              # GET /metrics or /metrics.json
+    TELEMETRY.dump('metrics.prom')     # or metrics.json
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds in milliseconds for latency histograms
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+HELP = {
+    'gesture_stage_latency_ms': "Time spent in each recognition stage",
+    'gesture_frames_total': "Frames passed to the recognizer, by outcome",
+    'gesture_recognition_fps': "Frames recognized per second",
+    'gesture_stability': "Stability score of the recognized gesture",
+    'camera_frames_captured_total': "Frames read from the camera",
+    'camera_frames_dropped_total': "Frames a consumer skipped because it was busy",
+    'camera_read_failures_total': "Times the camera stopped delivering frames",
+    'camera_capture_fps': "Frames captured per second",
+    'camera_reinit_total': "Times the game tried to reinitialize the camera",
+    'server_requests_total': "Requests handled by the game server, by operation",
+    'server_request_latency_ms': "Time the game server took to answer a request",
+    'server_active_matches': "Matches currently open on the game server",
+    'server_connections': "Clients currently connected to the game server",
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a binary search and two additions"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Approximate quantile: the upper bound of the bucket holding it"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def cumulative(self):
+        """Return [(upper bound, observations at or below it)] ending with +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class Telemetry:
+    """Registry of labelled counters, gauges and histograms"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.gauges[key] = value
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def value(self, name, **labels):
+        """Current value of a counter or gauge, or 0 if it was never recorded"""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            return self.counters.get(key, self.gauges.get(key, 0))
+
+    def histogram(self, name, **labels):
+        return self.histograms.get((name, tuple(sorted(labels.items()))))
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        """Return every metric as a JSON-serializable dict"""
+        with self.lock:
+            return {
+                'timestamp': time.time(),
+                'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                             for (name, labels), value in sorted(self.counters.items())],
+                'gauges': [{'name': name, 'labels': dict(labels), 'value': value}
+                           for (name, labels), value in sorted(self.gauges.items())],
+                'histograms': [{'name': name, 'labels': dict(labels), 'count': h.count, 'sum': round(h.sum, 4),
+                                'p50': h.quantile(0.5), 'p95': h.quantile(0.95), 'p99': h.quantile(0.99),
+                                'buckets': [[str(bound), count] for bound, count in h.cumulative()]}
+                               for (name, labels), h in sorted(self.histograms.items())],
+            }
+
+    def to_prometheus(self):
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        described = set()
+
+        def header(name, kind):
+            if name not in described:
+                described.add(name)
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                header(name, 'counter')
+                lines.append(f"{name}{format_labels(labels)} {value}")
+            for (name, labels), value in sorted(self.gauges.items()):
+                header(name, 'gauge')
+                lines.append(f"{name}{format_labels(labels)} {value}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                header(name, 'histogram')
+                for bound, count in h.cumulative():
+                    le = '+Inf' if bound == float('inf') else str(bound)
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', le),))} {count}")
+                lines.append(f"{name}_sum{format_labels(labels)} {h.sum}")
+                lines.append(f"{name}_count{format_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """Write all metrics to a .json file, or as Prometheus text to any other file"""
+        if path.endswith('.json'):
+            text = json.dumps(self.snapshot(), indent=2)
+        else:
+            text = self.to_prometheus()
+        # Write to a temporary file first so readers never see a partial dump
+        temporary = path + '.tmp'
+        with open(temporary, 'w') as file:
+            file.write(text)
+        os.replace(temporary, path)
+
+    def start_dump(self, path, interval=10.0):
+        """Dump to `path` every `interval` seconds from a daemon thread"""
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.dump(path)
+                except OSError as e:
+                    print(f"Error writing metrics: {str(e)}")
+
+        thread = threading.Thread(target=loop, name="telemetry-dump", daemon=True)
+        thread.start()
+        return thread
+
+    def serve(self, port, host='127.0.0.1'):
+        """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread"""
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = telemetry.to_prometheus(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, content_type = json.dumps(telemetry.snapshot()), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="telemetry-http", daemon=True).start()
+        return server
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+# Shared registry used by the pipeline unless another one is passed in
+TELEMETRY = Telemetry()
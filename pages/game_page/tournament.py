@@ -0,0 +1,162 @@
+"""Monte Carlo tournament between computer strategies, without any UI.
+
+Usage:
+    python -m pages.game_page.tournament
+    python -m pages.game_page.tournament random frequency markov pattern --matches 20000 --rounds 100
+    python -m pages.game_page.tournament --rules rps-15 -o tournament.json
+
+Every pair of strategies plays --matches independent matches of --rounds
+rounds each. A pair's matches are split into chunks, and the chunks run in
+parallel worker processes. Within a chunk, all matches advance together:
+each round is a handful of NumPy operations over every match, scored with
+the RuleSet's outcome matrix. Win rates come with 95% confidence intervals
+over matches, because rounds within one match are not independent against
+learning strategies. Throughput is reported in rounds per second.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pages.game_page.game_rules import LOSS, WIN, load_rules
+from pages.game_page.strategies import STRATEGIES
+
+# Normal quantile of a two-sided 95% confidence interval
+Z_95 = 1.96
+
+
+def play_chunk(task):
+    """Play one chunk of a pair's matches; return per-match wins and losses of the first strategy"""
+    pair, first, second, rules_name, matches, rounds, seed = task
+    rules = load_rules(rules_name)
+    rng = np.random.default_rng(seed)
+    a = STRATEGIES[first](rules, matches, rng)
+    b = STRATEGIES[second](rules, matches, rng)
+    wins = np.zeros(matches, dtype=np.int32)
+    losses = np.zeros(matches, dtype=np.int32)
+    for _ in range(rounds):
+        move_a = a.move()
+        move_b = b.move()
+        outcome = rules.score(move_a, move_b)
+        wins += outcome == WIN
+        losses += outcome == LOSS
+        a.update(move_a, move_b)
+        b.update(move_b, move_a)
+    return pair, wins, losses
+
+
+def interval(rates):
+    """Mean and 95% confidence half-width of per-match rates"""
+    mean = float(rates.mean())
+    if len(rates) < 2:
+        return mean, None
+    return mean, float(Z_95 * rates.std(ddof=1) / np.sqrt(len(rates)))
+
+
+def pair_result(first, second, wins, losses, rounds):
+    win_rate, win_ci = interval(wins / rounds)
+    loss_rate, loss_ci = interval(losses / rounds)
+    net, net_ci = interval((wins - losses) / rounds)
+    return {
+        'first': first, 'second': second, 'matches': len(wins), 'rounds': len(wins) * rounds,
+        'win_rate': round(win_rate, 4), 'win_ci': round(win_ci, 4) if win_ci is not None else None,
+        'loss_rate': round(loss_rate, 4), 'loss_ci': round(loss_ci, 4) if loss_ci is not None else None,
+        'tie_rate': round(1.0 - win_rate - loss_rate, 4),
+        'net': round(net, 4), 'net_ci': round(net_ci, 4) if net_ci is not None else None,
+    }
+
+
+def standings(results, names):
+    """Average net score of each strategy over all its opponents, best first"""
+    scores = {name: [] for name in names}
+    for result in results:
+        scores[result['first']].append(result['net'])
+        scores[result['second']].append(-result['net'])
+    return sorted(((name, round(float(np.mean(nets)), 4)) for name, nets in scores.items() if nets),
+                  key=lambda item: -item[1])
+
+
+def run_tournament(names, rules_name, matches, rounds, chunk, workers, seed=0):
+    pairs = list(itertools.combinations(names, 2))
+    tasks = []
+    for pair, (first, second) in enumerate(pairs):
+        for start in range(0, matches, chunk):
+            tasks.append([pair, first, second, rules_name, min(chunk, matches - start), rounds])
+    # Independent random streams for every chunk, reproducible from one seed
+    for task, child in zip(tasks, np.random.SeedSequence(seed).spawn(len(tasks))):
+        task.append(child)
+
+    wins = [[] for _ in pairs]
+    losses = [[] for _ in pairs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for pair, chunk_wins, chunk_losses in executor.map(play_chunk, tasks):
+            wins[pair].append(chunk_wins)
+            losses[pair].append(chunk_losses)
+    return [pair_result(first, second, np.concatenate(wins[pair]), np.concatenate(losses[pair]), rounds)
+            for pair, (first, second) in enumerate(pairs)]
+
+
+def print_results(results, ranking, file=sys.stderr):
+    def percent(value, ci):
+        return f"{value * 100:5.1f}%" + (f" ±{ci * 100:4.1f}" if ci is not None else "")
+
+    print(f"{'first':<10} {'second':<10} {'wins':>13} {'ties':>7} {'losses':>13} {'net':>13}", file=file)
+    for r in results:
+        print(f"{r['first']:<10} {r['second']:<10} {percent(r['win_rate'], r['win_ci']):>13} "
+              f"{r['tie_rate'] * 100:6.1f}% {percent(r['loss_rate'], r['loss_ci']):>13} "
+              f"{percent(r['net'], r['net_ci']):>13}", file=file)
+    print(file=file)
+    print("Standings (average net score per round):", file=file)
+    for name, score in ranking:
+        print(f"  {name:<10} {score * 100:+6.1f}%", file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate a round-robin tournament between computer strategies")
+    parser.add_argument('strategies', nargs='*', help=f"strategies to include (default: all of {', '.join(STRATEGIES)})")
+    parser.add_argument('--rules', default='rpsls', help="game variant, see game_rules (default: rpsls)")
+    parser.add_argument('--matches', type=int, default=2000, help="matches per pair of strategies")
+    parser.add_argument('--rounds', type=int, default=100, help="rounds per match")
+    parser.add_argument('--chunk', type=int, default=500, help="matches simulated together in one task")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument('-o', '--output', help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    names = args.strategies or list(STRATEGIES)
+    unknown = [name for name in names if name not in STRATEGIES]
+    if unknown:
+        parser.error(f"unknown strategies: {', '.join(unknown)}")
+    if len(names) < 2:
+        parser.error("a tournament needs at least two strategies")
+    try:
+        rules = load_rules(args.rules)
+    except ValueError as e:
+        parser.error(str(e))
+
+    started = time.perf_counter()
+    results = run_tournament(names, args.rules, args.matches, args.rounds, max(1, args.chunk), args.workers,
+                             args.seed)
+    elapsed = time.perf_counter() - started
+    total = sum(result['rounds'] for result in results)
+    ranking = standings(results, names)
+
+    print(f"{rules.name}: {total} rounds in {elapsed:.2f}s ({total / elapsed:,.0f} rounds/s, "
+          f"{args.workers} workers)", file=sys.stderr)
+    print_results(results, ranking)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rules': rules.name, 'strategies': names, 'matches': args.matches, 'rounds': args.rounds,
+                       'seed': args.seed, 'elapsed_s': round(elapsed, 3),
+                       'rounds_per_s': round(total / elapsed, 1), 'pairs': results,
+                       'standings': [{'strategy': name, 'net': score} for name, score in ranking]}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
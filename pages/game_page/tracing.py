@@ -0,0 +1,101 @@
+"""Per-frame trace recorder with Chrome trace-event export.
+
+Code marks the stages of a frame with spans:
+
+    with TRACER.span('preprocess.denoise'):
+        frame = cv2.bilateralFilter(frame, 9, 75, 75)
+
+While tracing is disabled span() returns a shared no-op context, so the
+instrumentation costs a method call and an attribute check. While it is
+enabled, finished spans go into a bounded ring buffer, so a long session
+keeps only the most recent events. export() writes JSON that chrome://tracing
+and Perfetto can open.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+NULL_SPAN = nullcontext()
+
+
+class Span:
+    __slots__ = ('recorder', 'name', 'args', 'start')
+
+    def __init__(self, recorder, name, args):
+        self.recorder = recorder
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.add(self.name, self.start, time.perf_counter(), self.args)
+        return False
+
+
+class TraceRecorder:
+    """Collects timed spans from any thread into a fixed-size ring buffer"""
+
+    def __init__(self, capacity=100000):
+        self.events = deque(maxlen=capacity)
+        self.thread_names = {}
+        self.enabled = False
+        self.origin = time.perf_counter()
+
+    def enable(self):
+        """Start recording, discarding anything recorded earlier"""
+        self.events.clear()
+        self.origin = time.perf_counter()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name, **args):
+        """Context manager that records the time spent inside it"""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, args)
+
+    def add(self, name, start, end, args=None):
+        """Record a finished span given perf_counter() start and end times"""
+        thread = threading.current_thread()
+        if thread.ident not in self.thread_names:
+            self.thread_names[thread.ident] = thread.name
+        # deque.append is atomic, so worker threads need no lock
+        self.events.append((name, start, end, thread.ident, args))
+
+    def to_chrome_trace(self):
+        """Return the recorded spans as a Chrome trace-event dict"""
+        pid = os.getpid()
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                  for tid, name in self.thread_names.items()]
+        for name, start, end, tid, args in list(self.events):
+            event = {
+                'name': name,
+                'cat': name.split('.', 1)[0],
+                'ph': 'X',
+                'ts': round((start - self.origin) * 1e6, 3),
+                'dur': round((end - start) * 1e6, 3),
+                'pid': pid,
+                'tid': tid,
+            }
+            if args:
+                event['args'] = args
+            events.append(event)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path):
+        """Write the recorded spans to a Chrome trace JSON file"""
+        with open(path, 'w') as file:
+            json.dump(self.to_chrome_trace(), file)
+        return len(self.events)
+
+
+# Shared recorder used by the camera, recognition and display code
+TRACER = TraceRecorder()
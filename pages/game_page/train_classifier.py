@@ -0,0 +1,120 @@
+"""Train the learned gesture classifier from labelled recordings.
+
+Usage:
+    python -m pages.game_page.train_classifier INPUT [INPUT ...] -o models/gesture_classifier.npz
+
+INPUTs are the same as for the batch CLI, plus gesture datasets (.rpsdata)
+whose stored features are used directly. Only frames with a known label
+and a detected hand are used. Features depend on the preprocessing profile,
+so train with the profile the game will run with.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pages.game_page.batch import iter_shard, plan_shards
+from pages.game_page.gesture_classifier import DEFAULT_MODEL_PATH, GestureClassifier
+from pages.game_page.gesture_dataset import GestureDataset
+from pages.game_page.gesture_features import FEATURE_NAMES
+from pages.game_page.gesture_recognition import PREPROCESS_PROFILES
+
+
+def extract_shard(shard):
+    """Return the (features, labels) of every labelled frame with a hand in one shard"""
+    features = []
+    labels = []
+    for _, label, result, _ in iter_shard(shard):
+        if label and result.features is not None:
+            features.append(result.features)
+            labels.append(label)
+    return features, labels
+
+
+def load_dataset(path):
+    """Return the (features, labels) of every labelled sample in a gesture dataset"""
+    dataset = GestureDataset(path)
+    if dataset.header['feature_names'] != FEATURE_NAMES:
+        print(f"Skipping {path}: stored features do not match the current feature set", file=sys.stderr)
+        return [], []
+    labelled = np.flatnonzero(dataset.labels >= 0)
+    return list(dataset.features[labelled]), list(dataset.label_names(labelled))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the gesture classifier from labelled recordings")
+    parser.add_argument('inputs', nargs='+',
+                        help="gesture datasets, session files, video files, image directories or 'synthetic'")
+    parser.add_argument('-o', '--output', default=DEFAULT_MODEL_PATH, help="model file to write")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help="number of worker processes")
+    parser.add_argument('--chunk-size', type=int, default=0,
+                        help="frames per shard; the default 0 keeps each input in one shard, "
+                             "inputs split into chunks may yield different hands")
+    parser.add_argument('--profile', default='quality', choices=list(PREPROCESS_PROFILES),
+                        help="preprocessing profile used to extract features")
+    parser.add_argument('--warmup', type=int, default=30,
+                        help="frames replayed before each shard to prime the background model")
+    parser.add_argument('--epochs', type=int, default=500)
+    parser.add_argument('--learning-rate', type=float, default=0.5)
+    parser.add_argument('--holdout', type=float, default=0.2,
+                        help="fraction of samples kept aside to report accuracy")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    datasets = [spec for spec in args.inputs if spec.endswith('.rpsdata')]
+    sources = [spec for spec in args.inputs if not spec.endswith('.rpsdata')]
+    shards = plan_shards(sources, args.chunk_size, args.warmup, args.profile)
+    if not shards and not datasets:
+        print("No readable inputs", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    features = []
+    labels = []
+    for path in datasets:
+        dataset_features, dataset_labels = load_dataset(path)
+        features.extend(dataset_features)
+        labels.extend(dataset_labels)
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for shard_features, shard_labels in executor.map(extract_shard, shards):
+            features.extend(shard_features)
+            labels.extend(shard_labels)
+    if not features:
+        print("No labelled frames with a detected hand", file=sys.stderr)
+        return 1
+
+    features = np.array(features)
+    labels = np.array(labels)
+    print(f"Extracted {len(labels)} samples in {time.perf_counter() - started:.1f}s: "
+          + ", ".join(f"{name} {count}" for name, count in zip(*np.unique(labels, return_counts=True))),
+          file=sys.stderr)
+
+    # Report accuracy on a held-out split, then train the saved model on everything
+    order = np.random.default_rng(args.seed).permutation(len(labels))
+    test_size = int(len(labels) * args.holdout)
+    if test_size:
+        test, train = order[:test_size], order[test_size:]
+        model = GestureClassifier().fit(features[train], labels[train], args.epochs, args.learning_rate)
+        predicted = np.array(model.predict(features[test]))
+        accuracy = np.mean(predicted == labels[test])
+        print(f"Held-out accuracy {accuracy * 100:.1f}% on {test_size} samples", file=sys.stderr)
+
+    model = GestureClassifier().fit(features, labels, args.epochs, args.learning_rate)
+    model.save(args.output)
+
+    # Time batched inference so latency regressions are visible when retraining
+    repeats = max(1, 10000 // len(features))
+    started = time.perf_counter()
+    for _ in range(repeats):
+        model.predict_proba(features)
+    per_frame = (time.perf_counter() - started) / (repeats * len(features)) * 1e6
+    print(f"Saved {args.output}; batched inference {per_frame:.2f} us/frame", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,6 +2,9 @@ import cv2
 import sys
 import time
 from pages.game_page.gesture_recognition import GestureRecognizer
+from pages.game_page.frame_source import open_source
+from pages.game_page.camera_service import CameraService
+from pages.game_page.overlay import OverlayRenderer
 
 def main():
     """Test the gesture recognition functionality"""
@@ -9,36 +12,39 @@ def main():
     
     # Initialize the gesture recognizer
     recognizer = GestureRecognizer()
+    # Every frame is recognized, but the window is redrawn at most 30 times a second
+    overlay = OverlayRenderer(max_fps=30)
     
-    # Initialize the camera
-    capture = cv2.VideoCapture(0)
-    if not capture.isOpened():
+    # Initialize the frame source (camera index, video, image directory or 'synthetic')
+    # The camera service owns the source and mirrors frames for us
+    camera = CameraService(open_source(sys.argv[1] if len(sys.argv) > 1 else "0", live=True))
+    if not camera.start():
         print("Error: Could not open camera.")
         return
+    frames = camera.subscribe(name='test')
     
     print("Camera opened successfully!")
     print("Press 'q' to quit, 'd' to toggle debug mode")
     
     # Main loop
     while True:
-        # Read a frame from the camera
-        ret, frame = capture.read()
-        if not ret:
+        # Wait for the newest frame from the camera
+        frame = frames.wait(timeout=1.0)
+        if frame is None:
             print("Error: Failed to capture frame.")
             break
         
-        # Mirror the frame for more intuitive interaction
-        frame = cv2.flip(frame, 1)
-        
         # Process the frame for gesture recognition
-        gesture, visualization = recognizer.process_frame(frame)
+        result = recognizer.recognize(frame)
+        gesture = recognizer.confirm_gesture(result.gesture)
         
         # Display detected gesture
         if gesture:
             print(f"Detected gesture: {gesture}")
         
         # Display the frame
-        cv2.imshow("Gesture Recognition Test", visualization)
+        if overlay.due():
+            cv2.imshow("Gesture Recognition Test", overlay.render(frame, result, recognizer))
         
         # Check for user input
         key = cv2.waitKey(1) & 0xFF
@@ -51,7 +57,7 @@ def main():
             print(f"Debug mode: {'ON' if recognizer.debug_mode else 'OFF'}")
     
     # Release resources
-    capture.release()
+    camera.stop()
     cv2.destroyAllWindows()
     print("Test completed.")
 
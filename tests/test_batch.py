@@ -0,0 +1,43 @@
+
+import csv
+
+from pages.game_page.batch import main, plan_shards, run_shard
+from pages.game_page.frame_source import SyntheticHandSource
+from pages.game_page.gesture_recognition import GestureRecognizer
+
+INPUTS = ['synthetic:rock,paper', 'synthetic:scissors,spock']
+
+
+def read_rows(path):
+    with open(path, newline='') as file:
+        rows = list(csv.DictReader(file))
+    # Latency is the only column that may change between runs
+    for row in rows:
+        del row['latency_ms']
+    return rows
+
+
+def test_default_shards_match_one_recognizer_per_input():
+    shards = plan_shards(INPUTS, 0, 30, 'fast')
+    assert [shard[1:4] for shard in shards] == [(0, 80, 0), (0, 80, 0)]
+    rows = [row for shard in shards for row in run_shard(shard)]
+
+    expected = []
+    for spec in INPUTS:
+        recognizer = GestureRecognizer('fast')
+        source = SyntheticHandSource(spec.partition(':')[2].split(','))
+        source.open()
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                break
+            expected.append(recognizer.recognize(frame).gesture)
+    assert [row['gesture'] for row in rows] == expected
+
+
+def test_output_does_not_depend_on_workers(tmp_path):
+    one, two = tmp_path / 'one.csv', tmp_path / 'two.csv'
+    assert main(INPUTS + ['-o', str(one), '-j', '1', '--profile', 'fast']) == 0
+    assert main(INPUTS + ['-o', str(two), '-j', '2', '--profile', 'fast']) == 0
+    assert read_rows(one) == read_rows(two)
+    assert len(read_rows(one)) == 160
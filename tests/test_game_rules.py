@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pytest
+
+from pages.game_page import game_rules
+from pages.game_page.game_engine import determine_winner
+from pages.game_page.game_rules import DEFAULT_RULES, LOSS, TIE, WIN, RuleSet, load_variant
+
+# The rules table the game used before RuleSet: (winner, loser) -> message
+CLASSIC = {
+    ("scissors", "paper"): "Scissors cuts Paper",
+    ("paper", "rock"): "Paper covers Rock",
+    ("rock", "lizard"): "Rock crushes Lizard",
+    ("lizard", "spock"): "Lizard poisons Spock",
+    ("spock", "scissors"): "Spock smashes Scissors",
+    ("scissors", "lizard"): "Scissors decapitates Lizard",
+    ("lizard", "paper"): "Lizard eats Paper",
+    ("paper", "spock"): "Paper disproves Spock",
+    ("spock", "rock"): "Spock vaporizes Rock",
+    ("rock", "scissors"): "Rock crushes Scissors",
+}
+GESTURES = ["rock", "paper", "scissors", "lizard", "spock"]
+
+
+def test_outcomes_match_classic_rules():
+    for player in GESTURES:
+        for computer in GESTURES:
+            if player == computer:
+                expected, message = TIE, None
+            elif (player, computer) in CLASSIC:
+                expected, message = WIN, CLASSIC[(player, computer)]
+            else:
+                expected, message = LOSS, CLASSIC[(computer, player)]
+            assert DEFAULT_RULES.outcome(player, computer) == expected
+            assert DEFAULT_RULES.message(player, computer) == message
+
+
+def test_outcome_matrix_is_antisymmetric_and_balanced():
+    outcomes = DEFAULT_RULES.outcomes
+    assert np.array_equal(outcomes, -outcomes.T)
+    assert list((outcomes == WIN).sum(axis=1)) == [2] * 5
+
+
+def test_determine_winner_messages():
+    assert determine_winner("spock", "rock") == ("Pi", "Pi Wins! Spock vaporizes Rock")
+    assert determine_winner("lizard", "rock") == ("You", "You Win! Rock crushes Lizard")
+    assert determine_winner("paper", "paper") == ("Tie", "It's a Tie!")
+
+
+def test_cyclic_order_reproduces_rpsls():
+    cyclic = RuleSet.cyclic("cyclic", ["rock", "scissors", "lizard", "paper", "spock"])
+    order = [cyclic.index[gesture] for gesture in GESTURES]
+    assert np.array_equal(cyclic.outcomes[np.ix_(order, order)], DEFAULT_RULES.outcomes)
+
+
+def test_score_and_tally_many_rounds():
+    players = DEFAULT_RULES.encode(["rock", "rock", "paper", "spock"])
+    computers = DEFAULT_RULES.encode(["scissors", "rock", "lizard", "paper"])
+    assert list(DEFAULT_RULES.score(players, computers)) == [WIN, TIE, LOSS, LOSS]
+    assert DEFAULT_RULES.tally(players, computers) == (1, 1, 2)
+
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        RuleSet("undecided", ["rock", "paper", "scissors"], [("paper", "covers", "rock")])
+    with pytest.raises(ValueError):
+        RuleSet("contradictory", ["rock", "paper"], [("paper", "covers", "rock"), ("rock", "crushes", "paper")])
+    with pytest.raises(ValueError):
+        RuleSet.cyclic("even", ["rock", "paper", "scissors", "lizard"])
+
+
+def test_shipped_variants_are_balanced(monkeypatch):
+    monkeypatch.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    for name in sorted(os.listdir(game_rules.RULES_DIR)):
+        rules = load_variant(name[:-len('.json')])
+        wins = (rules.outcomes == WIN).sum(axis=1)
+        assert list(wins) == [(len(rules) - 1) // 2] * len(rules)
+
+
+def test_load_variant_accepts_names_only():
+    assert len(load_variant("rps-9")) == 9
+    for name in ("../rules", "/etc/passwd", "rps-2000"):
+        with pytest.raises(ValueError):
+            load_variant(name)
@@ -0,0 +1,47 @@
+import cv2
+import numpy as np
+
+from pages.game_page import gesture_dataset
+from pages.game_page.gesture_dataset import GestureDataset, mask_contour
+from pages.game_page.gesture_features import FEATURE_NAMES
+
+
+def square(size):
+    return np.array([[[10, 10]], [[10 + size, 10]], [[10 + size, 10 + size]], [[10, 10 + size]]], dtype=np.int32)
+
+
+def test_samples_survive_reopening(tmp_path):
+    path = str(tmp_path / 'gestures.rpsdata')
+    dataset = GestureDataset(path, 'a')
+    session = dataset.add_session('test')
+    features = np.arange(len(FEATURE_NAMES), dtype=np.float32)
+    dataset.add('rock', square(100), features, session, frame=3, timestamp=1.5)
+    dataset.add('paper', square(200), features + 1, session, frame=4, timestamp=2.0)
+    dataset.add('unknown', square(50), features + 2, session)
+    dataset.close()
+
+    dataset = GestureDataset(path)
+    assert len(dataset) == 3
+    assert list(dataset.label_names()) == ['rock', 'paper', None]
+    assert list(dataset.select(label='paper')) == [1]
+    assert list(dataset.select(session='test')) == [0, 1, 2]
+    assert np.array_equal(dataset.features[1], features + 1)
+    assert list(dataset.column('frame')[:2]) == [3, 4]
+    assert list(dataset.column('timestamp')[:2]) == [1.5, 2.0]
+    # The stored silhouette gives back a hand of the original size
+    contour = mask_contour(dataset.masks[1], float(dataset.column('scale')[1]))
+    assert abs(cv2.contourArea(contour) - 200 * 200) < 0.05 * 200 * 200
+
+
+def test_growing_keeps_samples(tmp_path, monkeypatch):
+    monkeypatch.setattr(gesture_dataset, 'INITIAL_CAPACITY', 4)
+    path = str(tmp_path / 'gestures.rpsdata')
+    dataset = GestureDataset(path, 'a')
+    for i in range(10):
+        dataset.add('spock', square(60 + i), np.full(len(FEATURE_NAMES), i, dtype=np.float32), frame=i)
+    dataset.close()
+
+    dataset = GestureDataset(path)
+    assert len(dataset) == 10 and dataset.header['capacity'] == 16
+    assert list(dataset.column('frame')) == list(range(10))
+    assert list(dataset.features[:, 0]) == list(range(10))
@@ -0,0 +1,17 @@
+from pages.game_page.gesture_history import GestureHistory
+
+
+def test_stable_skips_heavier_gesture_without_enough_votes():
+    history = GestureHistory(size=5, min_votes=2)
+    history.add('rock', 1.0, now=0.0)
+    history.add('paper', 0.45, now=0.1)
+    history.add('paper', 0.45, now=0.2)
+    assert history.leader(now=0.3)[0] == 'rock'
+    assert history.stable(now=0.3) == 'paper'
+
+
+def test_stable_none_without_enough_votes():
+    history = GestureHistory(size=5, min_votes=2)
+    history.add('rock', 1.0, now=0.0)
+    history.add('paper', 0.9, now=0.1)
+    assert history.stable(now=0.2) is None
@@ -0,0 +1,32 @@
+import cv2
+import numpy as np
+import pytest
+
+from pages.game_page.gesture_recognition import GestureRecognizer
+
+
+def static_scene():
+    """A textured background with uneven lighting, the case CLAHE is meant for"""
+    rng = np.random.default_rng(0)
+    texture = cv2.resize(rng.integers(0, 255, (12, 16, 3), dtype=np.uint8), (320, 240),
+                         interpolation=cv2.INTER_CUBIC)
+    lighting = np.linspace(0.4, 1.0, 320, dtype=np.float32)[None, :, None]
+    return (texture * lighting).astype(np.uint8)
+
+
+@pytest.mark.parametrize('profile', ['quality', 'balanced', 'fast'])
+def test_window_pass_matches_full_pass_on_static_scene(profile):
+    recognizer = GestureRecognizer(profile, model_path=None, motion_gate=False)
+    frame = static_scene()
+    bounds = recognizer.get_roi_bounds(frame)
+    roi = frame[bounds[1]:bounds[3], bounds[0]:bounds[2]]
+    for _ in range(30):
+        full = recognizer.preprocess_frame(roi)
+
+    window = (bounds[0] + 40, bounds[1] + 30, bounds[0] + 150, bounds[1] + 160)
+    windowed = recognizer.preprocess_window(frame, window, bounds)
+    scale = full.shape[1] / (bounds[2] - bounds[0])
+    x0, y0 = int(round(40 * scale)), int(round(30 * scale))
+    x1, y1 = int(round(150 * scale)), int(round(160 * scale))
+    assert not full.any()
+    assert np.array_equal(windowed, full[y0:y1, x0:x1])
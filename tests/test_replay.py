@@ -0,0 +1,37 @@
+import json
+
+from pages.game_page.frame_source import SyntheticHandSource
+from pages.game_page.gesture_recognition import GestureRecognizer
+from pages.game_page.replay import main
+from pages.game_page.session import SessionWriter
+
+
+def test_fast_replay_matches_live_run(tmp_path):
+    path = tmp_path / 'session.rpsrec'
+    writer = SessionWriter(str(path), 'png', {'profile': 'fast', 'vote_max_age': 1.0})
+    live = GestureRecognizer('fast', model_path=None)
+    live.gesture_history.max_age = 1.0
+    source = SyntheticHandSource(['rock', 'paper', 'scissors'])
+    source.open()
+    confirmed = []
+    # Two frames a second, as the game recognizes while idle, so old votes expire
+    timestamp = 100.0
+    while True:
+        ret, frame = source.read()
+        if not ret:
+            break
+        timestamp += 0.5
+        writer.write_frame(frame, timestamp, source.label)
+        result = live.recognize(frame, frame_time=timestamp)
+        gesture = live.confirm_gesture(result.gesture, timestamp)
+        confirmed.append(gesture)
+        writer.write_result(timestamp, result, gesture)
+    writer.close()
+
+    output = tmp_path / 'replayed.jsonl'
+    assert main([str(path), '--model', '', '-o', str(output)]) == 0
+    with open(output) as file:
+        replayed = [json.loads(line) for line in file]
+    assert [entry['gesture'] for entry in replayed] == [entry['gesture'] for entry in writer.results]
+    assert [entry['confirmed'] for entry in replayed] == confirmed
+    assert any(confirmed)
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from pages.game_page.camera_service import CameraService
+from pages.game_page.frame_source import SessionSource
+from pages.game_page.gesture_recognition import RecognitionResult
+from pages.game_page.session import SessionReader, SessionWriter
+
+
+def write_session(path, codec, count=5):
+    writer = SessionWriter(str(path), codec)
+    for i in range(count):
+        writer.write_frame(np.full((24, 32, 3), i * 10, dtype=np.uint8), i / 30.0, 'rock')
+    writer.close()
+
+
+def test_raw_frames_outlive_reader(tmp_path):
+    path = tmp_path / 'session.rpsrec'
+    write_session(path, 'raw')
+    reader = SessionReader(str(path))
+    frame, _, label = reader.frame(3)
+    reader.close()
+    assert label == 'rock'
+    assert frame.shape == (24, 32, 3) and frame[0, 0, 0] == 30
+
+
+def test_stop_service_replaying_raw_session(tmp_path):
+    path = tmp_path / 'session.rpsrec'
+    write_session(path, 'raw')
+    # Without mirroring, frames reach subscribers exactly as the reader returns them
+    service = CameraService(SessionSource(str(path), loop=True), mirror=False)
+    assert service.start()
+    subscription = service.subscribe(name='test')
+    frame = subscription.wait(timeout=2.0)
+    assert frame is not None
+    service.stop()
+    assert frame.shape == (24, 32, 3)
+
+
+@pytest.mark.parametrize('codec', ['raw', 'png', 'jpg'])
+def test_frames_and_results_round_trip(tmp_path, codec):
+    path = tmp_path / 'session.rpsrec'
+    writer = SessionWriter(str(path), codec, {'profile': 'fast'})
+    frames = [np.full((24, 32, 3), i * 40, dtype=np.uint8) for i in range(4)]
+    for i, frame in enumerate(frames):
+        writer.write_frame(frame, 10.0 + i, 'paper' if i % 2 else None)
+    writer.write_result(11.0, RecognitionResult(gesture='paper', confidences={'paper': 0.8}), 'paper')
+    writer.close()
+
+    reader = SessionReader(str(path))
+    assert reader.complete and len(reader) == 4
+    assert reader.header['profile'] == 'fast' and reader.header['codec'] == codec
+    for i, expected in enumerate(frames):
+        frame, timestamp, label = reader.frame(i)
+        assert timestamp == 10.0 + i and label == ('paper' if i % 2 else None)
+        # JPEG is lossy, the other codecs are exact
+        assert np.abs(frame.astype(int) - expected).max() <= (2 if codec == 'jpg' else 0)
+    assert reader.fps() == 1.0
+    [result] = reader.results
+    assert result['t'] == 11.0 and result['gesture'] == 'paper' and result['confirmed'] == 'paper'
+    reader.close()
+
+
+def test_unfinished_recording_is_rescanned(tmp_path):
+    path = tmp_path / 'session.rpsrec'
+    writer = SessionWriter(str(path), 'raw')
+    for i in range(3):
+        writer.write_frame(np.full((8, 8, 3), i, dtype=np.uint8), float(i), 'rock')
+    writer.write_result(2.0, RecognitionResult(gesture='rock'))
+    # A crash leaves the records without the index written by close()
+    writer.file.flush()
+
+    reader = SessionReader(str(path))
+    assert not reader.complete and len(reader) == 3
+    assert reader.frame(2)[0][0, 0, 0] == 2
+    assert [result['t'] for result in reader.results] == [2.0]
+    reader.close()
+    writer.file.close()